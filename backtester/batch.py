@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple
+
+from backtester.core.analyzers import DrawdownAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ExecutionMode, RecordLevel
+from backtester.core.errors import ValidationError
+from backtester.core.result import BacktestResult
+from backtester.core.settings import BacktestSettings
+from backtester.core.vector_engine import VectorEngine
+from backtester.grid import ENGINES, FeedSource
+from backtester.strategies.registry import get_strategy
+
+# Ключи одного прогона в манифесте (те же имена, что у флагов CLI).
+_RUN_KEYS = frozenset(
+    {
+        "name",
+        "csv",
+        "store",
+        "start",
+        "end",
+        "cache",
+        "strategy",
+        "params",
+        "cash",
+        "commission",
+        "mode",
+        "lot",
+        "engine",
+        "record",
+        "equity",
+        "trades",
+    }
+)
+
+# Файл данных без диапазона дат: прогоны по одному файлу делят один фид.
+FeedKey = Tuple[str | None, str | None, bool]
+
+
+@dataclass(slots=True)
+class BatchRun:
+    """
+    Один прогон из манифеста.
+
+    equity, trades
+        Куда записать кривую equity и сделки (CSV); ``None`` — не писать.
+        Уровень записи ``settings.record`` по умолчанию выводится из них:
+        без выходных файлов прогон хранит только метрики.
+    """
+
+    name: str
+    source: FeedSource
+    strategy: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    settings: BacktestSettings = field(default_factory=BacktestSettings)
+    engine: str = "event"
+    equity: str | None = None
+    trades: str | None = None
+
+    def feed_key(self) -> FeedKey:
+        return (self.source.csv, self.source.store, self.source.cache)
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """
+    Метрики прогона ``name``; ``index`` — его позиция в манифесте.
+
+    error
+        Причина неудачи (файл данных не читается, выходной CSV не пишется,
+        ...); у неудавшегося прогона метрик нет.
+    """
+
+    index: int
+    name: str
+    strategy: str
+    params: Dict[str, Any]
+    metrics: Dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+
+def load_manifest(path: str) -> List[BatchRun]:
+    """
+    Прочитать JSON-манифест (см. :func:`parse_manifest`); относительные пути
+    в нём считаются от каталога манифеста.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as exc:
+            raise ValidationError(f"Bad manifest {path}: {exc}") from None
+    return parse_manifest(data, base_dir=os.path.dirname(os.path.abspath(path)))
+
+
+def parse_manifest(data: Any, base_dir: str = ".") -> List[BatchRun]:
+    """
+    Разобрать манифест пакетного прогона.
+
+    Манифест — объект ``{"defaults": {...}, "runs": [{...}, ...]}`` или
+    просто список прогонов. Ключи прогона — как флаги CLI: ``csv`` или
+    ``store``, ``start``/``end`` (ISO), ``cache``, ``strategy``, ``params``,
+    ``cash``, ``commission``, ``mode``, ``lot``, ``engine``, ``record``, а
+    также ``name`` и пути ``equity``/``trades`` для выходных CSV.
+    ``defaults`` подставляется в каждый прогон. Ошибки (неизвестный ключ,
+    повтор имени или выходного файла, неверный параметр стратегии)
+    находятся здесь, до загрузки данных.
+    """
+    if isinstance(data, list):
+        data = {"runs": data}
+    if not isinstance(data, Mapping) or not isinstance(data.get("runs"), list):
+        raise ValidationError("Manifest must be a list of runs or an object with a 'runs' list")
+    unknown = set(data) - {"defaults", "runs"}
+    if unknown:
+        raise ValidationError(f"Unknown manifest keys: {sorted(unknown)}")
+    defaults = data.get("defaults") or {}
+    if not isinstance(defaults, Mapping):
+        raise ValidationError("Manifest 'defaults' must be an object")
+
+    runs: List[BatchRun] = []
+    names: Set[str] = set()
+    outputs: Set[str] = set()
+    for i, entry in enumerate(data["runs"]):
+        if not isinstance(entry, Mapping):
+            raise ValidationError(f"Run #{i} must be an object")
+        try:
+            run = _parse_run({**defaults, **entry}, i, base_dir)
+        except ValidationError as exc:
+            raise ValidationError(f"Run #{i}: {exc}") from None
+        if run.name in names:
+            raise ValidationError(f"Run #{i}: duplicate name {run.name!r}")
+        names.add(run.name)
+        for out in (run.equity, run.trades):
+            if out is None:
+                continue
+            if out in outputs:
+                raise ValidationError(f"Run #{i}: output file {out} is used by another run")
+            outputs.add(out)
+        runs.append(run)
+    return runs
+
+
+def _parse_run(entry: Mapping[str, Any], i: int, base_dir: str) -> BatchRun:
+    unknown = set(entry) - _RUN_KEYS
+    if unknown:
+        raise ValidationError(f"unknown keys {sorted(unknown)}")
+
+    def path(key: str) -> str | None:
+        value = entry.get(key)
+        if value is None:
+            return None
+        return os.path.normpath(os.path.join(base_dir, str(value)))
+
+    def when(key: str) -> datetime | None:
+        value = entry.get(key)
+        if value is None:
+            return None
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            raise ValidationError(f"bad {key} date: {value!r}") from None
+
+    source = FeedSource(
+        csv=path("csv"),
+        store=path("store"),
+        start=when("start"),
+        end=when("end"),
+        cache=bool(entry.get("cache", False)),
+    )
+    strategy = str(entry.get("strategy", "ma"))
+    params = entry.get("params") or {}
+    if not isinstance(params, Mapping):
+        raise ValidationError("'params' must be an object")
+    params = get_strategy(strategy).bind(params)
+    engine = str(entry.get("engine", "event"))
+    if engine not in ENGINES:
+        raise ValidationError(f"unknown engine {engine!r}")
+
+    equity, trades = path("equity"), path("trades")
+    if "record" in entry:
+        record = _enum(RecordLevel, entry["record"], "record")
+    elif equity is not None:
+        record = RecordLevel.FULL
+    elif trades is not None:
+        record = RecordLevel.TRADES
+    else:
+        record = RecordLevel.METRICS
+    if equity is not None and record is not RecordLevel.FULL:
+        raise ValidationError("'equity' output needs record 'full'")
+    if trades is not None and record is RecordLevel.METRICS:
+        raise ValidationError("'trades' output needs record 'trades' or 'full'")
+
+    settings = BacktestSettings(
+        initial_cash=_number(entry, "cash", 10_000.0),
+        commission_pct=_number(entry, "commission", 0.0),
+        execution_mode=_enum(ExecutionMode, entry.get("mode", "on_close"), "mode"),
+        lot_size=_number(entry, "lot", 1.0),
+        record=record,
+    )
+    return BatchRun(
+        name=str(entry.get("name", f"run{i}")),
+        source=source,
+        strategy=strategy,
+        params=params,
+        settings=settings,
+        engine=engine,
+        equity=equity,
+        trades=trades,
+    )
+
+
+def _number(entry: Mapping[str, Any], key: str, default: float) -> float:
+    value = entry.get(key, default)
+    if isinstance(value, bool):
+        raise ValidationError(f"bad {key}: {value!r}")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"bad {key}: {value!r}") from None
+
+
+def _enum(kind: Any, value: Any, key: str) -> Any:
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValidationError(f"bad {key}: {value!r}") from None
+
+
+def run_batch(runs: Sequence[BatchRun], workers: int | None = None) -> Iterator[BatchResult]:
+    """
+    Выполнить прогоны манифеста; результаты отдаются по мере готовности.
+
+    Прогоны группируются по файлу данных: каждый файл загружается
+    воркером один раз (CSV — через кэш разбора), диапазоны дат — срезы
+    :meth:`DataFeed.slice` без копирования. Событийные прогоны по одному
+    срезу идут за один проход по фиду (:meth:`Engine.run_many`).
+    Выходные CSV пишет тот процесс, который выполнил прогон, — кривые
+    и сделки не передаются между процессами. При ``workers=1`` всё идёт
+    в текущем процессе без пула.
+
+    Ошибка ввода-вывода или данных (``OSError``, :class:`ValidationError`)
+    не обрывает пакет: прогоны, которых она коснулась, приходят с
+    заполненным :attr:`BatchResult.error`, остальные выполняются как обычно.
+    """
+    items = list(enumerate(runs))
+    if not items:
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(items)))
+
+    groups: Dict[FeedKey, List[Tuple[int, BatchRun]]] = {}
+    for item in items:
+        groups.setdefault(item[1].feed_key(), []).append(item)
+    # ~4 задачи на воркер, как в run_grid, но задача не смешивает файлы.
+    size = min(64, max(1, math.ceil(len(items) / (workers * 4))))
+    tasks = [group[k : k + size] for group in groups.values() for k in range(0, len(group), size)]
+
+    if workers == 1:
+        feeds: Dict[FeedKey, DataFeed] = {}
+        for task in tasks:
+            yield from _execute(task, feeds)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        todo = iter(tasks)
+        running: Set[Future[List[BatchResult]]] = set()
+        for task in itertools.islice(todo, workers * 2):
+            running.add(pool.submit(_run_task, task))
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
+                nxt = next(todo, None)
+                if nxt is not None:
+                    running.add(pool.submit(_run_task, nxt))
+
+
+# Фиды, загруженные процессом-воркером, по файлу данных.
+_worker_feeds: Dict[FeedKey, DataFeed] = {}
+
+
+def _run_task(task: List[Tuple[int, BatchRun]]) -> List[BatchResult]:
+    return _execute(task, _worker_feeds)
+
+
+def _execute(task: List[Tuple[int, BatchRun]], feeds: Dict[FeedKey, DataFeed]) -> List[BatchResult]:
+    key = task[0][1].feed_key()
+    feed = feeds.get(key)
+    if feed is None:
+        csv, store, cache = key
+        try:
+            feed = feeds[key] = FeedSource(csv=csv, store=store, cache=cache).load()
+        except (OSError, ValidationError) as exc:
+            return [_failed(index, run, exc) for index, run in task]
+
+    # Событийные прогоны по одному срезу — одним run_many.
+    lanes: Dict[Tuple[datetime | None, datetime | None], List[Tuple[int, BatchRun]]] = {}
+    out: List[BatchResult] = []
+    for index, run in task:
+        if run.engine == "event":
+            lanes.setdefault((run.source.start, run.source.end), []).append((index, run))
+            continue
+        try:
+            vector = VectorEngine()
+            vector.set_data(_slice(feed, run))
+            vector.set_strategy(get_strategy(run.strategy).create(**run.params))
+            vector.configure(run.settings)
+            out.append(_finish(index, run, vector.run()))
+        except (OSError, ValidationError) as exc:
+            out.append(_failed(index, run, exc))
+    for (start, end), lane in lanes.items():
+        try:
+            eng = Engine()
+            eng.set_data(_slice(feed, lane[0][1]))
+            results = eng.run_many(
+                (get_strategy(run.strategy).create(**run.params), run.settings, [DrawdownAnalyzer()]) for _, run in lane
+            )
+        except (OSError, ValidationError) as exc:
+            out.extend(_failed(index, run, exc) for index, run in lane)
+            continue
+        for (index, run), res in zip(lane, results):
+            try:
+                out.append(_finish(index, run, res))
+            except OSError as exc:
+                out.append(_failed(index, run, exc))
+    return out
+
+
+def _slice(feed: DataFeed, run: BatchRun) -> DataFeed:
+    if run.source.start is None and run.source.end is None:
+        return feed
+    return feed.slice(run.source.start, run.source.end)
+
+
+def _finish(index: int, run: BatchRun, result: BacktestResult) -> BatchResult:
+    if run.equity is not None:
+        write_equity_csv(result, run.equity)
+    if run.trades is not None:
+        write_trades_csv(result, run.trades)
+    return BatchResult(index=index, name=run.name, strategy=run.strategy, params=run.params, metrics=result.metrics)
+
+
+def _failed(index: int, run: BatchRun, exc: Exception) -> BatchResult:
+    return BatchResult(index=index, name=run.name, strategy=run.strategy, params=run.params, error=str(exc))
+
+
+def _open_output(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def write_equity_csv(result: BacktestResult, path: str) -> None:
+    """Кривая equity в CSV ``datetime,equity`` (формат ``equity_curve.csv`` CLI)."""
+    with _open_output(path) as f:
+        f.write("datetime,equity\n")
+        for dt, eq in result.equity_curve:
+            f.write(f"{dt},{eq:.6f}\n")
+
+
+def write_trades_csv(result: BacktestResult, path: str) -> None:
+    """Сделки в CSV ``datetime,side,price,qty,commission``."""
+    with _open_output(path) as f:
+        f.write("datetime,side,price,qty,commission\n")
+        for t in result.trades:
+            f.write(f"{t.dt.isoformat()},{t.side.value},{t.price:.6f},{t.qty:.6f},{t.commission:.6f}\n")
+
+
+def metrics_table(results: Iterable[BatchResult]) -> Tuple[List[str], List[List[str]]]:
+    """
+    Сводная таблица: заголовок и строки в порядке манифеста.
+
+    Колонки — ``name``, ``strategy``, ``params`` (JSON) и все метрики в
+    порядке первого появления; метрика, которой у прогона нет, — пустая.
+    Если хоть один прогон не удался, в конце добавляется колонка ``error``.
+    """
+    ordered = sorted(results, key=lambda r: r.index)
+    columns: Dict[str, None] = {}
+    for res in ordered:
+        columns.update(dict.fromkeys(res.metrics))
+    failed = any(res.error is not None for res in ordered)
+    header = ["name", "strategy", "params", *columns, *(["error"] if failed else [])]
+    rows = [
+        [
+            res.name,
+            res.strategy,
+            json.dumps(res.params, sort_keys=True),
+            *(repr(res.metrics[c]) if c in res.metrics else "" for c in columns),
+            *([res.error or ""] if failed else []),
+        ]
+        for res in ordered
+    ]
+    return header, rows
+
+
+def write_metrics_csv(results: Iterable[BatchResult], path: str) -> None:
+    """Сводная таблица метрик (:func:`metrics_table`) в CSV."""
+    header, rows = metrics_table(results)
+    with _open_output(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    CLI пакетного прогона (``backtester-cli batch ...``).
+
+    Неудавшиеся прогоны печатаются в stderr и попадают в таблицу метрик
+    с колонкой ``error``; код выхода тогда ненулевой.
+
+    Пример запуска:
+
+        backtester-cli batch runs.json --workers 8 --metrics-out metrics.csv
+    """
+    p = argparse.ArgumentParser(prog="backtester-cli batch", description="Run many backtests from a JSON manifest")
+    p.add_argument("manifest", help="Path to the JSON manifest")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    p.add_argument("--metrics-out", default=None, help="Write the combined metrics table to this CSV")
+    args = p.parse_args(argv)
+    try:
+        runs = load_manifest(args.manifest)
+    except (OSError, ValidationError) as exc:
+        p.error(str(exc))
+
+    print("name, strategy, return_pct, max_drawdown_pct, trades")
+    results: List[BatchResult] = []
+    failures = 0
+    for res in run_batch(runs, workers=args.workers):
+        results.append(res)
+        if res.error is not None:
+            failures += 1
+            print(f"{res.name}: FAILED: {res.error}", file=sys.stderr, flush=True)
+            continue
+        m = res.metrics
+        print(
+            f"{res.name}, {res.strategy}, {m.get('return_pct', 0.0):.4f}, "
+            f"{m.get('max_drawdown_pct', 0.0):.4f}, {m.get('trades', 0.0):.0f}",
+            flush=True,
+        )
+    if args.metrics_out:
+        write_metrics_csv(results, args.metrics_out)
+        print(f"\nMetrics table saved to: {args.metrics_out}")
+    if failures:
+        print(f"{failures} of {len(runs)} runs failed", file=sys.stderr)
+        sys.exit(1)
+
+
+__all__ = [
+    "BatchResult",
+    "BatchRun",
+    "load_manifest",
+    "metrics_table",
+    "parse_manifest",
+    "run_batch",
+    "write_equity_csv",
+    "write_metrics_csv",
+    "write_trades_csv",
+]
+
+
+if __name__ == "__main__":
+    main()
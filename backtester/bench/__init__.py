@@ -0,0 +1,3 @@
+"""Бенчмарки производительности бэктестера."""
+
+from __future__ import annotations
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from backtester.core.datafeed import DataFeed
+
+FORMATS = ("plain", "nasdaq")
+
+
+def write_synthetic_csv(path: str, rows: int, fmt: str = "plain") -> None:
+    """
+    Сгенерировать CSV с ``rows`` барами.
+
+    ``plain`` — ``datetime,open,high,low,close,volume`` с датой-временем
+    (минутные бары), ``nasdaq`` — выгрузка Nasdaq (даты ``MM/DD/YYYY``
+    по убыванию, цены с ``$``).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown CSV format: {fmt}")
+    base = datetime(2000, 1, 3)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "plain":
+            f.write("datetime,open,high,low,close,volume\n")
+            for i in range(rows):
+                dt = base + timedelta(minutes=i)
+                p = 100.0 + (i % 1000) * 0.01
+                f.write(
+                    f"{dt:%Y-%m-%d %H:%M:%S},{p:.2f},{p + 0.5:.2f},"
+                    f"{p - 0.5:.2f},{p + 0.1:.2f},{1000 + i % 500}\n"
+                )
+        else:
+            f.write("Date,Close/Last,Volume,Open,High,Low\n")
+            for i in reversed(range(rows)):
+                dt = base + timedelta(days=i)
+                p = 100.0 + (i % 1000) * 0.01
+                f.write(
+                    f"{dt:%m/%d/%Y},${p + 0.1:.2f},{1000 + i % 500},"
+                    f"${p:.2f},${p + 0.5:.2f},${p - 0.5:.4f}\n"
+                )
+
+
+def bench_load_csv(rows: int, fmt: str = "plain", repeat: int = 3) -> Dict[str, float]:
+    """
+    Замерить :meth:`DataFeed.load_csv` на синтетическом файле.
+
+    Возвращает лучшее время из ``repeat`` попыток и пропускную
+    способность в строках в секунду.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"bench_{fmt}.csv")
+        write_synthetic_csv(path, rows, fmt)
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            DataFeed.load_csv(path)
+            best = min(best, time.perf_counter() - t0)
+    return {
+        "rows": float(rows),
+        "seconds": best,
+        "rows_per_sec": rows / best if best > 0 else float("inf"),
+    }
+
+
+def main() -> None:
+    """
+    Бенчмарк загрузки CSV.
+
+    Пример запуска:
+
+        python -m backtester.bench.csv_load --rows 1000000
+    """
+    p = argparse.ArgumentParser(description="Benchmark DataFeed.load_csv throughput")
+    p.add_argument("--rows", type=int, default=200_000, help="Rows in synthetic CSV")
+    p.add_argument(
+        "--format",
+        choices=[*FORMATS, "all"],
+        default="all",
+        help="CSV flavour to benchmark",
+    )
+    p.add_argument("--repeat", type=int, default=3, help="Best-of-N repetitions")
+    args = p.parse_args()
+
+    formats = FORMATS if args.format == "all" else (args.format,)
+    print("format, rows, seconds, rows/sec")
+    for fmt in formats:
+        r = bench_load_csv(args.rows, fmt, args.repeat)
+        print(f"{fmt}, {int(r['rows'])}, {r['seconds']:.4f}, {r['rows_per_sec']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from unittest.mock import patch
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.result import BacktestResult
+from backtester.core.settings import BacktestSettings
+from backtester.core.strategy_base import Strategy
+
+# Фазы прогона в порядке выполнения: разбор CSV, сортировка и проверка
+# баров, цикл движка, сборка результата (метрики, кривая, сделки).
+PHASES = ("load_csv", "sort_and_validate", "engine", "result")
+
+# Аллокации самого профилировщика в отчёт не попадают.
+_IGNORED = (tracemalloc.__file__, os.path.abspath(__file__), "<frozen importlib._bootstrap>")
+
+
+@dataclass(slots=True)
+class AllocationSite:
+    """Строка кода и сколько памяти, выделенной в ней, фаза оставила живой."""
+
+    location: str
+    size: int
+    count: int
+
+
+@dataclass(slots=True)
+class PhaseMemory:
+    """
+    Память одной фазы, байты.
+
+    peak
+        Максимум отслеживаемой памяти во время фазы сверх уровня до начала
+        профилирования — столько нужно процессу на пике этой фазы.
+
+    retained
+        Прирост памяти за фазу, который остался после её окончания.
+
+    top
+        Строки кода с наибольшим удержанным приростом (временные буферы,
+        освобождённые внутри фазы, сюда не попадают — их видно по ``peak``).
+    """
+
+    name: str
+    peak: int = 0
+    retained: int = 0
+    top: List[AllocationSite] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MemoryReport:
+    """Память прогона по фазам (:data:`PHASES`) для фида из ``bars`` баров."""
+
+    bars: int
+    phases: List[PhaseMemory]
+
+    @property
+    def peak(self) -> int:
+        return max((p.peak for p in self.phases), default=0)
+
+    @property
+    def retained(self) -> int:
+        return sum(p.retained for p in self.phases)
+
+    def per_bar(self, value: int) -> float:
+        """Байт на бар фида."""
+        return value / self.bars if self.bars else 0.0
+
+
+class PhaseTracker:
+    """
+    Разбиение прогона на последовательные фазы под :mod:`tracemalloc`.
+
+    :meth:`enter` закрывает текущую фазу и открывает следующую; фаза может
+    встречаться несколько раз (например, ``load_csv`` до и после
+    сортировки) — её удержанная память складывается, пик берётся
+    наибольший. На границах фаз снимается снимок аллокаций, по разнице
+    снимков находятся строки кода, где выделена удержанная память.
+    """
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self._phases: Dict[str, PhaseMemory] = {}
+        self._sites: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._current: str | None = None
+        self._baseline = 0
+        self._start = 0
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._own = False
+
+    def start(self) -> None:
+        self._own = not tracemalloc.is_tracing()
+        if self._own:
+            tracemalloc.start()
+        self._snapshot = _snapshot()
+        self._baseline = self._start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def enter(self, name: str) -> None:
+        self._close()
+        self._current = name
+        tracemalloc.reset_peak()
+        self._start = tracemalloc.get_traced_memory()[0]
+
+    def stop(self) -> None:
+        self._close()
+        self._current = None
+        self._snapshot = None
+        if self._own:
+            tracemalloc.stop()
+
+    def report(self, bars: int) -> MemoryReport:
+        names = list(PHASES) + [n for n in self._phases if n not in PHASES]
+        phases = []
+        for name in names:
+            phase = self._phases.get(name) or PhaseMemory(name)
+            sites = sorted(self._sites.get(name, {}).items(), key=lambda kv: kv[1][0], reverse=True)
+            phase.top = [AllocationSite(loc, size, count) for loc, (size, count) in sites[: self.top] if size > 0]
+            phases.append(phase)
+        return MemoryReport(bars=bars, phases=phases)
+
+    def _close(self) -> None:
+        if self._current is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        phase = self._phases.setdefault(self._current, PhaseMemory(self._current))
+        phase.peak = max(phase.peak, peak - self._baseline)
+        phase.retained += current - self._start
+
+        snapshot = _snapshot()
+        assert self._snapshot is not None
+        sites = self._sites.setdefault(self._current, {})
+        for stat in snapshot.compare_to(self._snapshot, "lineno"):
+            if stat.size_diff or stat.count_diff:
+                frame = stat.traceback[0]
+                loc = f"{frame.filename}:{frame.lineno}"
+                size, count = sites.get(loc, (0, 0))
+                sites[loc] = (size + stat.size_diff, count + stat.count_diff)
+        self._snapshot = snapshot
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, pattern) for pattern in _IGNORED]
+    )
+
+
+class _PhasedEngine(Engine):
+    """Движок, отмечающий начало сборки результата."""
+
+    def __init__(self, tracker: PhaseTracker) -> None:
+        super().__init__()
+        self._tracker = tracker
+
+    def _build_result(self, *args, **kwargs) -> BacktestResult:
+        self._tracker.enter("result")
+        return super()._build_result(*args, **kwargs)
+
+
+def profile_memory(
+    path: str,
+    strategy: Strategy,
+    settings: BacktestSettings,
+    cache: bool = False,
+    top: int = 10,
+) -> Tuple[MemoryReport, BacktestResult]:
+    """
+    Прогнать бэктест по CSV ``path`` под :mod:`tracemalloc` и разложить
+    память по фазам :data:`PHASES`.
+
+    Загруженный фид и результат живы до конца замера, поэтому ``retained``
+    фаз ``load_csv``/``sort_and_validate`` — это память самого фида, а
+    ``engine``/``result`` — память, которую держит результат. Отношение к
+    числу баров (:meth:`MemoryReport.per_bar`) — то, по чему оценивается
+    память воркера на фиде другой длины.
+
+    Аллокации под :mod:`tracemalloc` в несколько раз медленнее, так что
+    время этого прогона ничего не говорит о скорости.
+    """
+    tracker = PhaseTracker(top=top)
+    original = DataFeed.sort_and_validate
+
+    def sort_and_validate(feed: DataFeed) -> None:
+        tracker.enter("sort_and_validate")
+        try:
+            original(feed)
+        finally:
+            tracker.enter("load_csv")
+
+    tracker.start()
+    try:
+        tracker.enter("load_csv")
+        with patch.object(DataFeed, "sort_and_validate", sort_and_validate):
+            feed = DataFeed.load_csv(path, cache=cache)
+
+        tracker.enter("engine")
+        eng = _PhasedEngine(tracker)
+        eng.set_data(feed)
+        eng.set_strategy(strategy)
+        eng.configure(settings)
+        result = eng.run()
+    finally:
+        tracker.stop()
+    return tracker.report(feed.size()), result
+
+
+__all__ = ["AllocationSite", "MemoryReport", "PHASES", "PhaseMemory", "PhaseTracker", "profile_memory"]
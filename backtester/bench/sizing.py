@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from backtester.core.broker import CASH_TOLERANCE, affordable_qty
+
+# (price, qty, cash, commission_pct)
+Order = Tuple[float, float, float, float]
+
+
+def _lot_by_lot(price: float, qty: float, cash: float, commission_pct: float, lot_size: float) -> float:
+    """Прежний алгоритм брокера: вычитать по лоту, пока ордер не поместится в кэш."""
+    while qty > 0 and price * qty * (1.0 + commission_pct) - cash > CASH_TOLERANCE:
+        qty -= lot_size
+    return int(max(qty, 0.0) / lot_size) * lot_size
+
+
+def make_orders(n: int, lot_size: float, overshoot: float, seed: int = 0) -> List[Order]:
+    """
+    ``n`` ордеров на покупку, которые не помещаются в кэш.
+
+    Желаемое количество больше доступного в ``1 + overshoot`` раз —
+    как ``qty_hint`` «с запасом» или вход на весь кэш после комиссии.
+    """
+    rnd = random.Random(seed)
+    orders: List[Order] = []
+    for _ in range(n):
+        price = rnd.uniform(10.0, 500.0)
+        commission_pct = rnd.choice([0.0, 0.001])
+        cash = rnd.uniform(1_000.0, 100_000.0)
+        qty = cash / (price * (1.0 + commission_pct)) * (1.0 + overshoot)
+        orders.append((price, int(qty / lot_size) * lot_size, cash, commission_pct))
+    return orders
+
+
+def bench_sizing(
+    lot_size: float,
+    orders: int = 1_000,
+    overshoot: float = 0.01,
+    repeat: int = 3,
+    legacy: bool = True,
+) -> Dict[str, float]:
+    """
+    Замерить подбор количества под кэш: :func:`affordable_qty` и, если
+    ``legacy``, прежний перебор по лоту. Время — лучшее из ``repeat``,
+    в микросекундах на ордер.
+    """
+    batch = make_orders(orders, lot_size, overshoot)
+
+    def best(fn: Callable[[float, float, float, float, float], float]) -> float:
+        t_best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            for price, qty, cash, commission_pct in batch:
+                fn(price, qty, cash, commission_pct, lot_size)
+            t_best = min(t_best, time.perf_counter() - t0)
+        return t_best / len(batch) * 1e6
+
+    out = {"lot_size": lot_size, "orders": float(orders), "closed_form_us": best(affordable_qty)}
+    if legacy:
+        out["lot_by_lot_us"] = best(_lot_by_lot)
+    return out
+
+
+def main() -> None:
+    """
+    Бенчмарк подбора количества ордера под доступный кэш.
+
+    Пример запуска:
+
+        python -m backtester.bench.sizing --lots 1,0.01,0.0001 --overshoot 0.01
+    """
+    p = argparse.ArgumentParser(description="Benchmark order sizing against available cash")
+    p.add_argument("--lots", default="1,0.01,0.0001", help="Comma-separated lot sizes")
+    p.add_argument("--orders", type=int, default=1_000, help="Orders per measurement")
+    p.add_argument("--overshoot", type=float, default=0.01, help="Desired qty above affordable, fraction")
+    p.add_argument("--repeat", type=int, default=3, help="Best-of-N repetitions")
+    p.add_argument("--no-legacy", action="store_true", help="Skip the lot-by-lot baseline")
+    args = p.parse_args()
+
+    print("lot_size, closed-form us/order, lot-by-lot us/order")
+    for lot in (float(x) for x in args.lots.split(",")):
+        r = bench_sizing(lot, args.orders, args.overshoot, args.repeat, legacy=not args.no_legacy)
+        legacy = f"{r['lot_by_lot_us']:.2f}" if "lot_by_lot_us" in r else "-"
+        print(f"{lot:g}, {r['closed_form_us']:.2f}, {legacy}")
+
+
+if __name__ == "__main__":
+    main()
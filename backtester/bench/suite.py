@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from backtester.bench.csv_load import write_synthetic_csv
+from backtester.core.analyzers import (
+    CagrAnalyzer,
+    CalmarAnalyzer,
+    ChunkRecorder,
+    DrawdownAnalyzer,
+    ExposureAnalyzer,
+    SharpeAnalyzer,
+    SortinoAnalyzer,
+    VolatilityAnalyzer,
+)
+from backtester.core.broker import Broker
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ExecutionMode
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import BUY_ALL, SELL_ALL
+from backtester.strategies.registry import get_strategy
+
+# Версия формата JSON-отчёта: базовая линия другой версии не сравнивается.
+FORMAT_VERSION = 1
+
+DEFAULT_SIZES = (10_000, 100_000)
+# Запись CSV на 10 млн строк сама по себе занимает минуты, поэтому по
+# умолчанию разбор CSV меряется не больше чем на миллионе строк.
+DEFAULT_MAX_CSV_ROWS = 1_000_000
+
+# Стратегии замеров движка: ключ реестра -> параметры.
+_STRATEGIES: Dict[str, Dict[str, Any]] = {
+    "bh": {},
+    "ma": {"fast": 5, "slow": 20},
+    "donchian": {"window": 20},
+}
+
+# Подготовленный замер: вызов выполняет работу и возвращает число единиц
+# (баров, строк, сделок), по которому считается пропускная способность.
+Runner = Callable[[], int]
+
+
+@dataclass(slots=True)
+class BenchResult:
+    """
+    Один замер набора.
+
+    rate
+        Пропускная способность в ``unit`` (лучшая из попыток).
+
+    peak_kib
+        Пик памяти Python-аллокаций во время отдельного прогона под
+        :mod:`tracemalloc`; ``None``, если память не мерилась.
+    """
+
+    name: str
+    size: int
+    unit: str
+    seconds: float
+    rate: float
+    peak_kib: float | None = None
+
+
+@dataclass(slots=True)
+class Regression:
+    """Замер, ухудшившийся относительно базовой линии сильнее порога."""
+
+    name: str
+    size: int
+    metric: str
+    baseline: float
+    current: float
+    change_pct: float
+
+
+@dataclass(slots=True)
+class _Case:
+    name: str
+    unit: str
+    setup: Callable[[int, "_Fixtures"], Runner]
+    max_size: int | None = None
+
+
+class _Fixtures:
+    """Общие для замеров данные: синтетические фиды по размерам и временный каталог."""
+
+    def __init__(self, tmpdir: str) -> None:
+        self.tmpdir = tmpdir
+        self._feeds: Dict[int, DataFeed] = {}
+
+    def feed(self, bars: int) -> DataFeed:
+        if bars not in self._feeds:
+            self._feeds[bars] = synthetic_feed(bars)
+        return self._feeds[bars]
+
+
+def synthetic_feed(bars: int, seed: int = 0) -> DataFeed:
+    """
+    Синтетический минутный фид из ``bars`` баров.
+
+    Логарифм цены — процесс AR(1) вокруг 100, так что на любой длине цены
+    остаются в разумных пределах, а стратегии регулярно входят и выходят.
+    """
+    rnd = random.Random(seed)
+    ts = array("q", range(946_857_600_000_000, 946_857_600_000_000 + bars * 60_000_000, 60_000_000))
+    close = array("d")
+    opens = array("d")
+    highs = array("d")
+    lows = array("d")
+    x = 0.0
+    prev = 100.0
+    for _ in range(bars):
+        x = 0.999 * x + rnd.gauss(0.0, 0.002)
+        c = 100.0 * math.exp(x)
+        spread = c * 0.001
+        opens.append(prev)
+        close.append(c)
+        highs.append(max(prev, c) + spread)
+        lows.append(min(prev, c) - spread)
+        prev = c
+    volume = array("d", [1000.0]) * bars
+    return DataFeed.from_columns(ts, opens, highs, lows, close, volume, symbol="SYN", timeframe="1m")
+
+
+def _csv_case(fmt: str) -> Callable[[int, _Fixtures], Runner]:
+    def setup(rows: int, fx: _Fixtures) -> Runner:
+        path = os.path.join(fx.tmpdir, f"bench_{fmt}_{rows}.csv")
+        if not os.path.exists(path):
+            write_synthetic_csv(path, rows, fmt)
+
+        def run() -> int:
+            return DataFeed.load_csv(path).size()
+
+        return run
+
+    return setup
+
+
+def _engine_case(strategy: str, mode: ExecutionMode) -> Callable[[int, _Fixtures], Runner]:
+    def setup(bars: int, fx: _Fixtures) -> Runner:
+        feed = fx.feed(bars)
+        settings = BacktestSettings(initial_cash=10_000.0, commission_pct=0.001, execution_mode=mode)
+        spec = get_strategy(strategy)
+        params = _STRATEGIES[strategy]
+
+        def run() -> int:
+            eng = Engine()
+            eng.set_data(feed)
+            eng.set_strategy(spec.create(**params))
+            eng.configure(settings)
+            eng.run()
+            return bars
+
+        return run
+
+    return setup
+
+
+def _broker_setup(bars: int, fx: _Fixtures) -> Runner:
+    feed = fx.feed(bars)
+    broker = Broker(commission_pct=0.001, lot_size=0.01)
+
+    def run() -> int:
+        # Покупка и продажа на каждом баре: чистая стоимость исполнения.
+        broker.reset(10_000.0)
+        execute = broker.execute
+        for i in range(bars):
+            execute(SELL_ALL if i & 1 else BUY_ALL, i, feed)
+        return bars
+
+    return run
+
+
+def _analyzers_setup(bars: int, fx: _Fixtures) -> Runner:
+    feed = fx.feed(bars)
+    ts = feed.timestamps()
+    equity = array("d", [c * 100.0 for c in feed.column("close")])
+    invested = array("d", [e if (i // 50) & 1 else 0.0 for i, e in enumerate(equity)])
+
+    def run() -> int:
+        recorder = ChunkRecorder(
+            [
+                DrawdownAnalyzer(),
+                SharpeAnalyzer(),
+                SortinoAnalyzer(),
+                VolatilityAnalyzer(),
+                CagrAnalyzer(),
+                CalmarAnalyzer(),
+                ExposureAnalyzer(),
+            ]
+        )
+        push = recorder.push
+        for t, e, v in zip(ts, equity, invested):
+            push(t, e, v)
+        recorder.flush()
+        return bars
+
+    return run
+
+
+def _cases(max_csv_rows: int) -> List[_Case]:
+    cases = [_Case(f"csv_load.{fmt}", "rows/s", _csv_case(fmt), max_csv_rows) for fmt in ("plain", "nasdaq")]
+    for strategy in _STRATEGIES:
+        for mode in ExecutionMode:
+            cases.append(_Case(f"engine.{strategy}.{mode.value}", "bars/s", _engine_case(strategy, mode)))
+    cases.append(_Case("broker.execute", "orders/s", _broker_setup))
+    cases.append(_Case("analyzers.batch", "bars/s", _analyzers_setup))
+    return cases
+
+
+def case_names() -> List[str]:
+    """Имена всех замеров набора."""
+    return [c.name for c in _cases(DEFAULT_MAX_CSV_ROWS)]
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeat: int = 3,
+    only: Sequence[str] | None = None,
+    memory: bool = True,
+    max_csv_rows: int = DEFAULT_MAX_CSV_ROWS,
+    progress: Callable[[BenchResult], None] | None = None,
+) -> List[BenchResult]:
+    """
+    Прогнать набор замеров на фидах из ``sizes`` баров.
+
+    ``only`` — шаблоны имён (``fnmatch``, например ``"engine.*"``).
+    Время — лучшее из ``repeat`` попыток; подготовка данных (генерация
+    фида, запись CSV) в замер не входит. При ``memory=True`` каждый замер
+    прогоняется ещё раз под :mod:`tracemalloc` ради пика памяти — отдельно,
+    потому что трассировка сама замедляет код.
+    """
+    cases = _cases(max_csv_rows)
+    if only:
+        cases = [c for c in cases if any(fnmatch.fnmatchcase(c.name, pat) for pat in only)]
+        if not cases:
+            raise ValidationError(f"No benchmarks match {list(only)}")
+    results: List[BenchResult] = []
+    with tempfile.TemporaryDirectory(prefix="backtester-bench-") as tmp:
+        fx = _Fixtures(tmp)
+        for size in sizes:
+            for case in cases:
+                if case.max_size is not None and size > case.max_size:
+                    continue
+                run = case.setup(size, fx)
+                best = float("inf")
+                units = 0
+                for _ in range(max(1, repeat)):
+                    t0 = time.perf_counter()
+                    units = run()
+                    best = min(best, time.perf_counter() - t0)
+                peak = _peak_kib(run) if memory else None
+                res = BenchResult(
+                    name=case.name,
+                    size=size,
+                    unit=case.unit,
+                    seconds=best,
+                    rate=units / best if best > 0 else float("inf"),
+                    peak_kib=peak,
+                )
+                results.append(res)
+                if progress is not None:
+                    progress(res)
+    return results
+
+
+def _peak_kib(run: Runner) -> float:
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def machine_info() -> Dict[str, str]:
+    """Описание окружения замера: с чем имеет смысл сравнивать результаты."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def to_json(results: Iterable[BenchResult]) -> Dict[str, Any]:
+    """Отчёт в формате JSON (см. :data:`FORMAT_VERSION`)."""
+    return {
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def load_results(path: str) -> List[BenchResult]:
+    """Прочитать отчёт, сохранённый :func:`to_json` (например, базовую линию)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValidationError(f"Unsupported benchmark report version in {path}: {data.get('version')}")
+    return [BenchResult(**r) for r in data["results"]]
+
+
+def compare(
+    current: Iterable[BenchResult],
+    baseline: Iterable[BenchResult],
+    threshold: float = 0.10,
+    memory_threshold: float | None = 0.25,
+) -> List[Regression]:
+    """
+    Сравнить замеры с базовой линией по ``(name, size)``.
+
+    Регрессия — пропускная способность ниже базовой больше чем на
+    ``threshold`` (доля) или пик памяти выше больше чем на
+    ``memory_threshold``; ``memory_threshold=None`` отключает проверку
+    памяти. Замеры, которых нет в базовой линии, не проверяются.
+    """
+    base: Dict[Tuple[str, int], BenchResult] = {(b.name, b.size): b for b in baseline}
+    out: List[Regression] = []
+    for cur in current:
+        ref = base.get((cur.name, cur.size))
+        if ref is None:
+            continue
+        if ref.rate > 0 and cur.rate < ref.rate * (1.0 - threshold):
+            out.append(_regression(cur, "rate", ref.rate, cur.rate))
+        if (
+            memory_threshold is not None
+            and ref.peak_kib
+            and cur.peak_kib is not None
+            and cur.peak_kib > ref.peak_kib * (1.0 + memory_threshold)
+        ):
+            out.append(_regression(cur, "peak_kib", ref.peak_kib, cur.peak_kib))
+    return out
+
+
+def _regression(cur: BenchResult, metric: str, baseline: float, current: float) -> Regression:
+    return Regression(
+        name=cur.name,
+        size=cur.size,
+        metric=metric,
+        baseline=baseline,
+        current=current,
+        change_pct=(current / baseline - 1.0) * 100.0,
+    )
+
+
+def _parse_sizes(text: str) -> List[int]:
+    # Допускаем запись вида 1e5.
+    return [int(float(x)) for x in text.split(",") if x.strip()]
+
+
+def _format(res: BenchResult) -> str:
+    peak = f"{res.peak_kib:.0f}" if res.peak_kib is not None else "-"
+    return f"{res.name}, {res.size}, {res.seconds:.4f}, {res.rate:.0f} {res.unit}, {peak}"
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Набор бенчмарков с проверкой регрессий.
+
+    Пример запуска:
+
+        python -m backtester.bench --sizes 1e4,1e5,1e6 --json bench.json
+        python -m backtester.bench --baseline bench.json --threshold 0.15
+
+    Код выхода ``1`` — есть регрессии относительно ``--baseline``.
+    """
+    p = argparse.ArgumentParser(prog="python -m backtester.bench", description="Backtester benchmark suite")
+    p.add_argument("--sizes", type=_parse_sizes, default=list(DEFAULT_SIZES), help="Comma-separated bar counts")
+    p.add_argument("--repeat", type=int, default=3, help="Best-of-N repetitions")
+    p.add_argument("--only", action="append", default=None, help="Benchmark name pattern (repeatable)")
+    p.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    p.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    p.add_argument(
+        "--max-csv-rows", type=int, default=DEFAULT_MAX_CSV_ROWS, help="Largest size for CSV parsing benchmarks"
+    )
+    p.add_argument("--json", default=None, help="Write the JSON report to this path ('-' for stdout)")
+    p.add_argument("--baseline", default=None, help="Baseline JSON report to compare against")
+    p.add_argument("--threshold", type=float, default=0.10, help="Allowed throughput drop, fraction")
+    p.add_argument(
+        "--memory-threshold", type=float, default=0.25, help="Allowed peak-memory growth, fraction (<0 disables)"
+    )
+    args = p.parse_args(argv)
+
+    if args.list:
+        print("\n".join(case_names()))
+        return
+
+    quiet = args.json == "-"
+    if not quiet:
+        print("name, size, seconds, rate, peak KiB")
+    results = run_suite(
+        args.sizes,
+        repeat=args.repeat,
+        only=args.only,
+        memory=not args.no_memory,
+        max_csv_rows=args.max_csv_rows,
+        progress=None if quiet else (lambda r: print(_format(r), flush=True)),
+    )
+
+    if args.json == "-":
+        json.dump(to_json(results), sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(to_json(results), f, indent=2)
+
+    if args.baseline:
+        memory_threshold = args.memory_threshold if args.memory_threshold >= 0 else None
+        regressions = compare(results, load_results(args.baseline), args.threshold, memory_threshold)
+        out = sys.stderr if quiet else sys.stdout
+        if regressions:
+            print(f"\n=== REGRESSIONS vs {args.baseline} ===", file=out)
+            for r in regressions:
+                print(
+                    f"{r.name} @ {r.size}: {r.metric} {r.baseline:.1f} -> {r.current:.1f} ({r.change_pct:+.1f}%)",
+                    file=out,
+                )
+            raise SystemExit(1)
+        print(f"\nNo regressions vs {args.baseline}", file=out)
+
+
+__all__ = [
+    "BenchResult",
+    "Regression",
+    "case_names",
+    "compare",
+    "load_results",
+    "machine_info",
+    "run_suite",
+    "synthetic_feed",
+    "to_json",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,122 @@
 from __future__ import annotations
 
 import argparse
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Sequence
 
 from backtester.core.datafeed import DataFeed
 from backtester.core.engine import Engine
 from backtester.core.enums import ExecutionMode
+from backtester.core.errors import ValidationError
 from backtester.core.settings import BacktestSettings
 from backtester.core.strategy_base import Strategy
-from backtester.strategies.buy_and_hold import BuyAndHold
-from backtester.strategies.ma_cross import MovingAverageCross
-from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.registry import get_strategy, parse_assignments
 
+if TYPE_CHECKING:
+    from backtester.core.result_cache import ResultCache
 
-def main() -> None:
-    """CLI-обёртка вокруг движка бэктестера."""
-    p = argparse.ArgumentParser(description="Simple Backtester MVP")
-    p.add_argument(
-        "--csv",
-        required=True,
-        help="Path to CSV with columns: datetime,open,high,low,close[,volume]",
-    )
+# Старые флаги параметров -> имя параметра стратегии. Флаг применяется,
+# только если выбранная стратегия объявляет такой параметр.
+_LEGACY_PARAMS = {"fast": "fast", "slow": "slow", "donchian_window": "window"}
+
+
+def add_strategy_arguments(p: argparse.ArgumentParser) -> None:
+    """Выбор стратегии и её параметров (общие для CLI и профилировщика)."""
     p.add_argument(
         "--strategy",
-        choices=["bh", "ma", "donchian"],
         default="ma",
         help=(
-            "bh=Buy&Hold, ma=Moving Average Cross, "
-            "donchian=Donchian breakout"
+            "Strategy key: bh=Buy&Hold, ma=Moving Average Cross, "
+            "donchian=Donchian breakout, or a plugin registered under the "
+            "'backtester.strategies' entry point group"
         ),
     )
-    p.add_argument("--fast", type=int, default=5, help="MA fast (for ma)")
-    p.add_argument("--slow", type=int, default=10, help="MA slow (for ma)")
+    p.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Strategy parameter (repeatable), validated against the strategy's declared params",
+    )
+    p.add_argument("--fast", type=int, default=None, help="MA fast (for ma), same as --param fast=N")
+    p.add_argument("--slow", type=int, default=None, help="MA slow (for ma), same as --param slow=N")
     p.add_argument(
         "--donchian-window",
         type=int,
-        default=20,
-        help="Window for Donchian breakout (for strategy=donchian)",
+        default=None,
+        help="Window for Donchian breakout (for strategy=donchian), same as --param window=N",
+    )
+
+
+def make_strategy(args: argparse.Namespace) -> Strategy:
+    """
+    Построить стратегию по аргументам :func:`add_strategy_arguments`.
+
+    Модуль стратегии импортируется только здесь, через реестр
+    (:mod:`backtester.strategies.registry`); параметры проверяются по
+    объявленным стратегией :class:`~backtester.core.strategy_base.Param`.
+    """
+    spec = get_strategy(args.strategy)
+    params: Dict[str, Any] = parse_assignments(args.param)
+    declared = {p.name for p in spec.params}
+    for flag, name in _LEGACY_PARAMS.items():
+        value = getattr(args, flag)
+        if value is not None and name in declared:
+            params.setdefault(name, value)
+    return spec.create(**params)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    CLI-обёртка вокруг движка бэктестера.
+
+    Первый аргумент ``grid`` переключает на перебор параметров
+    (см. :func:`backtester.grid.main`), ``walkforward`` — на walk-forward
+    оптимизацию (см. :func:`backtester.walkforward.main`), ``batch`` — на
+    пакетный прогон по JSON-манифесту (см. :func:`backtester.batch.main`).
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "grid":
+        from backtester.grid import main as grid_main
+
+        grid_main(argv[1:])
+        return
+    if argv and argv[0] == "walkforward":
+        from backtester.walkforward import main as walkforward_main
+
+        walkforward_main(argv[1:])
+        return
+    if argv and argv[0] == "batch":
+        from backtester.batch import main as batch_main
+
+        batch_main(argv[1:])
+        return
+
+    p = argparse.ArgumentParser(description="Simple Backtester MVP")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument(
+        "--csv",
+        help="Path to CSV with columns: datetime,open,high,low,close[,volume]",
+    )
+    src.add_argument(
+        "--store",
+        help="Path to a bar store file (see python -m backtester.core.barstore)",
+    )
+    p.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Only bars with datetime >= START (ISO format)",
+    )
+    p.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Only bars with datetime < END (ISO format)",
     )
+    add_strategy_arguments(p)
     p.add_argument("--cash", type=float, default=10_000.0, help="Initial cash")
     p.add_argument(
         "--commission",
@@ -56,19 +136,30 @@ def main() -> None:
         default=1.0,
         help="Lot size step (e.g. 1 for whole units, 0.1 for tenths)",
     )
+    p.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the on-disk parse cache for the CSV",
+    )
+    # Прежний флаг: кэш теперь выключен по умолчанию, флаг оставлен для старых скриптов.
+    p.add_argument("--no-cache", action="store_false", dest="cache", help=argparse.SUPPRESS)
+    p.add_argument(
+        "--result-cache",
+        action="store_true",
+        help="Reuse results of identical runs from the on-disk result cache",
+    )
 
-    args = p.parse_args()
-
-    feed = DataFeed.load_csv(args.csv)
-    eng = Engine()
+    args = p.parse_args(argv)
+    try:
+        strat = make_strategy(args)
+    except ValidationError as exc:
+        p.error(str(exc))
 
-    strat: Strategy
-    if args.strategy == "bh":
-        strat = BuyAndHold()
-    elif args.strategy == "ma":
-        strat = MovingAverageCross(fast=args.fast, slow=args.slow)
+    if args.store:
+        feed = DataFeed.open_store(args.store, start=args.start, end=args.end)
     else:
-        strat = DonchianBreakout(window=args.donchian_window)
+        feed = DataFeed.load_csv(args.csv, cache=args.cache).slice(args.start, args.end)
+    eng = Engine()
 
     eng.set_data(feed)
     eng.set_strategy(strat)
@@ -81,7 +172,16 @@ def main() -> None:
         )
     )
 
+    cache: ResultCache | None = None
+    if args.result_cache:
+        # Модуль кэша тянет inspect и json: без флага его не импортируем.
+        from backtester.core.result_cache import ResultCache
+
+        cache = ResultCache()
+    eng.set_cache(cache)
     result = eng.run()
+    if cache is not None:
+        print("Result cache:", "hit" if cache.hits else "miss" if cache.misses else "bypassed")
 
     print("\n=== METRICS ===")
     for k, v in result.metrics.items():
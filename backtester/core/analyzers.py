@@ -1,7 +1,18 @@
 from __future__ import annotations
 
+import math
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Protocol
+from itertools import accumulate, repeat
+from operator import countOf, mul, sub, truediv
+from typing import Dict, List, Protocol, Sequence, Tuple, cast
+
+# Бары копятся в буфере и передаются пакетным анализаторам кусками такой длины.
+CHUNK_SIZE = 4096
+
+_US_PER_YEAR = 365.25 * 86_400 * 1_000_000
 
 
 class Analyzer(Protocol):
@@ -11,6 +22,9 @@ class Analyzer(Protocol):
     Анализатор вызывается на каждом баре с текущей датой и equity,
     а в конце бэктеста возвращает набор метрик, которые попадают
     в BacktestResult.metrics.
+
+    Анализатор, у которого есть ``on_chunk`` (см. :class:`BatchAnalyzer`),
+    движки вызывают пакетно, а ``on_bar`` для него не используется.
     """
 
     name: str
@@ -27,12 +41,162 @@ class Analyzer(Protocol):
         ...
 
 
+@dataclass(slots=True)
+class EquityChunk:
+    """
+    Подряд идущие бары прогона для пакетных анализаторов.
+
+    ts
+        Метки времени баров, микросекунды от эпохи.
+
+    equity
+        Equity на закрытии каждого бара.
+
+    invested
+        Стоимость открытых позиций на закрытии бара (``0`` — вне рынка);
+        ``None``, если источник её не знает (склеенная кривая walk-forward).
+
+    prev
+        Equity на последнем баре предыдущего куска; ``None`` у первого.
+
+    Колонки принадлежат куску: движок не переиспользует их после
+    передачи, так что анализатор может хранить ссылки.
+    """
+
+    ts: Sequence[int]
+    equity: Sequence[float]
+    invested: Sequence[float] | None = None
+    prev: float | None = None
+    _returns: List[float] | None = field(default=None, init=False, repr=False)
+    _moments: Tuple[int, float, float, float] | None = field(default=None, init=False, repr=False)
+
+    def returns(self) -> List[float]:
+        """
+        Доходности бар к бару внутри куска (с учётом ``prev``).
+
+        Считаются один раз на кусок и общие для всех анализаторов.
+        """
+        if self._returns is None:
+            eq = self.equity
+            prevs = eq[:-1] if self.prev is None else [self.prev, *eq[:-1]]
+            cur = eq[1:] if self.prev is None else eq
+            if len(prevs) and min(prevs) > 0.0:
+                self._returns = list(map(sub, map(truediv, cur, prevs), repeat(1.0)))
+            else:
+                self._returns = [c / p - 1.0 if p > 0.0 else 0.0 for c, p in zip(cur, prevs)]
+        return self._returns
+
+    def moments(self) -> Tuple[int, float, float, float]:
+        """
+        Моменты доходностей куска: число, среднее, сумма квадратов
+        отклонений от среднего и сумма квадратов убытков.
+
+        Считается проходами ``map``/``math.fsum`` и кэшируется, так что
+        Шарп, Сортино и волатильность делят один проход.
+        """
+        if self._moments is None:
+            rets = self.returns()
+            n = len(rets)
+            if not n:
+                self._moments = (0, 0.0, 0.0, 0.0)
+            else:
+                mean = math.fsum(rets) / n
+                dev = list(map(sub, rets, repeat(mean)))
+                losses = [r for r in rets if r < 0.0]
+                self._moments = (n, mean, math.fsum(map(mul, dev, dev)), math.fsum(map(mul, losses, losses)))
+        return self._moments
+
+
+class BatchAnalyzer(Protocol):
+    """
+    Пакетный анализатор: получает колонки прогона кусками, а не по бару.
+
+    Движок на каждом баре только дописывает время, equity и стоимость
+    позиций в общий буфер (:class:`ChunkRecorder`), а анализаторы
+    вызываются раз на :data:`CHUNK_SIZE` баров и считают метрики проходами
+    ``map``/``accumulate`` по колонкам. Стоимость бара в цикле движка не
+    зависит от числа пакетных анализаторов.
+    """
+
+    name: str
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        """Учесть очередной кусок баров (куски идут по порядку времени)."""
+        ...
+
+    def finalize(self) -> Dict[str, float]:
+        """Вернуть метрики для BacktestResult.metrics."""
+        ...
+
+
+def split_analyzers(analyzers: Sequence[Analyzer | BatchAnalyzer]) -> Tuple[List[Analyzer], List[BatchAnalyzer]]:
+    """Разделить анализаторы на побаровые и пакетные (с ``on_chunk``)."""
+    per_bar: List[Analyzer] = []
+    batch: List[BatchAnalyzer] = []
+    for analyzer in analyzers:
+        if callable(getattr(analyzer, "on_chunk", None)):
+            batch.append(cast(BatchAnalyzer, analyzer))
+        else:
+            per_bar.append(cast(Analyzer, analyzer))
+    return per_bar, batch
+
+
+class ChunkRecorder:
+    """
+    Буфер колонок прогона для пакетных анализаторов.
+
+    Движок вызывает :meth:`push` (или :meth:`extend` для участка баров);
+    когда в буфере набирается ``size`` баров, он отдаётся анализаторам
+    одним :class:`EquityChunk`. :meth:`flush` в конце прогона отдаёт
+    остаток.
+    """
+
+    __slots__ = ("ts", "equity", "invested", "_analyzers", "_size", "_prev")
+
+    def __init__(self, analyzers: Sequence[BatchAnalyzer], size: int = CHUNK_SIZE) -> None:
+        self._analyzers = list(analyzers)
+        self._size = max(1, size)
+        self._prev: float | None = None
+        self.ts = array("q")
+        self.equity = array("d")
+        self.invested = array("d")
+
+    def push(self, ts: int, equity: float, invested: float) -> None:
+        self.ts.append(ts)
+        self.equity.append(equity)
+        self.invested.append(invested)
+        if len(self.equity) >= self._size:
+            self.flush()
+
+    def extend(self, ts: Sequence[int], equity: Sequence[float], invested: Sequence[float]) -> None:
+        self.ts.extend(ts)
+        self.equity.extend(equity)
+        self.invested.extend(invested)
+        if len(self.equity) >= self._size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.equity:
+            return
+        chunk = EquityChunk(self.ts, self.equity, self.invested, self._prev)
+        self._prev = self.equity[-1]
+        self.ts = array("q")
+        self.equity = array("d")
+        self.invested = array("d")
+        for analyzer in self._analyzers:
+            analyzer.on_chunk(chunk)
+
+
 class DrawdownAnalyzer:
     """
     Анализатор просадки по equity.
 
     Считает максимальную абсолютную просадку и максимальную
     относительную просадку (в процентах от предыдущего максимума).
+    Процент берётся на баре с наибольшей абсолютной просадкой.
+
+    Работает и побарово (``on_bar``), и пакетно (``on_chunk``): бегущий
+    максимум куска считается ``accumulate``, просадки — ``map``.
     """
 
     name = "drawdown"
@@ -56,6 +220,31 @@ class DrawdownAnalyzer:
             self._max_drawdown = drawdown
             self._max_drawdown_pct = drawdown / peak * 100.0
 
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        eq = chunk.equity
+        if not len(eq):
+            return
+        start = eq[0] if self._peak is None else self._peak
+        top = max(start, max(eq))
+        if top - min(eq) <= self._max_drawdown:
+            # Даже худший случай куска не превышает уже найденную просадку.
+            self._peak = top
+            return
+        peaks = list(accumulate(eq, max, initial=start))
+        del peaks[0]
+        self._peak = top
+        drawdowns = list(map(sub, peaks, eq))
+        # Бегущий максимум не убывает: бары с пиком <= 0 — префикс куска,
+        # просадка на них не считается (как в on_bar).
+        skip = bisect_right(peaks, 0.0)
+        if skip:
+            drawdowns[:skip] = [0.0] * skip
+        worst = max(drawdowns)
+        if worst > self._max_drawdown:
+            k = drawdowns.index(worst)
+            self._max_drawdown = worst
+            self._max_drawdown_pct = worst / peaks[k] * 100.0
+
     def finalize(self) -> Dict[str, float]:
         return {
             "max_drawdown": self._max_drawdown,
@@ -63,4 +252,251 @@ class DrawdownAnalyzer:
         }
 
 
-__all__ = ["Analyzer", "DrawdownAnalyzer"]
+class _Span:
+    """Первый и последний бар прогона: длина истории в годах и число баров."""
+
+    __slots__ = ("first_ts", "last_ts", "bars", "first_equity", "last_equity")
+
+    def __init__(self) -> None:
+        self.first_ts = 0
+        self.last_ts = 0
+        self.bars = 0
+        self.first_equity = 0.0
+        self.last_equity = 0.0
+
+    def update(self, chunk: EquityChunk) -> None:
+        n = len(chunk.equity)
+        if not n:
+            return
+        if not self.bars:
+            self.first_ts = chunk.ts[0]
+            self.first_equity = chunk.equity[0]
+        self.last_ts = chunk.ts[n - 1]
+        self.last_equity = chunk.equity[n - 1]
+        self.bars += n
+
+    def years(self) -> float:
+        return (self.last_ts - self.first_ts) / _US_PER_YEAR
+
+    def periods_per_year(self, override: float | None) -> float:
+        """Баров в году: ``override`` или частота, оценённая по истории."""
+        if override is not None:
+            return override
+        years = self.years()
+        return (self.bars - 1) / years if years > 0.0 else 0.0
+
+
+class _ReturnStats:
+    """
+    Моменты доходностей бар к бару, накопленные по кускам.
+
+    Моменты куска (:meth:`EquityChunk.moments`) сливаются с накопленными
+    по формуле Чана — без потери точности на длинных историях.
+    """
+
+    __slots__ = ("span", "n", "mean", "m2", "down_sq")
+
+    def __init__(self) -> None:
+        self.span = _Span()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.down_sq = 0.0
+
+    def update(self, chunk: EquityChunk) -> None:
+        self.span.update(chunk)
+        nb, mean_b, m2_b, down_b = chunk.moments()
+        if not nb:
+            return
+        self.down_sq += down_b
+        na = self.n
+        n = na + nb
+        delta = mean_b - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2_b + delta * delta * na * nb / n
+        self.n = n
+
+    def std(self) -> float:
+        """Выборочное стандартное отклонение доходностей."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def downside(self) -> float:
+        """Отклонение вниз от нуля: корень из среднего квадрата убытков."""
+        return math.sqrt(self.down_sq / self.n) if self.n else 0.0
+
+
+class SharpeAnalyzer:
+    """
+    Коэффициент Шарпа по доходностям бар к бару, в годовом выражении.
+
+    ``periods_per_year`` — число баров в году (252 для дневных баров
+    акций); по умолчанию оценивается по длине истории. ``risk_free`` —
+    годовая безрисковая ставка (доля).
+    """
+
+    name = "sharpe"
+
+    def __init__(self, periods_per_year: float | None = None, risk_free: float = 0.0) -> None:
+        self._ppy = periods_per_year
+        self._rf = risk_free
+        self._stats = _ReturnStats()
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        self._stats.update(chunk)
+
+    def finalize(self) -> Dict[str, float]:
+        st = self._stats
+        ppy = st.span.periods_per_year(self._ppy)
+        std = st.std()
+        if std <= 0.0 or ppy <= 0.0:
+            return {"sharpe": 0.0}
+        return {"sharpe": (st.mean - self._rf / ppy) / std * math.sqrt(ppy)}
+
+
+class SortinoAnalyzer:
+    """
+    Коэффициент Сортино: как Шарп, но в знаменателе — только убытки
+    (корень из среднего квадрата отрицательных доходностей).
+    """
+
+    name = "sortino"
+
+    def __init__(self, periods_per_year: float | None = None, risk_free: float = 0.0) -> None:
+        self._ppy = periods_per_year
+        self._rf = risk_free
+        self._stats = _ReturnStats()
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        self._stats.update(chunk)
+
+    def finalize(self) -> Dict[str, float]:
+        st = self._stats
+        ppy = st.span.periods_per_year(self._ppy)
+        down = st.downside()
+        if down <= 0.0 or ppy <= 0.0:
+            return {"sortino": 0.0}
+        return {"sortino": (st.mean - self._rf / ppy) / down * math.sqrt(ppy)}
+
+
+class VolatilityAnalyzer:
+    """Годовая волатильность доходностей бар к бару, в процентах."""
+
+    name = "volatility"
+
+    def __init__(self, periods_per_year: float | None = None) -> None:
+        self._ppy = periods_per_year
+        self._stats = _ReturnStats()
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        self._stats.update(chunk)
+
+    def finalize(self) -> Dict[str, float]:
+        st = self._stats
+        ppy = st.span.periods_per_year(self._ppy)
+        return {"volatility_pct": st.std() * math.sqrt(ppy) * 100.0 if ppy > 0.0 else 0.0}
+
+
+class CagrAnalyzer:
+    """
+    Среднегодовой темп роста equity (CAGR), в процентах.
+
+    Считается от первого до последнего бара кривой по календарному
+    времени между ними.
+    """
+
+    name = "cagr"
+
+    def __init__(self) -> None:
+        self._span = _Span()
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        self._span.update(chunk)
+
+    def finalize(self) -> Dict[str, float]:
+        return {"cagr_pct": _cagr_pct(self._span)}
+
+
+class CalmarAnalyzer:
+    """Коэффициент Калмара: CAGR, делённый на максимальную просадку (оба в процентах)."""
+
+    name = "calmar"
+
+    def __init__(self) -> None:
+        self._span = _Span()
+        self._drawdown = DrawdownAnalyzer()
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        self._span.update(chunk)
+        self._drawdown.on_chunk(chunk)
+
+    def finalize(self) -> Dict[str, float]:
+        dd_pct = self._drawdown.finalize()["max_drawdown_pct"]
+        return {"calmar": _cagr_pct(self._span) / dd_pct if dd_pct > 0.0 else 0.0}
+
+
+class ExposureAnalyzer:
+    """
+    Время в рынке.
+
+    ``exposure_pct`` — доля баров с открытой позицией, ``avg_exposure_pct`` —
+    средняя доля equity, вложенная в позиции. Нужна колонка
+    ``EquityChunk.invested``; без неё метрики не возвращаются.
+    """
+
+    name = "exposure"
+
+    def __init__(self) -> None:
+        self._bars = 0
+        self._in_market = 0
+        self._weights: List[float] = []
+        self._known = True
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        inv = chunk.invested
+        if inv is None:
+            self._known = False
+            return
+        n = len(inv)
+        self._bars += n
+        self._in_market += n - countOf(inv, 0.0)
+        eq = chunk.equity
+        if n and min(eq) > 0.0:
+            self._weights.append(math.fsum(map(truediv, inv, eq)))
+        else:
+            self._weights.append(math.fsum([v / e for v, e in zip(inv, eq) if e > 0.0]))
+
+    def finalize(self) -> Dict[str, float]:
+        if not self._known:
+            return {}
+        if not self._bars:
+            return {"exposure_pct": 0.0, "avg_exposure_pct": 0.0}
+        return {
+            "exposure_pct": self._in_market / self._bars * 100.0,
+            "avg_exposure_pct": math.fsum(self._weights) / self._bars * 100.0,
+        }
+
+
+def _cagr_pct(span: _Span) -> float:
+    years = span.years()
+    if years <= 0.0 or span.first_equity <= 0.0:
+        return 0.0
+    if span.last_equity <= 0.0:
+        return -100.0
+    return ((span.last_equity / span.first_equity) ** (1.0 / years) - 1.0) * 100.0
+
+
+__all__ = [
+    "Analyzer",
+    "BatchAnalyzer",
+    "CHUNK_SIZE",
+    "CagrAnalyzer",
+    "CalmarAnalyzer",
+    "ChunkRecorder",
+    "DrawdownAnalyzer",
+    "EquityChunk",
+    "ExposureAnalyzer",
+    "SharpeAnalyzer",
+    "SortinoAnalyzer",
+    "VolatilityAnalyzer",
+    "split_analyzers",
+]
@@ -0,0 +1,376 @@
+"""
+Колоночное хранилище баров на диске, открываемое через ``mmap``.
+
+Формат файла (все смещения кратны размеру страницы ``_ALIGN``)::
+
+    заголовок | индекс чанков | колонка ts | open | high | low | close | volume
+
+* заголовок — magic, порядок байт, часовой пояс, размер чанка,
+  число строк и число чанков;
+* индекс чанков — для каждого чанка из ``chunk_rows`` строк пара
+  (min_ts, max_ts) в микросекундах от epoch;
+* колонки — непрерывные массивы int64 (время) и float64 (цены/объём)
+  на весь файл, бары отсортированы по времени без дубликатов.
+
+Поскольку каждая колонка непрерывна, диапазон строк отображается в один
+``memoryview`` на колонку без копирования, а индекс чанков позволяет найти
+этот диапазон, не читая колонку времени целиком.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone, tzinfo
+from itertools import islice
+from typing import Any, BinaryIO, List, Literal, Tuple
+
+from .datafeed import SERIES, CsvChunkReader, DataFeed, to_epoch_us
+from .errors import ValidationError
+
+DEFAULT_CHUNK_ROWS = 65_536
+
+_MAGIC = b"BTSTORE1"
+# magic, порядок байт, флаг tz, смещение tz (с), строк в чанке, строк всего, чанков
+_HEADER = struct.Struct("<8scbiIqq")
+_CHUNK = struct.Struct("<qq")
+_BYTEORDER = b"<" if sys.byteorder == "little" else b">"
+_ALIGN = mmap.ALLOCATIONGRANULARITY
+_COPY_ROWS = 1 << 16
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(n_rows: int, n_chunks: int) -> Tuple[int, int]:
+    """Смещение первой колонки и шаг между колонками в байтах."""
+    data_start = _align(_HEADER.size + n_chunks * _CHUNK.size)
+    return data_start, _align(n_rows * 8)
+
+
+def _tz_fields(tz: tzinfo | None) -> Tuple[int, int]:
+    if tz is None:
+        return 0, 0
+    offset = tz.utcoffset(None)
+    if offset is None or timezone(offset) != tz:
+        raise ValidationError("Bar store supports only naive or fixed-offset timestamps")
+    return 1, int(offset.total_seconds())
+
+
+def _check_header(mm: mmap.mmap, path: str) -> Tuple[bytes, bytes, int, int, int, int, int]:
+    try:
+        header = _HEADER.unpack_from(mm)
+    except struct.error as e:
+        raise ValidationError(f"Not a bar store file: {path}") from e
+    if header[0] != _MAGIC:
+        raise ValidationError(f"Not a bar store file: {path}")
+    if header[1] != _BYTEORDER:
+        raise ValidationError("Bar store was written with a different byte order")
+    return header
+
+
+class BarStore:
+    """
+    Открытый файл хранилища баров.
+
+    Заголовок и индекс чанков читаются при открытии; сами колонки
+    не читаются, пока к ним не обратятся через :meth:`feed`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, byteorder, tz_flag, tz_offset, chunk_rows, n_rows, n_chunks = _check_header(self._mm, path)
+        except ValidationError:
+            self._mm.close()
+            raise
+        self.chunk_rows: int = chunk_rows
+        self.n_rows: int = n_rows
+        self.tz: tzinfo | None = timezone(timedelta(seconds=tz_offset)) if tz_flag else None
+        self._chunk_min: List[int] = []
+        self._chunk_max: List[int] = []
+        for k in range(n_chunks):
+            lo, hi = _CHUNK.unpack_from(self._mm, _HEADER.size + k * _CHUNK.size)
+            self._chunk_min.append(lo)
+            self._chunk_max.append(hi)
+        self._data_start, self._stride = _layout(n_rows, n_chunks)
+
+    def close(self) -> None:
+        """
+        Закрыть отображение файла.
+
+        Фиды, полученные через :meth:`feed`, читают данные прямо из
+        отображения: пока они живы, закрытие невозможно (``BufferError``).
+        """
+        self._mm.close()
+
+    def __enter__(self) -> "BarStore":
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.close()
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self._chunk_min)
+
+    def _column(self, k: int, fmt: Literal["q", "d"]) -> "memoryview[Any]":
+        off = self._data_start + k * self._stride
+        return memoryview(self._mm)[off : off + 8 * self.n_rows].cast(fmt)
+
+    def chunk_range(self, start: datetime | None = None, end: datetime | None = None) -> Tuple[int, int]:
+        """Полуинтервал номеров чанков, которые пересекаются с ``[start, end)``."""
+        c_lo = 0 if start is None else bisect_left(self._chunk_max, to_epoch_us(start))
+        c_hi = self.n_chunks if end is None else bisect_left(self._chunk_min, to_epoch_us(end))
+        return c_lo, max(c_lo, c_hi)
+
+    def row_range(self, start: datetime | None = None, end: datetime | None = None) -> Tuple[int, int]:
+        """
+        Полуинтервал строк с ``start <= dt < end``.
+
+        Сначала по индексу выбираются чанки, затем бинарный поиск идёт
+        только внутри крайних чанков, так что читаются лишь их страницы.
+        """
+        c_lo, c_hi = self.chunk_range(start, end)
+        if c_lo >= c_hi:
+            row = min(c_lo * self.chunk_rows, self.n_rows)
+            return row, row
+        ts = self._column(0, "q")
+        lo = c_lo * self.chunk_rows
+        hi = min(c_hi * self.chunk_rows, self.n_rows)
+        if start is not None:
+            lo = bisect_left(ts, to_epoch_us(start), lo, min(lo + self.chunk_rows, hi))
+        if end is not None:
+            hi = bisect_left(ts, to_epoch_us(end), max(lo, (c_hi - 1) * self.chunk_rows), hi)
+        return lo, hi
+
+    def feed(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        symbol: str = "",
+        timeframe: str = "",
+    ) -> DataFeed:
+        """DataFeed поверх отображённых колонок (без копирования) для ``[start, end)``."""
+        lo, hi = self.row_range(start, end)
+        ts = self._column(0, "q")[lo:hi]
+        cols = [self._column(k + 1, "d")[lo:hi] for k in range(len(SERIES))]
+        return DataFeed.from_columns(
+            ts,
+            cols[0],
+            cols[1],
+            cols[2],
+            cols[3],
+            cols[4],
+            symbol=symbol,
+            timeframe=timeframe,
+            tz=self.tz,
+        )
+
+
+def write_store(feed: DataFeed, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    """
+    Записать фид в файл хранилища.
+
+    Неотсортированный фид (или фид с повторяющимися датами) сортируется
+    в копии: переданный фид не меняется.
+    """
+    if chunk_rows <= 0:
+        raise ValidationError("chunk_rows must be > 0")
+    ts = feed.timestamps()
+    if not all(a < b for a, b in zip(ts, islice(ts, 1, None))):
+        cols = [array("d", feed.column(name)) for name in SERIES]
+        feed = DataFeed.from_columns(
+            array("q", ts),
+            cols[0],
+            cols[1],
+            cols[2],
+            cols[3],
+            cols[4],
+            symbol=feed.symbol,
+            timeframe=feed.timeframe,
+            tz=feed.tz,
+        )
+        feed.sort_and_validate()
+    tz_flag, tz_offset = _tz_fields(feed.tz)
+    columns = [feed.timestamps(), *(feed.column(name) for name in SERIES)]
+    n = feed.size()
+    with _AtomicFile(path) as f:
+        _write_header(f, tz_flag, tz_offset, chunk_rows, n)
+        for col in columns:
+            _write_column(f, memoryview(col).cast("B"))
+        _write_chunk_index(f, chunk_rows, n)
+
+
+def convert_csv(csv_path: str, store_path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """
+    Сконвертировать CSV (любой формат, который понимает :meth:`DataFeed.load_csv`)
+    в файл хранилища. Возвращает число записанных баров.
+
+    CSV разбирается потоково блоками :class:`CsvChunkReader`, колонки
+    складываются во временные файлы рядом с результатом, так что память
+    не зависит от длины файла. Это работает для данных, упорядоченных по
+    времени строго по возрастанию или строго по убыванию (как выгрузки Nasdaq).
+    Неупорядоченный CSV или CSV с повторяющимися датами загружается в память
+    целиком, сортируется и записывается через :func:`write_store`.
+    """
+    if chunk_rows <= 0:
+        raise ValidationError("chunk_rows must be > 0")
+    directory = os.path.dirname(os.path.abspath(store_path))
+    reader = CsvChunkReader(csv_path)
+    spills = [tempfile.TemporaryFile(dir=directory) for _ in range(1 + len(SERIES))]
+    try:
+        n = 0
+        ascending = descending = True
+        last: int | None = None
+        for chunk in reader:
+            ts = chunk[0]
+            if len(ts) == 0:
+                continue
+            if last is not None:
+                ascending = ascending and last < ts[0]
+                descending = descending and last > ts[0]
+            if ascending:
+                ascending = all(a < b for a, b in zip(ts, islice(ts, 1, None)))
+            if descending:
+                descending = all(a > b for a, b in zip(ts, islice(ts, 1, None)))
+            if not (ascending or descending):
+                break
+            last = ts[-1]
+            n += len(ts)
+            for k, spill in enumerate(spills):
+                chunk[k].tofile(spill)
+
+        if not (ascending or descending):
+            feed = DataFeed.load_csv(csv_path)
+            write_store(feed, store_path, chunk_rows)
+            return feed.size()
+
+        tz_flag, tz_offset = _tz_fields(reader.tz)
+        with _AtomicFile(store_path) as f:
+            _write_header(f, tz_flag, tz_offset, chunk_rows, n)
+            for spill in spills:
+                if ascending:
+                    _copy_forward(spill, f)
+                else:
+                    _copy_reversed(spill, f, 8 * n)
+                _pad(f)
+            _write_chunk_index(f, chunk_rows, n)
+        return n
+    finally:
+        for spill in spills:
+            spill.close()
+
+
+class _AtomicFile:
+    """Запись во временный файл с переименованием в ``path`` при успехе."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        fd, self._tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        self._f: BinaryIO = os.fdopen(fd, "w+b")
+
+    def __enter__(self) -> BinaryIO:
+        return self._f
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self._f.close()
+        if exc_type is None:
+            os.replace(self._tmp, self.path)
+        else:
+            os.unlink(self._tmp)
+
+
+def _write_header(f: BinaryIO, tz_flag: int, tz_offset: int, chunk_rows: int, n: int) -> None:
+    n_chunks = (n + chunk_rows - 1) // chunk_rows
+    data_start, _ = _layout(n, n_chunks)
+    f.write(_HEADER.pack(_MAGIC, _BYTEORDER, tz_flag, tz_offset, chunk_rows, n, n_chunks))
+    f.write(b"\0" * (data_start - _HEADER.size))
+
+
+def _pad(f: BinaryIO) -> None:
+    pos = f.tell()
+    f.write(b"\0" * (_align(pos) - pos))
+
+
+def _write_column(f: BinaryIO, data: memoryview) -> None:
+    f.write(data)
+    _pad(f)
+
+
+def _copy_forward(src: BinaryIO, dst: BinaryIO) -> None:
+    src.seek(0)
+    block = 8 * _COPY_ROWS
+    for data in iter(lambda: src.read(block), b""):
+        dst.write(data)
+
+
+def _copy_reversed(src: BinaryIO, dst: BinaryIO, nbytes: int) -> None:
+    """Скопировать колонку из 8-байтных значений в обратном порядке блоками."""
+    block = 8 * _COPY_ROWS
+    end = nbytes
+    while end > 0:
+        begin = max(0, end - block)
+        src.seek(begin)
+        buf = array("q")
+        buf.frombytes(src.read(end - begin))
+        buf.reverse()
+        buf.tofile(dst)
+        end = begin
+
+
+def _write_chunk_index(f: BinaryIO, chunk_rows: int, n: int) -> None:
+    """Дописать в заголовок (min_ts, max_ts) каждого чанка по уже записанной колонке ts."""
+    n_chunks = (n + chunk_rows - 1) // chunk_rows
+    data_start, _ = _layout(n, n_chunks)
+    f.flush()
+    index = bytearray()
+    first = array("q")
+    for k in range(n_chunks):
+        lo = k * chunk_rows
+        hi = min(lo + chunk_rows, n)
+        f.seek(data_start + 8 * lo)
+        first.frombytes(f.read(8))
+        f.seek(data_start + 8 * (hi - 1))
+        first.frombytes(f.read(8))
+        index += _CHUNK.pack(first[-2], first[-1])
+    f.seek(_HEADER.size)
+    f.write(index)
+
+
+def main() -> None:
+    """
+    Конвертер CSV -> хранилище баров.
+
+    Пример запуска:
+
+        python -m backtester.core.barstore backtester/data/AAPL_5Y.csv aapl.bts
+    """
+    p = argparse.ArgumentParser(description="Convert CSV bars to the mmap bar store format")
+    p.add_argument("csv", help="Source CSV file")
+    p.add_argument("store", help="Destination bar store file")
+    p.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="Rows per index chunk",
+    )
+    args = p.parse_args()
+    n = convert_csv(args.csv, args.store, args.chunk_rows)
+    print(f"Wrote {n} bars to {args.store}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["BarStore", "write_store", "convert_csv", "DEFAULT_CHUNK_ROWS"]
@@ -1,16 +1,88 @@
 from __future__ import annotations
 
+import math
 from typing import List
 
 from .datafeed import DataFeed
-from .enums import ActionSide, ExecutionMode, TradeSide
+from .stream import StreamFeed
+from .enums import ActionSide, ExecutionMode, OrderType, TradeSide
+from .orders import BarSearch, trigger_price
 from .types import Action, Trade
 
+# Допуск, с которым стоимость ордера может превышать кэш (ошибки float).
+CASH_TOLERANCE = 1e-9
+
+
+def lot_count(qty: float, lot_size: float) -> int:
+    """
+    Число целых лотов в ``qty``: наибольшее ``k`` с ``k * lot_size <= qty``
+    (``lot_size > 0``).
+
+    Деление float может недобрать: ``3 * 0.7 / 0.7 == 2.9999999999999996``,
+    и ``int()`` потерял бы целый лот у количества, которое само получено
+    как ``k * lot_size``. Частное поправляется сравнением произведений.
+    """
+    k = int(qty / lot_size)
+    if (k + 1) * lot_size <= qty:
+        k += 1
+    elif k > 0 and k * lot_size > qty:
+        k -= 1
+    return k
+
+
+def affordable_qty(price: float, qty: float, cash: float, commission_pct: float, lot_size: float) -> float:
+    """
+    Наибольшее количество не больше ``qty``, которое можно оплатить кэшем.
+
+    Количество кратно ``lot_size`` (``m * lot_size`` для целого ``m``), а
+    стоимость с комиссией ``price * q * (1 + commission_pct)`` превышает
+    ``cash`` не больше чем на :data:`CASH_TOLERANCE`. Число лотов ``m``
+    считается один раз целым (:func:`lot_count`) за ``O(1)``, а не
+    вычитанием лота по одному;
+    результат затем проверяется тем же условием, что и сделка, и
+    сдвигается на лот, если округление float ошиблось на границе.
+    При ``lot_size <= 0`` количество не округляется.
+    """
+    mult = 1.0 + commission_pct
+
+    def fits(q: float) -> bool:
+        return price * q * mult - cash <= CASH_TOLERANCE
+
+    if lot_size <= 0:
+        q = qty
+        if not fits(q):
+            q = max(0.0, min(qty, (cash + CASH_TOLERANCE) / (price * mult)))
+            while q > 0 and not fits(q):
+                q = math.nextafter(q, 0.0)
+        return q
+
+    k = lot_count(qty, lot_size)
+    unit = price * mult * lot_size
+    m = k if unit <= 0 else max(0, min(k, int((cash + CASH_TOLERANCE) / unit)))
+    while m > 0 and not fits(m * lot_size):
+        m -= 1
+    while m < k and fits((m + 1) * lot_size):
+        m += 1
+    return m * lot_size
+
 
 class Broker:
     """
-    Простейший брокер: long-only, рыночные ордера,
-    процентная комиссия и округление количества по шагу лота.
+    Простейший брокер: long-only, процентная комиссия и округление
+    количества по шагу лота.
+
+    Рыночные ордера исполняются по close или open (режим исполнения).
+    Лимитные и стоп-ордера (``Action.limit``/``Action.stop``) ставятся
+    методом :meth:`place` и ждут в книге: на каждом следующем баре
+    :meth:`fill_orders` проверяет их по open/high/low (см.
+    :func:`~backtester.core.orders.trigger_price`). Новый ордер той же
+    стороны и типа заменяет прежний; исполнение ордера снимает остальные
+    ордера той же стороны (стоп и тейк-профит работают как OCO). Ордер,
+    который сейчас исполнить нечем (продажа без позиции), остаётся в книге.
+
+    При ``record_trades=False`` сделки только считаются
+    (:meth:`trade_count`): объекты ``Trade`` не создаются, а
+    :meth:`execute` возвращает ``None``.
     """
 
     def __init__(
@@ -18,6 +90,7 @@ class Broker:
         commission_pct: float = 0.0,
         exec_mode: ExecutionMode = ExecutionMode.ON_CLOSE,
         lot_size: float = 1.0,
+        record_trades: bool = True,
     ) -> None:
         self._commission_pct = float(commission_pct)
         self._exec_mode = exec_mode
@@ -26,12 +99,17 @@ class Broker:
         self._position_qty: float = 0.0
         self._entry_price: float = 0.0
         self._trades: List[Trade] = []
+        self._record_trades = record_trades
+        self._trade_count = 0
+        self._orders: List[Action] = []
 
     def reset(self, initial_cash: float, lot_size: float | None = None) -> None:
         self._cash = float(initial_cash)
         self._position_qty = 0.0
         self._entry_price = 0.0
         self._trades.clear()
+        self._trade_count = 0
+        self._orders.clear()
         if lot_size is not None:
             self._lot_size = float(lot_size)
 
@@ -45,26 +123,89 @@ class Broker:
     def get_trades(self) -> List[Trade]:
         return list(self._trades)
 
-    def _price_for_exec(self, i: int, feed: DataFeed) -> float:
-        bar = feed.get(i)
-        return bar.close if self._exec_mode is ExecutionMode.ON_CLOSE else bar.open
+    def trade_count(self) -> int:
+        """Число исполненных сделок (ведётся и без записи ``Trade``)."""
+        return self._trade_count
+
+    def get_orders(self) -> List[Action]:
+        """Отложенные (лимитные и стоп) ордера в книге."""
+        return list(self._orders)
 
-    def execute(self, act: Action, i: int, feed: DataFeed) -> Trade | None:
+    def place(self, act: Action) -> None:
+        """Поставить лимитный или стоп-ордер; он может исполниться начиная со следующего бара."""
+        if act.order_type is OrderType.MARKET:
+            raise ValueError("place() expects a limit or stop order")
+        orders = self._orders
+        orders[:] = [o for o in orders if o.side is not act.side or o.order_type is not act.order_type]
+        orders.append(act)
+
+    def cancel_orders(self, side: ActionSide | None = None) -> None:
+        """Снять отложенные ордера (все или одной стороны)."""
+        if side is None:
+            self._orders.clear()
+        else:
+            self._orders[:] = [o for o in self._orders if o.side is not side]
+
+    def fill_orders(self, i: int, feed: DataFeed | StreamFeed) -> None:
+        """
+        Исполнить отложенные ордера, которые задел бар ``i``.
+
+        Покупки проверяются раньше продаж: вход по стопу и защитный стоп,
+        сработавшие на одном баре, дают вход и выход. Внутри стороны —
+        в порядке постановки.
+        """
+        orders = self._orders
+        if not orders:
+            return
+        o = feed.column("open")[i]
+        h = feed.column("high")[i]
+        l = feed.column("low")[i]
+        for side in (ActionSide.BUY, ActionSide.SELL):
+            for act in [a for a in orders if a.side is side]:
+                price = trigger_price(act, o, h, l)
+                if price is not None and self._fill(side, act.qty_hint, price, i, feed):
+                    orders[:] = [a for a in orders if a.side is not side]
+                    break
+
+    def next_fill(self, start: int, search: BarSearch) -> int:
+        """
+        Ближайший бар ``>= start``, на котором может исполниться ордер из книги.
+
+        Продажи без позиции не учитываются — исполнить их нечем.
+        """
+        best = len(search)
+        for act in self._orders:
+            if act.side is ActionSide.SELL and self._position_qty <= 0:
+                continue
+            best = min(best, search.next_trigger(start, act))
+        return best
+
+    def _price_for_exec(self, i: int, feed: DataFeed | StreamFeed) -> float:
+        series = "close" if self._exec_mode is ExecutionMode.ON_CLOSE else "open"
+        return feed.column(series)[i]
+
+    def execute(self, act: Action, i: int, feed: DataFeed | StreamFeed) -> Trade | None:
         if act.side is ActionSide.HOLD:
             return None
-        price = self._price_for_exec(i, feed)
-        dt = feed.get(i).dt
+        if act.order_type is not OrderType.MARKET:
+            self.place(act)
+            return None
+        if not self._fill(act.side, act.qty_hint, self._price_for_exec(i, feed), i, feed):
+            return None
+        return self._trades[-1] if self._record_trades else None
 
-        if act.side is ActionSide.BUY:
-            qty = self._desired_buy_qty(price, act.qty_hint)
+    def _fill(self, side: ActionSide, qty_hint: float, price: float, i: int, feed: DataFeed | StreamFeed) -> bool:
+        """Исполнить сделку по цене ``price``; ``False``, если исполнять нечего."""
+        if side is ActionSide.BUY:
+            qty = self._desired_buy_qty(price, qty_hint)
             if qty <= 0:
-                return None
+                return False
             commission = price * qty * self._commission_pct
             cost = price * qty + commission
-            if cost > self._cash + 1e-9:
-                qty = self._shrink_qty_for_cash(price, qty)
+            if cost > self._cash + CASH_TOLERANCE:
+                qty = affordable_qty(price, qty, self._cash, self._commission_pct, self._lot_size)
                 if qty <= 0:
-                    return None
+                    return False
                 commission = price * qty * self._commission_pct
                 cost = price * qty + commission
             self._cash -= cost
@@ -74,23 +215,18 @@ class Broker:
                     self._entry_price * self._position_qty + price * qty
                 ) / new_qty
             self._position_qty = new_qty
-            tr = Trade(
-                dt=dt,
-                side=TradeSide.BUY,
-                price=price,
-                qty=qty,
-                commission=commission,
-            )
-            self._trades.append(tr)
-            return tr
+            self._trade_count += 1
+            if self._record_trades:
+                self._trades.append(Trade.unchecked(feed.dt(i), TradeSide.BUY, price, qty, commission))
+            return True
 
         # SELL
         sellable = self._position_qty
         if sellable <= 0:
-            return None
-        qty = self._desired_sell_qty(act.qty_hint, sellable)
+            return False
+        qty = self._desired_sell_qty(qty_hint, sellable)
         if qty <= 0:
-            return None
+            return False
         commission = price * qty * self._commission_pct
         proceeds = price * qty - commission
         self._cash += proceeds
@@ -98,15 +234,10 @@ class Broker:
         if self._position_qty <= 0:
             self._position_qty = 0.0
             self._entry_price = 0.0
-        tr = Trade(
-            dt=dt,
-            side=TradeSide.SELL,
-            price=price,
-            qty=qty,
-            commission=commission,
-        )
-        self._trades.append(tr)
-        return tr
+        self._trade_count += 1
+        if self._record_trades:
+            self._trades.append(Trade.unchecked(feed.dt(i), TradeSide.SELL, price, qty, commission))
+        return True
 
     def _desired_buy_qty(self, price: float, qty_hint: float) -> float:
         """
@@ -125,14 +256,6 @@ class Broker:
             qty = self._cash / denom
         return self._round_qty(qty)
 
-    def _shrink_qty_for_cash(self, price: float, qty: float) -> float:
-        while (
-            qty > 0
-            and price * qty * (1.0 + self._commission_pct) - self._cash > 1e-9
-        ):
-            qty -= self._lot_size
-        return self._round_qty(max(qty, 0.0))
-
     def _desired_sell_qty(self, qty_hint: float, sellable: float) -> float:
         qty = sellable if qty_hint <= 0 else min(qty_hint, sellable)
         return self._round_qty(qty)
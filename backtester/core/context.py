@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import List
 
 from .broker import Broker
 from .datafeed import DataFeed
-from .types import Bar
+from .enums import ActionSide
+from .errors import ValidationError
+from .stream import StreamFeed
+from .types import Action, Bar
 
 
 class Context:
     """Реализация StrategyContext для движка."""
 
-    def __init__(self, feed: DataFeed, broker: Broker) -> None:
+    def __init__(self, feed: DataFeed | StreamFeed, broker: Broker) -> None:
         self._feed = feed
         self._broker = broker
         self._i = 0
+        # Колонки фида кэшируются один раз: price() — это одно обращение
+        # к словарю и одно к массиву, без сборки объекта Bar.
+        self._cols = feed.columns()
+        self._close = self._cols["close"]
 
     def set_index(self, i: int) -> None:
         self._i = i
@@ -25,11 +33,26 @@ class Context:
         return self._feed.get(self._i)
 
     def time(self) -> datetime:
-        return self.bar().dt
+        return self._feed.dt(self._i)
 
     def price(self, series: str = "close") -> float:
-        b = self.bar()
-        return getattr(b, series)
+        try:
+            return self._cols[series][self._i]
+        except KeyError:
+            raise ValidationError(f"Unknown price series: {series}") from None
+
+    def history(self, series: str = "close", n: int = 1) -> memoryview:
+        """
+        Последние ``n`` значений ряда, включая текущий бар (старые — первыми).
+
+        Возвращается ``memoryview`` поверх хранилища фида, без копирования;
+        в начале истории значений может быть меньше ``n``. В потоковом
+        режиме доступно не больше ``lookback`` баров стратегии.
+        """
+        if n <= 0:
+            raise ValidationError(f"History length must be > 0, got {n}")
+        end = self._i + 1
+        return self._feed.window(series, max(0, end - n), end)
 
     def position_size(self) -> float:
         return self._broker.get_position_qty()
@@ -37,5 +60,13 @@ class Context:
     def cash(self) -> float:
         return self._broker.get_cash()
 
+    def orders(self) -> List[Action]:
+        """Отложенные лимитные и стоп-ордера, ещё не исполненные брокером."""
+        return self._broker.get_orders()
+
+    def cancel_orders(self, side: ActionSide | None = None) -> None:
+        """Снять отложенные ордера (все или только одной стороны)."""
+        self._broker.cancel_orders(side)
+
     def equity(self) -> float:
-        return self._broker.get_cash() + self._broker.get_position_qty() * self.price("close")
+        return self._broker.get_cash() + self._broker.get_position_qty() * self._close[self._i]
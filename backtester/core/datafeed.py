@@ -1,23 +1,122 @@
 from __future__ import annotations
 
 import csv
-from datetime import datetime
-from typing import List
+import hashlib
+from array import array
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from bisect import bisect_left
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Sequence, Tuple, Union
 
 from .errors import ValidationError
+from .orders import BarSearch
 from .types import Bar
 
+if TYPE_CHECKING:
+    from .feed_cache import FeedCache
+
+# Имена ценовых рядов, которые хранятся в колонках float64.
+SERIES = ("open", "high", "low", "close", "volume")
+
+# Имя ряда -> атрибут DataFeed с колонкой.
+_COLUMN_ATTRS = {name: f"_{name}" for name in SERIES}
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_US_PER_DAY = 86_400 * 1_000_000
+
+# Сколько строк CSV разбирается за один блок.
+CSV_CHUNK_ROWS = 65_536
+
+# Блок колонок (ts, open, high, low, close, volume).
+Columns = Tuple["array[int]", "array[float]", "array[float]", "array[float]", "array[float]", "array[float]"]
+
+# Колонка фида: массив в памяти или memoryview (срез по датам, файл через mmap).
+IntColumn = Union["array[int]", memoryview]
+FloatColumn = Union["array[float]", memoryview]
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """Перевести datetime в микросекунды от epoch (aware-даты приводятся к UTC)."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _US
+
+
+def from_epoch_us(ts: int, tz: tzinfo | None = None) -> datetime:
+    """Обратное преобразование к :func:`to_epoch_us`."""
+    dt = _EPOCH + timedelta(microseconds=ts)
+    if tz is not None:
+        dt = dt.replace(tzinfo=timezone.utc).astimezone(tz)
+    return dt
+
 
 class DataFeed:
-    """Источник баров OHLCV, загружаемый из CSV."""
+    """
+    Источник баров OHLCV, загружаемый из CSV.
+
+    Данные хранятся по колонкам: непрерывные массивы float64 для
+    open/high/low/close/volume и int64 для времени (микросекунды от epoch).
+    Метод :meth:`get` собирает объект :class:`Bar` по требованию и оставлен
+    для совместимости; движок, контекст и брокер читают колонки напрямую.
+    """
 
     def __init__(self, bars: List[Bar], symbol: str = "", timeframe: str = "") -> None:
-        self._bars = bars
         self.symbol = symbol
         self.timeframe = timeframe
+        self._tz: tzinfo | None = bars[0].dt.tzinfo if bars else None
+        self._ts: IntColumn = array("q", [to_epoch_us(b.dt) for b in bars])
+        self._open: FloatColumn = array("d", [b.open for b in bars])
+        self._high: FloatColumn = array("d", [b.high for b in bars])
+        self._low: FloatColumn = array("d", [b.low for b in bars])
+        self._close: FloatColumn = array("d", [b.close for b in bars])
+        self._volume: FloatColumn = array("d", [b.volume for b in bars])
+        self._search: BarSearch | None = None
+        self._fingerprint: str | None = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        ts: IntColumn,
+        open_: FloatColumn,
+        high: FloatColumn,
+        low: FloatColumn,
+        close: FloatColumn,
+        volume: FloatColumn,
+        symbol: str = "",
+        timeframe: str = "",
+        tz: tzinfo | None = None,
+    ) -> "DataFeed":
+        """
+        Собрать фид из готовых колонок без промежуточных объектов Bar.
+
+        ``ts`` — время в микросекундах от epoch (UTC для aware-дат),
+        остальные колонки — значения float. Все колонки должны быть одной длины.
+        Колонки не копируются: можно передавать ``memoryview`` (например,
+        поверх ``mmap``), фид будет читать данные прямо из них.
+        """
+        n = len(ts)
+        for col in (open_, high, low, close, volume):
+            if len(col) != n:
+                raise ValidationError("DataFeed columns must be equal length")
+        feed = cls([], symbol=symbol, timeframe=timeframe)
+        feed._tz = tz
+        feed._ts = ts
+        feed._open = open_
+        feed._high = high
+        feed._low = low
+        feed._close = close
+        feed._volume = volume
+        return feed
 
     @staticmethod
-    def load_csv(path: str, symbol: str = "", timeframe: str = "") -> "DataFeed":
+    def load_csv(
+        path: str,
+        symbol: str = "",
+        timeframe: str = "",
+        cache: "bool | FeedCache" = False,
+    ) -> "DataFeed":
         """
         Загрузка баров из CSV.
 
@@ -32,68 +131,55 @@ class DataFeed:
         * числовые значения могут содержать символ ``$`` и/или разделитель тысяч ``,``
           (например: ``278.85``, ``$278.85``, ``20,135,620``)
         * даты могут быть в форматах ``YYYY-MM-DD[ HH:MM:SS]`` или ``MM/DD/YYYY``
+
+        Файл читается блоками по :data:`CSV_CHUNK_ROWS` строк
+        (см. :class:`CsvChunkReader`).
+
+        При ``cache=True`` (или переданном экземпляре
+        :class:`~backtester.core.feed_cache.FeedCache`) результат разбора
+        сохраняется в бинарный кэш на диске, и повторная загрузка того же
+        неизменённого файла читает кэш вместо CSV. Переменная окружения
+        ``BACKTESTER_CSV_CACHE=0`` отключает кэш глобально.
         """
-        bars: List[Bar] = []
-
-        with open(path, newline="") as f:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames or []
-            fieldnames_lower = {name.lower() for name in fieldnames}
-
-            # дата: datetime/date
-            if "datetime" in fieldnames_lower:
-                dt_col = "datetime"
-            elif "date" in fieldnames_lower:
-                dt_col = "date"
-            else:
-                raise ValidationError("CSV must contain 'datetime' or 'date' column")
-
-            # цены: open/high/low обязательны
-            required_price_cols = {"open", "high", "low"}
-            missing_price = required_price_cols - fieldnames_lower
-            if missing_price:
-                raise ValidationError(f"CSV missing columns: {', '.join(sorted(missing_price))}")
-
-            # close: поддерживаем close и close/last (как у nasdaq)
-            if "close" in fieldnames_lower:
-                close_col = "close"
-            elif "close/last" in fieldnames_lower:
-                close_col = "close/last"
-            else:
-                raise ValidationError("CSV must contain 'close' or 'Close/Last' column")
-
-            for row in reader:
-                # нормализуем ключи строки к lower()
-                row_l = {k.lower(): v for k, v in row.items() if k is not None}
-
-                dt_raw = row_l.get(dt_col)
-                if not dt_raw:
-                    raise ValidationError("CSV row has no datetime value")
-                dt = DataFeed._parse_dt(dt_raw)
-
-                try:
-                    open_ = DataFeed._parse_number(row_l["open"])
-                    high = DataFeed._parse_number(row_l["high"])
-                    low = DataFeed._parse_number(row_l["low"])
-                    close = DataFeed._parse_number(row_l[close_col])
-                    volume = DataFeed._parse_number(row_l.get("volume", "0"))
-                except KeyError as e:
-                    raise ValidationError(f"Missing OHLC field in row: {e}") from e
-                except ValueError as e:
-                    raise ValidationError(f"Bad numeric value in row: {e}") from e
-
-                bars.append(
-                    Bar(
-                        dt=dt,
-                        open=open_,
-                        high=high,
-                        low=low,
-                        close=close,
-                        volume=volume,
-                    )
-                )
-
-        feed = DataFeed(bars, symbol=symbol, timeframe=timeframe)
+        if cache is not False:
+            from .feed_cache import FeedCache, cache_enabled
+
+            if cache_enabled():
+                store = cache if isinstance(cache, FeedCache) else FeedCache()
+                key = store.key(path)
+                cached = store.get(key, symbol=symbol, timeframe=timeframe)
+                if cached is not None:
+                    return cached
+                feed = DataFeed.load_csv(path, symbol=symbol, timeframe=timeframe)
+                store.put(key, feed)
+                return feed
+
+        reader = CsvChunkReader(path)
+        ts = array("q")
+        opens = array("d")
+        highs = array("d")
+        lows = array("d")
+        closes = array("d")
+        volumes = array("d")
+        for c_ts, c_open, c_high, c_low, c_close, c_volume in reader:
+            ts.extend(c_ts)
+            opens.extend(c_open)
+            highs.extend(c_high)
+            lows.extend(c_low)
+            closes.extend(c_close)
+            volumes.extend(c_volume)
+
+        feed = DataFeed.from_columns(
+            ts,
+            opens,
+            highs,
+            lows,
+            closes,
+            volumes,
+            symbol=symbol,
+            timeframe=timeframe,
+            tz=reader.tz,
+        )
         feed.sort_and_validate()
         return feed
 
@@ -136,17 +222,319 @@ class DataFeed:
         return float(s)
 
     def get(self, i: int) -> Bar:
-        return self._bars[i]
+        """Собрать бар с индексом ``i`` (для совместимости, в горячем цикле не используется)."""
+        return Bar.unchecked(
+            self.dt(i),
+            self._open[i],
+            self._high[i],
+            self._low[i],
+            self._close[i],
+            self._volume[i],
+        )
 
     def size(self) -> int:
-        return len(self._bars)
+        return len(self._ts)
+
+    def dt(self, i: int) -> datetime:
+        """Время бара ``i`` как datetime."""
+        return from_epoch_us(self._ts[i], self._tz)
+
+    def timestamp(self, i: int) -> int:
+        """Время бара ``i`` в микросекундах от epoch."""
+        return self._ts[i]
+
+    def timestamps(self) -> IntColumn:
+        """Колонка времени (int64, микросекунды от epoch)."""
+        return self._ts
+
+    def column(self, series: str) -> FloatColumn:
+        """Колонка одного из рядов ``open``/``high``/``low``/``close``/``volume``."""
+        attr = _COLUMN_ATTRS.get(series)
+        if attr is None:
+            raise ValidationError(f"Unknown price series: {series}")
+        return getattr(self, attr)
+
+    def columns(self) -> Dict[str, FloatColumn]:
+        """Все ценовые колонки по именам рядов."""
+        return {name: getattr(self, attr) for name, attr in _COLUMN_ATTRS.items()}
+
+    def bar_search(self) -> BarSearch:
+        """Индекс по low/high для поиска срабатывания отложенных ордеров (строится один раз)."""
+        if self._search is None:
+            self._search = BarSearch(self._low, self._high)
+        return self._search
+
+    def window(self, series: str, start: int, end: int) -> memoryview:
+        """Значения ряда для баров ``[start, end)`` — ``memoryview`` без копирования."""
+        return memoryview(self.column(series))[start:end]
+
+    def slice(self, start: datetime | None = None, end: datetime | None = None) -> "DataFeed":
+        """
+        Фид с барами ``start <= dt < end`` без копирования данных.
+
+        Колонки нового фида — ``memoryview`` поверх колонок исходного,
+        границы ищутся бинарным поиском по колонке времени.
+        """
+        lo, hi = self.index_range(start, end)
+        cols = self.columns()
+        return DataFeed.from_columns(
+            memoryview(self._ts)[lo:hi],
+            memoryview(cols["open"])[lo:hi],
+            memoryview(cols["high"])[lo:hi],
+            memoryview(cols["low"])[lo:hi],
+            memoryview(cols["close"])[lo:hi],
+            memoryview(cols["volume"])[lo:hi],
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            tz=self._tz,
+        )
+
+    def index_range(self, start: datetime | None = None, end: datetime | None = None) -> Tuple[int, int]:
+        """Полуинтервал индексов ``[lo, hi)`` баров с ``start <= dt < end``."""
+        ts = self._ts
+        lo = 0 if start is None else bisect_left(ts, to_epoch_us(start))
+        hi = len(ts) if end is None else bisect_left(ts, to_epoch_us(end))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def open_store(
+        path: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        symbol: str = "",
+        timeframe: str = "",
+    ) -> "DataFeed":
+        """
+        Открыть файл колоночного хранилища (:mod:`backtester.core.barstore`)
+        через ``mmap``, опционально только бары ``start <= dt < end``.
+
+        Читаются лишь страницы, относящиеся к запрошенному диапазону.
+        """
+        from .barstore import BarStore
+
+        return BarStore(path).feed(start, end, symbol=symbol, timeframe=timeframe)
+
+    def fingerprint(self) -> str:
+        """
+        Хэш содержимого фида: колонки и часовой пояс (``symbol`` и
+        ``timeframe`` не входят). Считается один раз — колонки загруженного
+        фида не меняются; используется как часть ключа
+        :class:`~backtester.core.result_cache.ResultCache`.
+        """
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=20)
+            h.update(f"{len(self._ts)}\0{self._tz!r}\0".encode())
+            for col in (self._ts, self._open, self._high, self._low, self._close, self._volume):
+                h.update(col)
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    @property
+    def tz(self) -> tzinfo | None:
+        """Часовой пояс, в котором :meth:`dt` возвращает время (None — naive)."""
+        return self._tz
 
     def sort_and_validate(self) -> None:
-        self._bars.sort(key=lambda b: b.dt)
-        seen = set()
-        uniq: List[Bar] = []
-        for b in self._bars:
-            if b.dt not in seen:
-                uniq.append(b)
-                seen.add(b.dt)
-        self._bars = uniq
+        """Отсортировать бары по времени и удалить дубликаты (остаётся первый)."""
+        ts = self._ts
+        if all(a < b for a, b in zip(ts, islice(ts, 1, None))):
+            return
+
+        order = sorted(range(len(ts)), key=ts.__getitem__)
+        keep: List[int] = []
+        prev: int | None = None
+        for k in order:
+            t = ts[k]
+            if t != prev:
+                keep.append(k)
+                prev = t
+
+        self._ts = array("q", [ts[k] for k in keep])
+        self._open = array("d", [self._open[k] for k in keep])
+        self._high = array("d", [self._high[k] for k in keep])
+        self._low = array("d", [self._low[k] for k in keep])
+        self._close = array("d", [self._close[k] for k in keep])
+        self._volume = array("d", [self._volume[k] for k in keep])
+        self._search = None
+        self._fingerprint = None
+
+
+def _ts_iso_date(val: str) -> int:
+    """``YYYY-MM-DD`` -> микросекунды от epoch (без промежуточного datetime)."""
+    return (date.fromisoformat(val.strip()).toordinal() - _EPOCH_ORDINAL) * _US_PER_DAY
+
+
+def _ts_iso_naive(val: str) -> int:
+    """ISO 8601 с временем без смещения -> микросекунды от epoch."""
+    return (datetime.fromisoformat(val) - _EPOCH) // _US
+
+
+def _ts_iso(val: str) -> int:
+    """ISO 8601 с временем и смещением -> микросекунды от epoch (UTC)."""
+    return to_epoch_us(datetime.fromisoformat(val.strip()))
+
+
+def _ts_us_date(val: str) -> int:
+    """``MM/DD/YYYY`` (формат Nasdaq) -> микросекунды от epoch."""
+    m, d, y = val.strip().split("/")
+    return (date(int(y), int(m), int(d)).toordinal() - _EPOCH_ORDINAL) * _US_PER_DAY
+
+
+def _ts_generic(val: str) -> int:
+    if not val:
+        raise ValidationError("CSV row has no datetime value")
+    return to_epoch_us(DataFeed._parse_dt(val))
+
+
+def _detect_ts_parser(sample: str) -> Callable[[str], int]:
+    """Подобрать быстрый парсер даты по первому значению колонки."""
+    for parser in (_ts_iso_date, _ts_iso_naive, _ts_iso, _ts_us_date):
+        try:
+            parser(sample)
+        except (ValueError, TypeError):
+            continue
+        return parser
+    return _ts_generic
+
+
+def _money_number(val: str) -> float:
+    """Числа в стиле Nasdaq: ``$278.85``, ``20,135,620``."""
+    return float(val.replace("$", "").replace(",", ""))
+
+
+def _strict_number(val: str) -> float:
+    try:
+        return DataFeed._parse_number(val)
+    except ValueError as e:
+        raise ValidationError(f"Bad numeric value in row: {e}") from e
+
+
+class CsvChunkReader:
+    """
+    Потоковый разбор CSV в колонки.
+
+    Позиции колонок определяются один раз по заголовку, формат даты и
+    формат чисел (обычный или Nasdaq с ``$`` и ``,``) — один раз по первой
+    строке данных. Дальше каждая колонка блока разбирается одним проходом
+    ``map`` по выбранному парсеру. Если в блоке встретилось значение другого
+    формата, этот блок колонки переразбирается медленным универсальным путём
+    (:meth:`DataFeed._parse_dt` / :meth:`DataFeed._parse_number`), так что
+    смешанные файлы по-прежнему читаются корректно.
+
+    Итерация возвращает кортежи ``(ts, open, high, low, close, volume)``
+    в порядке строк файла; сортировка и удаление дубликатов — на стороне
+    вызывающего кода.
+    """
+
+    def __init__(self, path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> None:
+        if chunk_rows <= 0:
+            raise ValidationError("chunk_rows must be > 0")
+        self.path = path
+        self.chunk_rows = chunk_rows
+        # Часовой пояс первой строки (None для naive-дат); известен после первого блока.
+        self.tz: tzinfo | None = None
+
+    def __iter__(self) -> Iterator[Columns]:
+        with open(self.path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            dt_idx, price_idx, vol_idx = _resolve_columns(header)
+            width = 1 + max(dt_idx, *price_idx, -1 if vol_idx is None else vol_idx)
+
+            ts_parser: Callable[[str], int] | None = None
+            num_parsers: List[Callable[[str], float]] = []
+            vol_parser: Callable[[str], float] = float
+
+            while True:
+                raw = list(islice(reader, self.chunk_rows))
+                if not raw:
+                    break
+                # пустые строки пропускаем, как это делает csv.DictReader
+                rows = [row for row in raw if row]
+                if not rows:
+                    continue
+                cols = _transpose(rows, width)
+                dt_vals = cols[dt_idx]
+                price_vals = [cols[k] for k in price_idx]
+                vol_vals = cols[vol_idx] if vol_idx is not None else None
+
+                if ts_parser is None:
+                    ts_parser = _detect_ts_parser(dt_vals[0])
+                    if ts_parser is _ts_iso:
+                        self.tz = datetime.fromisoformat(dt_vals[0].strip()).tzinfo
+                    num_parsers = [_detect_number_parser(vals[0]) for vals in price_vals]
+                    if vol_vals is not None:
+                        vol_parser = _detect_number_parser(vol_vals[0])
+
+                ts = _parse_ts_column(dt_vals, ts_parser)
+                prices = [
+                    _parse_number_column(vals, parser)
+                    for vals, parser in zip(price_vals, num_parsers)
+                ]
+                if vol_vals is not None:
+                    volume = _parse_number_column(vol_vals, vol_parser)
+                else:
+                    volume = array("d", bytes(8 * len(rows)))
+                yield ts, prices[0], prices[1], prices[2], prices[3], volume
+
+
+def _resolve_columns(header: List[str]) -> Tuple[int, Tuple[int, int, int, int], int | None]:
+    """
+    Найти позиции колонок по заголовку.
+
+    Возвращает индекс даты, индексы (open, high, low, close) и индекс
+    volume (или None, если колонки нет).
+    """
+    positions: Dict[str, int] = {}
+    for k, name in enumerate(header):
+        positions.setdefault(name.lower(), k)
+
+    # дата: datetime/date
+    if "datetime" in positions:
+        dt_idx = positions["datetime"]
+    elif "date" in positions:
+        dt_idx = positions["date"]
+    else:
+        raise ValidationError("CSV must contain 'datetime' or 'date' column")
+
+    # цены: open/high/low обязательны
+    missing_price = {"open", "high", "low"} - positions.keys()
+    if missing_price:
+        raise ValidationError(f"CSV missing columns: {', '.join(sorted(missing_price))}")
+
+    # close: поддерживаем close и close/last (как у nasdaq)
+    if "close" in positions:
+        close_idx = positions["close"]
+    elif "close/last" in positions:
+        close_idx = positions["close/last"]
+    else:
+        raise ValidationError("CSV must contain 'close' or 'Close/Last' column")
+
+    price_idx = (positions["open"], positions["high"], positions["low"], close_idx)
+    return dt_idx, price_idx, positions.get("volume")
+
+
+def _transpose(rows: List[List[str]], width: int) -> List[Tuple[str, ...]]:
+    """Разложить строки блока по колонкам (первые ``width`` колонок)."""
+    if min(map(len, rows)) < width:
+        short = next(row for row in rows if len(row) < width)
+        raise ValidationError(f"Missing OHLC field in row: {short}")
+    return list(zip(*rows))[:width]
+
+
+def _detect_number_parser(sample: str) -> Callable[[str], float]:
+    return _money_number if ("$" in sample or "," in sample) else float
+
+
+def _parse_ts_column(vals: Sequence[str], parser: Callable[[str], int]) -> "array[int]":
+    try:
+        return array("q", map(parser, vals))
+    except (ValueError, TypeError):
+        return array("q", map(_ts_generic, vals))
+
+
+def _parse_number_column(vals: Sequence[str], parser: Callable[[str], float]) -> "array[float]":
+    try:
+        return array("d", map(parser, vals))
+    except ValueError:
+        return array("d", map(_strict_number, vals))
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+from array import array
 from datetime import datetime
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Generator, Iterable, Iterator, List, Sequence, Tuple, Union
 
-from .analyzers import Analyzer, DrawdownAnalyzer
+from .analyzers import Analyzer, BatchAnalyzer, ChunkRecorder, DrawdownAnalyzer, split_analyzers
 from .broker import Broker
 from .datafeed import DataFeed
-from .enums import ActionSide, ExecutionMode
+from .enums import ActionSide, ExecutionMode, OrderType, RecordLevel
 from .context import Context
+from .errors import ValidationError
 from .result import BacktestResult
+from .series import EquityCurve, TimeIndex, Values, empty_curve
 from .settings import BacktestSettings
-from .types import Action, TimeSeries
+from .strategy_base import Strategy
+from .stream import StreamFeed
+from .timing import Timing
+from .types import Action, Bar, TimeSeries, Trade
+
+if TYPE_CHECKING:
+    from .result_cache import ResultCache
+
+_AUTO_EXIT = Action(ActionSide.SELL, 0.0, "auto-exit")
+
+# Один прогон в run_many: стратегия, её настройки и её анализаторы.
+StrategyRun = Tuple[Strategy, BacktestSettings, Sequence[Union[Analyzer, BatchAnalyzer]]]
 
 
 class Engine:
@@ -21,7 +35,9 @@ class Engine:
         self._broker: Broker | None = None
         self._strategy = None
         self._settings = BacktestSettings()
-        self._analyzers: List[Analyzer] = []
+        self._analyzers: List[Analyzer | BatchAnalyzer] = []
+        self._timing = False
+        self._cache: ResultCache | None = None
         # По умолчанию подключаем анализатор просадки, чтобы базовый набор
         # метрик включал max_drawdown и max_drawdown_pct.
         self.add_analyzer(DrawdownAnalyzer())
@@ -41,110 +57,508 @@ class Engine:
             commission_pct=settings.commission_pct,
             exec_mode=settings.execution_mode,
             lot_size=settings.lot_size,
+            record_trades=settings.record is not RecordLevel.METRICS,
         )
 
-    def add_analyzer(self, analyzer: Analyzer) -> None:
-        """Добавить анализатор, который будет вызываться на каждом баре."""
+    def add_analyzer(self, analyzer: Analyzer | BatchAnalyzer) -> None:
+        """
+        Добавить анализатор: побаровый (``on_bar``) вызывается на каждом
+        баре, пакетный (``on_chunk``) — кусками колонок прогона.
+        """
         self._analyzers.append(analyzer)
 
     def clear_analyzers(self) -> None:
         """Удалить все привязанные к движку анализаторы."""
         self._analyzers.clear()
 
+    def set_timing(self, enabled: bool = True) -> None:
+        """
+        Включить замер времени прогонов :meth:`run` и :meth:`run_stream`.
+
+        Результат получает ``timings`` (:class:`~backtester.core.timing.RunTimings`):
+        время по фазам (чтение фида стратегией, ``on_bar``, брокер,
+        анализаторы, остальной цикл движка) и гистограмму задержек
+        ``on_bar`` с p50/p99. Компоненты прогона оборачиваются обёртками
+        с замером, цикл по барам остаётся прежним, поэтому при выключенном
+        замере (по умолчанию) накладных расходов нет.
+        """
+        self._timing = enabled
+
+    def set_cache(self, cache: ResultCache | None) -> None:
+        """
+        Подключить кэш результатов :meth:`run` (``None`` — отключить).
+
+        Ключ считается до прогона по содержимому фида, стратегии,
+        настройкам и анализаторам (см.
+        :class:`~backtester.core.result_cache.ResultCache`); при попадании
+        прогон не выполняется, и состояние стратегии и анализаторов не
+        меняется. Прогоны с замером времени, :meth:`run_stream` и
+        :meth:`run_many` идут мимо кэша.
+        """
+        self._cache = cache
+
     def run(self) -> BacktestResult:
-        """Запустить один прогон бэктеста и вернуть агрегированный результат."""
+        """
+        Запустить один прогон бэктеста и вернуть агрегированный результат.
+
+        Если стратегия объявляет ``idle()`` (см.
+        :class:`~backtester.core.strategy_base.Strategy`), то пока в книге
+        есть только отложенные ордера, а ``idle()`` возвращает ``True``,
+        движок перепрыгивает к ближайшему бару, где ордер может сработать:
+        позиция под стопом стоит ``O(событий)``, а не ``O(баров)``.
+        """
         assert self._feed is not None, "DataFeed not set"
         assert self._strategy is not None, "Strategy not set"
         assert self._broker is not None, "Broker not configured"
 
+        cache = self._cache
+        if cache is None or self._timing:
+            return self._run()
+        key = cache.key(type(self), self._feed, self._strategy, self._settings, self._analyzers)
+        if key is None:
+            return self._run()
+        result = cache.get(key, self._settings)
+        if result is None:
+            result = self._run()
+            cache.put(key, result, self._feed.tz)
+        return result
+
+    def _run(self) -> BacktestResult:
+        """Прогон по барам фида (без кэша); наследники подменяют сам алгоритм."""
+        assert self._feed is not None
+        assert self._strategy is not None
+
         feed = self._feed
-        broker = self._broker
-        broker.reset(self._settings.initial_cash, self._settings.lot_size)
-        ctx = Context(feed, broker)
+        warmup = max(0, self._strategy.warmup())
+        n = feed.size()
+        if getattr(self._strategy, "idle", None) is not None:
+            return self._simulate(feed, _feed_steps(warmup, n))
+        steps = ((i, i == n - 1) for i in range(warmup, n))
+        return self._simulate(feed, steps)
+
+    def run_stream(self, bars: Iterable[Bar], lookback: int | None = None) -> BacktestResult:
+        """
+        Прогон в потоковом режиме: бары берутся из итератора по одному.
+
+        Источник может быть любым итерируемым объектом с барами —
+        генератором, :func:`~backtester.core.stream.stream_csv`, чтением
+        из сети. Бары должны идти по возрастанию времени: порядок и
+        дубликаты проверяются по мере поступления (см.
+        :class:`~backtester.core.stream.StreamFeed`).
+
+        В памяти хранится только окно из последних ``lookback`` баров
+        (по умолчанию — ``strategy.lookback()``, если стратегия его
+        объявляет, иначе только текущий бар) плюс один бар упреждения,
+        нужный, чтобы узнать, что текущий бар — последний. Длина истории
+        на это окно не влияет; растёт только сам результат (кривая equity).
+        """
+        assert self._strategy is not None, "Strategy not set"
+        assert self._broker is not None, "Broker not configured"
 
+        if lookback is None:
+            declared = getattr(self._strategy, "lookback", None)
+            lookback = declared() if callable(declared) else 1
+        feed = StreamFeed(capacity=max(1, lookback) + 1)
         warmup = max(0, self._strategy.warmup())
+        return self._simulate(feed, _stream_steps(feed, bars, warmup))
+
+    def run_many(self, runs: Iterable[StrategyRun]) -> List[BacktestResult]:
+        """
+        Прогнать несколько стратегий за один проход по фиду.
+
+        Каждый элемент ``runs`` — тройка (стратегия, настройки,
+        анализаторы). У каждого прогона свой брокер и свой контекст, так что
+        прогоны независимы, а результаты совпадают с отдельными вызовами
+        :meth:`run` с теми же стратегией, настройками и анализаторами.
+        Общее для всех прогонов — проход по барам, время бара (``datetime``
+        собирается один раз на бар) и цена закрытия.
+
+        Анализаторы должны быть разными объектами для разных прогонов;
+        стратегия и анализаторы самого движка (``set_strategy``,
+        ``add_analyzer``) здесь не используются. Результаты возвращаются
+        в порядке ``runs``.
+        """
+        assert self._feed is not None, "DataFeed not set"
+        feed = self._feed
+        lanes = [_Lane(feed, strategy, settings, list(analyzers)) for strategy, settings, analyzers in runs]
+        seen: set[int] = set()
+        for lane in lanes:
+            for analyzer in lane.analyzers:
+                if id(analyzer) in seen:
+                    raise ValidationError("run_many() needs separate analyzer instances per run")
+                seen.add(id(analyzer))
+        if not lanes:
+            return []
+
         n = feed.size()
-        start_equity = self._settings.initial_cash
-
-        if n == 0 or warmup >= n:
-            # Нет данных или warmup «съел» все бары
-            metrics = {
-                "start_equity": start_equity,
-                "end_equity": start_equity,
-                "profit": 0.0,
-                "return_pct": 0.0,
-                "trades": 0.0,
-            }
-            # Анализаторы не вызываются (нет баров), но финализируем их,
-            # чтобы они могли вернуть свои нулевые метрики.
-            for analyzer in self._analyzers:
-                metrics.update(analyzer.finalize())
-
-            return BacktestResult(
-                metrics=metrics,
-                trades=[],
-                equity_curve=[],
-                settings=self._settings,
-                series={},  # при отсутствии данных series остаётся пустым
+        last = n - 1
+        closes = feed.column("close")
+        start = min(lane.warmup for lane in lanes)
+        stamps = feed.timestamps()
+        need_dt = any(lane.per_bar for lane in lanes)
+        dt: datetime | None = None
+
+        for i in range(start, n):
+            if need_dt:
+                dt = feed.dt(i)
+            close = closes[i]
+            for lane in lanes:
+                if i < lane.warmup:
+                    continue
+                broker = lane.broker
+                if lane.pending is not None:
+                    broker.execute(lane.pending, i, feed)
+                    lane.pending = None
+                if broker._orders:
+                    broker.fill_orders(i, feed)
+
+                ctx = lane.ctx
+                ctx.set_index(i)
+                act: Action = lane.strategy.on_bar(ctx)
+
+                if act.side is not ActionSide.HOLD:
+                    if act.order_type is not OrderType.MARKET:
+                        broker.place(act)
+                    elif lane.on_close:
+                        broker.execute(act, i, feed)
+                    else:
+                        lane.pending = act
+
+                if i == last and broker.get_position_qty() > 0:
+                    broker.execute(_AUTO_EXIT, i, feed)
+
+                value = broker.get_position_qty() * close
+                eq = broker.get_cash() + value
+                if lane.full:
+                    lane.equity.append(eq)
+                else:
+                    lane.last = eq
+                if lane.recorder is not None:
+                    lane.recorder.push(stamps[i], eq, value)
+                if lane.per_bar:
+                    # dt считается на каждом баре, если хоть у одного прогона есть on_bar.
+                    assert dt is not None
+                    for analyzer in lane.per_bar:
+                        analyzer.on_bar(dt, eq)
+
+        results = []
+        for lane in lanes:
+            if not lane.full and lane.last is not None:
+                lane.equity.append(lane.last)
+            if lane.recorder is not None:
+                lane.recorder.flush()
+            results.append(
+                _build_result(
+                    _feed_index(feed, lane.warmup, lane.warmup + len(lane.equity)),
+                    lane.equity,
+                    lane.broker.get_trades(),
+                    lane.settings,
+                    lane.analyzers,
+                    lane.broker.trade_count(),
+                )
             )
+        return results
+
+    def _simulate(self, feed: DataFeed | StreamFeed, steps: Iterator[Tuple[int, bool]]) -> BacktestResult:
+        """
+        Общий цикл по барам.
+
+        ``steps`` выдаёт пары (индекс бара, признак последнего бара);
+        бары до warmup в ``steps`` не попадают. Перескок по барам (см.
+        :meth:`run`) возможен, только если ``steps`` — это
+        :func:`_feed_steps` по ``DataFeed``.
+        """
+        assert self._strategy is not None
+        assert self._broker is not None
+
+        timing = Timing() if self._timing else None
+        broker = self._broker
+        broker.reset(self._settings.initial_cash, self._settings.lot_size)
+        strategy = self._strategy
+        analyzers = self._analyzers
+        if timing is None:
+            ctx = Context(feed, broker)
+        else:
+            # Контекст читает состояние исходного брокера; движок исполняет
+            # через обёртку, которая считает время брокера.
+            ctx = timing.context(feed, broker)
+            broker = timing.broker(broker)  # type: ignore[assignment]
+            strategy = timing.strategy(strategy)
+            analyzers = timing.analyzers(analyzers)
+        on_close = self._settings.execution_mode is ExecutionMode.ON_CLOSE
+        full = self._settings.record is RecordLevel.FULL
+        # Побаровым анализаторам нужен datetime бара, пакетным — только
+        # колонки, которые копит recorder (один вызов на бар на всех).
+        per_bar, batch = split_analyzers(analyzers)
+        recorder = ChunkRecorder(batch) if batch else None
+        # Книга отложенных ордеров брокера: список изменяется только на месте,
+        # поэтому проверка «есть ли ордера» — без вызова метода на каждом баре.
+        orders = broker._orders
+        idle = getattr(strategy, "idle", None)
+        search = feed.bar_search() if idle is not None and isinstance(feed, DataFeed) else None
+        last = feed.size() - 1
 
         pending: Action | None = None
-        equity_curve: List[Tuple[datetime, float]] = []
+        equity = array("d")
+        # Метки времени копируются только в потоковом режиме: окно буфера
+        # перезаписывается, а у DataFeed индекс результата — срез его колонки.
+        stamps = array("q") if full and isinstance(feed, StreamFeed) else None
+        first = -1
+        eq = 0.0
+        closes = feed.column("close")
 
-        for i in range(warmup, n):
-            if (
-                self._settings.execution_mode is ExecutionMode.ON_NEXT_OPEN
-                and pending is not None
-            ):
+        for i, is_last in steps:
+            if first < 0:
+                first = i
+            if not on_close and pending is not None:
                 broker.execute(pending, i, feed)
                 pending = None
+            if orders:
+                broker.fill_orders(i, feed)
 
             ctx.set_index(i)
-            act: Action = self._strategy.on_bar(ctx)
+            act: Action = strategy.on_bar(ctx)
 
-            if self._settings.execution_mode is ExecutionMode.ON_CLOSE:
+            if act.order_type is not OrderType.MARKET:
+                broker.place(act)
+            elif on_close:
                 broker.execute(act, i, feed)
             else:
                 pending = None if act.side is ActionSide.HOLD else act
 
-            if i == n - 1 and broker.get_position_qty() > 0:
-                broker.execute(
-                    Action(ActionSide.SELL, 0.0, "auto-exit"),
-                    i,
-                    feed,
-                )
+            if is_last and broker.get_position_qty() > 0:
+                broker.execute(_AUTO_EXIT, i, feed)
+
+            value = broker.get_position_qty() * closes[i]
+            eq = broker.get_cash() + value
+            if full:
+                equity.append(eq)
+                if stamps is not None:
+                    stamps.append(feed.timestamp(i))
+
+            if recorder is not None:
+                recorder.push(feed.timestamp(i), eq, value)
+            if per_bar:
+                dt = feed.dt(i)
+                for analyzer in per_bar:
+                    analyzer.on_bar(dt, eq)
+
+            if search is not None and orders and pending is None and not is_last and idle():
+                j = min(broker.next_fill(i + 1, search), last)
+                if j > i + 1:
+                    # Бары i+1..j-1: ордера не срабатывают, стратегия спит —
+                    # кэш и позиция постоянны, equity считается без цикла движка.
+                    cash = broker.get_cash()
+                    qty = broker.get_position_qty()
+                    skipped = closes[i + 1 : j]
+                    if full or recorder is not None:
+                        curve = [cash + qty * c for c in skipped]
+                        if full:
+                            equity.extend(curve)
+                        if recorder is not None:
+                            recorder.extend(feed.timestamps()[i + 1 : j], curve, [qty * c for c in skipped])
+                    if per_bar:
+                        for k in range(i + 1, j):
+                            dt = feed.dt(k)
+                            eq = cash + qty * closes[k]
+                            for analyzer in per_bar:
+                                analyzer.on_bar(dt, eq)
+                    eq = cash + qty * closes[j - 1]
+                    steps.send(j)  # type: ignore[attr-defined]
+
+        if recorder is not None:
+            recorder.flush()
+        if not full:
+            # Кривая не записывалась: для метрик нужно только последнее значение.
+            if first >= 0:
+                equity.append(eq)
+            index = TimeIndex(array("q"), feed.tz)
+        elif stamps is not None:
+            index = TimeIndex(stamps, feed.tz)
+        else:
+            assert isinstance(feed, DataFeed)
+            index = _feed_index(feed, max(first, 0), max(first, 0) + len(equity))
+        return self._build_result(index, equity, broker, analyzers, timing)
+
+    def _build_result(
+        self,
+        index: TimeIndex,
+        equity: "array[float]",
+        broker: Broker,
+        analyzers: Sequence[Analyzer | BatchAnalyzer] | None = None,
+        timing: Timing | None = None,
+    ) -> BacktestResult:
+        result = _build_result(
+            index,
+            equity,
+            broker.get_trades(),
+            self._settings,
+            self._analyzers if analyzers is None else analyzers,
+            broker.trade_count(),
+        )
+        if timing is not None:
+            result.timings = timing.finish()
+        return result
+
+
+class _Lane:
+    """Состояние одного прогона в :meth:`Engine.run_many`."""
+
+    __slots__ = (
+        "strategy",
+        "settings",
+        "analyzers",
+        "per_bar",
+        "recorder",
+        "broker",
+        "ctx",
+        "on_close",
+        "warmup",
+        "pending",
+        "full",
+        "equity",
+        "last",
+    )
+
+    def __init__(
+        self,
+        feed: DataFeed,
+        strategy: Strategy,
+        settings: BacktestSettings,
+        analyzers: List[Analyzer | BatchAnalyzer],
+    ) -> None:
+        self.strategy = strategy
+        self.settings = settings
+        self.analyzers = analyzers
+        self.per_bar, batch = split_analyzers(analyzers)
+        self.recorder = ChunkRecorder(batch) if batch else None
+        self.broker = Broker(
+            commission_pct=settings.commission_pct,
+            exec_mode=settings.execution_mode,
+            lot_size=settings.lot_size,
+            record_trades=settings.record is not RecordLevel.METRICS,
+        )
+        self.broker.reset(settings.initial_cash, settings.lot_size)
+        self.ctx = Context(feed, self.broker)
+        self.on_close = settings.execution_mode is ExecutionMode.ON_CLOSE
+        self.warmup = max(0, strategy.warmup())
+        self.pending: Action | None = None
+        self.full = settings.record is RecordLevel.FULL
+        self.equity = array("d")
+        self.last: float | None = None
+
+
+def _feed_index(feed: DataFeed, start: int, end: int) -> TimeIndex:
+    """Индекс результата — срез колонки времени фида, без копирования."""
+    return TimeIndex(memoryview(feed.timestamps())[start:end], feed.tz)
 
-            bar = feed.get(i)
-            eq = broker.get_cash() + broker.get_position_qty() * bar.close
-            equity_curve.append((bar.dt, eq))
 
-            for analyzer in self._analyzers:
-                analyzer.on_bar(bar.dt, eq)
+def _build_result(
+    index: TimeIndex,
+    equity: "array[float]",
+    trades: List[Trade],
+    settings: BacktestSettings,
+    analyzers: Sequence[Analyzer | BatchAnalyzer],
+    trade_count: int | None = None,
+) -> BacktestResult:
+    """
+    Собрать BacktestResult из кривой equity, сделок и анализаторов.
 
-        end_equity = equity_curve[-1][1] if equity_curve else start_equity
-        profit = end_equity - start_equity
-        ret_pct = (profit / start_equity * 100.0) if start_equity else 0.0
+    Кривая хранится один раз: ``equity_curve`` и ``series["equity"]``
+    ссылаются на один и тот же индекс времени и массив значений.
+    Если ``settings.record`` ниже ``FULL``, в ``equity`` лежит только
+    последнее значение, а кривая и ``series`` в результат не попадают;
+    ``trade_count`` — число сделок, когда сами ``Trade`` не записывались.
+    """
+    start_equity = settings.initial_cash
 
+    if not len(equity):
+        # Нет данных или warmup «съел» все бары
         metrics = {
             "start_equity": start_equity,
-            "end_equity": end_equity,
-            "profit": profit,
-            "return_pct": ret_pct,
-            "trades": float(len(broker.get_trades())),
+            "end_equity": start_equity,
+            "profit": 0.0,
+            "return_pct": 0.0,
+            "trades": 0.0,
         }
-
-        for analyzer in self._analyzers:
+        # Анализаторы не вызываются (нет баров), но финализируем их,
+        # чтобы они могли вернуть свои нулевые метрики.
+        for analyzer in analyzers:
             metrics.update(analyzer.finalize())
 
-        equity_ts = TimeSeries(
-            t=[dt for dt, _ in equity_curve],
-            v=[eq for _, eq in equity_curve],
-        )
-
         return BacktestResult(
             metrics=metrics,
-            trades=broker.get_trades(),
-            equity_curve=equity_curve,
-            settings=self._settings,
-            series={"equity": equity_ts},
+            trades=[],
+            equity_curve=empty_curve(),
+            settings=settings,
+            series={},  # при отсутствии данных series остаётся пустым
         )
+
+    end_equity = equity[-1]
+    profit = end_equity - start_equity
+    ret_pct = (profit / start_equity * 100.0) if start_equity else 0.0
+
+    metrics = {
+        "start_equity": start_equity,
+        "end_equity": end_equity,
+        "profit": profit,
+        "return_pct": ret_pct,
+        "trades": float(len(trades) if trade_count is None else trade_count),
+    }
+
+    for analyzer in analyzers:
+        metrics.update(analyzer.finalize())
+
+    if settings.record is not RecordLevel.FULL:
+        return BacktestResult(metrics=metrics, trades=trades, equity_curve=empty_curve(), settings=settings)
+
+    values = Values(equity)
+    return BacktestResult(
+        metrics=metrics,
+        trades=trades,
+        equity_curve=EquityCurve(index, values),
+        settings=settings,
+        series={"equity": TimeSeries(t=index, v=values)},
+    )
+
+
+def _feed_steps(start: int, n: int) -> Generator[Tuple[int, bool] | None, int | None, None]:
+    """
+    Шаги цикла по ``DataFeed`` с перескоком вперёд.
+
+    ``send(j)`` переставляет курсор: следующим будет отдан бар ``j``
+    (сам ``send`` возвращает ``None``).
+    """
+    last = n - 1
+    i = start
+    while i < n:
+        j = yield i, i == last
+        if j is None:
+            i += 1
+        else:
+            i = j
+            yield None
+
+
+def _stream_steps(feed: StreamFeed, bars: Iterable[Bar], warmup: int) -> Iterator[Tuple[int, bool]]:
+    """
+    Шаги цикла для потокового режима.
+
+    Бар ``i`` отдаётся на обработку, когда уже прочитан бар ``i + 1``
+    (или источник закончился) — так известно, последний ли он.
+    """
+    it = iter(bars)
+    for bar in it:
+        if feed.push(bar):
+            break
+    else:
+        return
+    for bar in it:
+        if not feed.push(bar):
+            continue
+        i = feed.size() - 2
+        if i >= warmup:
+            yield i, False
+    i = feed.size() - 1
+    if i >= warmup:
+        yield i, True
@@ -10,14 +10,26 @@ class ActionSide(Enum):
     SELL = "sell"
     HOLD = "hold"
 
+class OrderType(Enum):
+    """MARKET исполняется сразу (по close или next open), LIMIT/STOP ждут цены."""
+    MARKET = "market"
+    LIMIT = "limit"
+    STOP = "stop"
+
 class TradeSide(Enum):
     BUY = "buy"
     SELL = "sell"
 
+class RecordLevel(Enum):
+    """Что сохраняет прогон: только метрики, ещё и сделки, или всё с кривой equity."""
+    METRICS = "metrics"
+    TRADES = "trades"
+    FULL = "full"
+
 class ParamType(Enum):
     INT = "int"
     FLOAT = "float"
     BOOL = "bool"
     STRING = "string"
 
-__all__ = ["ExecutionMode", "ActionSide", "TradeSide", "ParamType"]
+__all__ = ["ExecutionMode", "ActionSide", "OrderType", "TradeSide", "RecordLevel", "ParamType"]
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import timedelta, timezone, tzinfo
+from typing import Dict, List, Tuple
+
+from .datafeed import SERIES, DataFeed
+from .errors import ValidationError
+
+# Переменные окружения: каталог кэша и глобальное отключение кэша.
+CACHE_DIR_ENV = "BACKTESTER_CACHE_DIR"
+CACHE_ENABLED_ENV = "BACKTESTER_CSV_CACHE"
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_MAGIC = b"BTFEED01"
+_SUFFIX = ".feed"
+# magic, порядок байт ('<' или '>'), флаг tz, смещение tz в секундах, число строк
+_HEADER = struct.Struct("<8scbiq")
+_BYTEORDER = b"<" if sys.byteorder == "little" else b">"
+_HASH_BLOCK = 1024 * 1024
+
+
+def cache_enabled() -> bool:
+    """Кэш разрешён, если ``BACKTESTER_CSV_CACHE`` не равна ``0``/``false``/``off``."""
+    return os.environ.get(CACHE_ENABLED_ENV, "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+def default_cache_dir() -> str:
+    """Каталог кэша: ``$BACKTESTER_CACHE_DIR`` или ``$XDG_CACHE_HOME/backtester/feeds``."""
+    explicit = os.environ.get(CACHE_DIR_ENV)
+    if explicit:
+        return explicit
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "backtester", "feeds")
+
+
+class DiskLRU:
+    """
+    Каталог записей ``<ключ><suffix>`` с ограничением суммарного размера.
+
+    Общая часть дисковых кэшей (:class:`FeedCache`,
+    :class:`~backtester.core.result_cache.ResultCache`): атомарная запись
+    через временный файл, счётчики попаданий и промахов, вытеснение
+    давно не использованных записей (LRU по mtime, который обновляется
+    при каждом чтении). Ошибки файловой системы не пробрасываются — кэш
+    только ускоряет работу.
+    """
+
+    suffix = ".bin"
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if max_bytes <= 0:
+            raise ValidationError("max_bytes must be > 0")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _read(self, key: str) -> bytes | None:
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, self._entry_path(key))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """Записи кэша: (путь, размер, время последнего обращения)."""
+        out: List[Tuple[str, int, float]] = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return out
+        for name in names:
+            if not name.endswith(self.suffix):
+                continue
+            full = os.path.join(self.directory, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            out.append((full, st.st_size, st.st_mtime))
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        """Удалять самые давно использованные записи, пока размер больше ``max_bytes``."""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for full, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(full)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        for full, _, _ in self.entries():
+            try:
+                os.unlink(full)
+            except OSError:
+                pass
+
+
+class FeedCache(DiskLRU):
+    """
+    Бинарный кэш разобранных CSV-фидов на диске.
+
+    Ключ записи — хэш от абсолютного пути, размера, mtime и содержимого
+    исходного файла, поэтому любое изменение CSV делает запись недостижимой.
+    Запись хранит колонки фида как есть (байты массивов ``int64``/``float64``),
+    так что чтение — это несколько ``array.frombytes`` без разбора текста.
+
+    Суммарный размер каталога ограничен ``max_bytes``: при превышении
+    удаляются записи, к которым дольше всего не обращались (LRU по mtime,
+    который обновляется при каждом попадании).
+    """
+
+    suffix = _SUFFIX
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        super().__init__(directory or default_cache_dir(), max_bytes)
+
+    def key(self, path: str) -> str:
+        """Ключ записи для CSV-файла ``path``."""
+        abspath = os.path.abspath(path)
+        st = os.stat(abspath)
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{abspath}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+        with open(abspath, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def get(self, key: str, symbol: str = "", timeframe: str = "") -> DataFeed | None:
+        """Прочитать фид по ключу или вернуть None, если записи нет или она повреждена."""
+        data = self._read(key)
+        feed = None
+        if data is not None:
+            try:
+                feed = _read_feed(data, symbol, timeframe)
+            except (ValueError, struct.error):
+                feed = None
+        if feed is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return feed
+
+    def put(self, key: str, feed: DataFeed) -> None:
+        """Сохранить фид по ключу и при необходимости вытеснить старые записи."""
+        payload = _write_feed(feed)
+        if payload is not None:
+            self._write(key, payload)
+
+
+def tz_fields(tz: tzinfo | None) -> Tuple[int, int] | None:
+    """
+    Часовой пояс как (флаг, смещение в секундах) для бинарных записей;
+    ``None`` — зона с переходами (zoneinfo), в таком виде не представима.
+    """
+    if tz is None:
+        return 0, 0
+    offset = tz.utcoffset(None)
+    if offset is None or timezone(offset) != tz:
+        return None
+    return 1, int(offset.total_seconds())
+
+
+def tz_from_fields(flag: int, offset: int) -> tzinfo | None:
+    return timezone(timedelta(seconds=offset)) if flag else None
+
+
+def _write_feed(feed: DataFeed) -> bytes | None:
+    fields = tz_fields(feed.tz)
+    if fields is None:
+        return None
+    tz_flag, tz_offset = fields
+    cols = feed.columns()
+    parts = [
+        _HEADER.pack(_MAGIC, _BYTEORDER, tz_flag, tz_offset, feed.size()),
+        feed.timestamps().tobytes(),
+    ]
+    parts.extend(cols[name].tobytes() for name in SERIES)
+    return b"".join(parts)
+
+
+def _read_feed(data: bytes, symbol: str, timeframe: str) -> DataFeed | None:
+    magic, byteorder, tz_flag, tz_offset, n = _HEADER.unpack_from(data)
+    if magic != _MAGIC or byteorder != _BYTEORDER:
+        return None
+    if len(data) != _HEADER.size + 8 * n * (1 + len(SERIES)):
+        return None
+    view = memoryview(data)
+    pos = _HEADER.size
+    ts = array("q")
+    ts.frombytes(view[pos : pos + 8 * n])
+    pos += 8 * n
+    cols: Dict[str, "array[float]"] = {}
+    for name in SERIES:
+        col = array("d")
+        col.frombytes(view[pos : pos + 8 * n])
+        cols[name] = col
+        pos += 8 * n
+    tz = tz_from_fields(tz_flag, tz_offset)
+    return DataFeed.from_columns(
+        ts,
+        cols["open"],
+        cols["high"],
+        cols["low"],
+        cols["close"],
+        cols["volume"],
+        symbol=symbol,
+        timeframe=timeframe,
+        tz=tz,
+    )
+
+
+__all__ = [
+    "DiskLRU",
+    "FeedCache",
+    "cache_enabled",
+    "default_cache_dir",
+    "tz_fields",
+    "tz_from_fields",
+    "CACHE_DIR_ENV",
+    "CACHE_ENABLED_ENV",
+]
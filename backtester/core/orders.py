@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from array import array
+from typing import Callable, Sequence
+
+from .enums import ActionSide, OrderType
+from .types import Action
+
+_INF = float("inf")
+
+
+def trigger_price(act: Action, open_: float, high: float, low: float) -> float | None:
+    """
+    Цена исполнения отложенного ордера на баре или ``None``, если бар его не задел.
+
+    Лимитный ордер исполняется по своей цене или лучше, стоп — по своей
+    цене или хуже. Если бар открылся гэпом за уровень ордера, исполнение
+    идёт по ``open``: покупка-лимит ниже уровня и продажа-лимит выше —
+    с выгодой, стоп при гэпе — с проскальзыванием.
+    """
+    level = act.price
+    if act.order_type is OrderType.LIMIT:
+        if act.side is ActionSide.BUY:
+            return min(open_, level) if low <= level else None
+        return max(open_, level) if high >= level else None
+    if act.side is ActionSide.BUY:
+        return max(open_, level) if high >= level else None
+    return min(open_, level) if low <= level else None
+
+
+def triggers_on_low(act: Action) -> bool:
+    """Срабатывание ордера определяет ``low`` бара (иначе — ``high``)."""
+    return (act.order_type is OrderType.LIMIT) is (act.side is ActionSide.BUY)
+
+
+class BarSearch:
+    """
+    Поиск ближайшего бара, на котором может сработать отложенный ордер.
+
+    Два дерева отрезков — минимумы ``low`` и максимумы ``high`` (хранятся
+    как минимумы ``-high``) — строятся один раз на фид за ``O(n)``: уровни
+    собираются ``map(min, ...)`` в C.
+    Запрос «первый бар ``>= start`` с ``low <= x``» (или ``high >= x``)
+    стоит ``O(log n)``, поэтому движок может перепрыгнуть все бары, на
+    которых ордера заведомо не исполнятся.
+    """
+
+    __slots__ = ("_n", "_size", "_min", "_max")
+
+    def __init__(self, lows: Sequence[float], highs: Sequence[float]) -> None:
+        n = len(lows)
+        size = 1
+        while size < n:
+            size *= 2
+        self._n = n
+        self._size = size
+        self._min = _build(lows, size, _INF, min)
+        self._max = _build([-h for h in highs], size, _INF, min)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def first_low_at_most(self, start: int, x: float) -> int:
+        """Первый бар ``>= start`` с ``low <= x``; ``n``, если такого нет."""
+        return self._first(self._min, start, x)
+
+    def first_high_at_least(self, start: int, x: float) -> int:
+        """Первый бар ``>= start`` с ``high >= x``; ``n``, если такого нет."""
+        return self._first(self._max, start, -x)
+
+    def next_trigger(self, start: int, act: Action) -> int:
+        """Первый бар ``>= start``, на котором ``act`` может исполниться."""
+        if triggers_on_low(act):
+            return self.first_low_at_most(start, act.price)
+        return self.first_high_at_least(start, act.price)
+
+    def _first(self, tree: "array[float]", start: int, x: float) -> int:
+        n = self._n
+        if start >= n:
+            return n
+        size = self._size
+        i = start + size
+        while tree[i] > x:
+            # Подняться, пока узел — правый ребёнок, и перейти к соседу справа.
+            while i & 1:
+                i >>= 1
+            if i == 0:
+                return n
+            i += 1
+        while i < size:
+            i *= 2
+            if tree[i] > x:
+                i += 1
+        return i - size
+
+
+def _build(values: Sequence[float], size: int, pad: float, op: Callable[[float, float], float]) -> "array[float]":
+    # Дерево в heap-раскладке: корень в ячейке 1, дети узла k — 2k и 2k+1.
+    level = list(values)
+    level.extend([pad] * (size - len(level)))
+    levels = [level]
+    while len(level) > 1:
+        level = list(map(op, level[0::2], level[1::2]))
+        levels.append(level)
+    tree = array("d", [pad])
+    for lvl in reversed(levels):
+        tree.extend(lvl)
+    return tree
+
+
+__all__ = ["BarSearch", "trigger_price", "triggers_on_low"]
@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from .analyzers import Analyzer, BatchAnalyzer, ChunkRecorder, DrawdownAnalyzer, split_analyzers
+from .datafeed import DataFeed, from_epoch_us
+from .broker import CASH_TOLERANCE, affordable_qty
+from .engine import _build_result
+from .enums import ActionSide, ExecutionMode, OrderType, RecordLevel, TradeSide
+from .errors import ValidationError
+from .result import BacktestResult
+from .series import TimeIndex
+from .settings import BacktestSettings
+from .strategy_base import PortfolioStrategy
+from .types import Action, Trade
+
+
+_AUTO_EXIT = Action(ActionSide.SELL, 0.0, "auto-exit")
+
+
+class PortfolioBroker:
+    """
+    Брокер портфеля: позиции по инструментам и общий кэш.
+
+    Правила исполнения те же, что у :class:`~backtester.core.broker.Broker`
+    (long-only, процентная комиссия, округление по шагу лота, ``BUY``
+    без ``qty_hint`` — на весь свободный кэш), но позиция ведётся
+    отдельно для каждого инструмента. Ордера только рыночные.
+
+    Стоимость позиций поддерживается инкрементально: при новой цене
+    инструмента и при сделке по нему меняется только его вклад, поэтому
+    ни equity, ни исполнение ордера не обходят все инструменты. Когда
+    портфель становится пустым, накопленная стоимость сбрасывается в
+    точный ноль.
+
+    При ``record_trades=False`` сделки только считаются, как у ``Broker``.
+    """
+
+    def __init__(self, commission_pct: float = 0.0, lot_size: float = 1.0, record_trades: bool = True) -> None:
+        self._commission_pct = float(commission_pct)
+        self._lot_size = float(lot_size)
+        self._cash = 0.0
+        self._positions: Dict[str, float] = {}
+        self._marks: Dict[str, float] = {}
+        self._value = 0.0
+        self._trades: List[Trade] = []
+        self._record_trades = record_trades
+        self._trade_count = 0
+
+    def reset(self, initial_cash: float) -> None:
+        self._cash = float(initial_cash)
+        self._positions.clear()
+        self._marks.clear()
+        self._value = 0.0
+        self._trades.clear()
+        self._trade_count = 0
+
+    def get_cash(self) -> float:
+        return self._cash
+
+    def get_position_qty(self, symbol: str) -> float:
+        return self._positions.get(symbol, 0.0)
+
+    def get_positions(self) -> Dict[str, float]:
+        return dict(self._positions)
+
+    def get_trades(self) -> List[Trade]:
+        return list(self._trades)
+
+    def trade_count(self) -> int:
+        return self._trade_count
+
+    def equity(self) -> float:
+        return self._cash + self._value
+
+    def mark(self, symbol: str, price: float) -> None:
+        """Обновить последнюю цену инструмента (для оценки позиции)."""
+        qty = self._positions.get(symbol)
+        if qty is not None:
+            self._value += qty * (price - self._marks[symbol])
+            self._marks[symbol] = price
+
+    def execute(self, symbol: str, act: Action, price: float, dt: datetime) -> Trade | None:
+        if act.side is ActionSide.HOLD:
+            return None
+        commission_pct = self._commission_pct
+        held = self._positions.get(symbol, 0.0)
+
+        if act.side is ActionSide.BUY:
+            if act.qty_hint > 0:
+                qty = self._round_qty(act.qty_hint)
+            else:
+                denom = price * (1.0 + commission_pct)
+                qty = self._round_qty(self._cash / denom) if denom > 0 else 0.0
+            if qty <= 0:
+                return None
+            if price * qty * (1.0 + commission_pct) > self._cash + CASH_TOLERANCE:
+                qty = affordable_qty(price, qty, self._cash, commission_pct, self._lot_size)
+                if qty <= 0:
+                    return None
+            commission = price * qty * commission_pct
+            self._cash -= price * qty + commission
+            self._positions[symbol] = held + qty
+            side = TradeSide.BUY
+        else:
+            if held <= 0:
+                return None
+            qty = self._round_qty(held if act.qty_hint <= 0 else min(act.qty_hint, held))
+            if qty <= 0:
+                return None
+            commission = price * qty * commission_pct
+            self._cash += price * qty - commission
+            left = held - qty
+            if left > 0:
+                self._positions[symbol] = left
+            else:
+                del self._positions[symbol]
+            side = TradeSide.SELL
+
+        # Вклад инструмента до сделки — по прежней отметке, после — по цене сделки.
+        if held > 0:
+            self._value -= held * self._marks[symbol]
+        after = self._positions.get(symbol)
+        if after is None:
+            del self._marks[symbol]
+            if not self._positions:
+                self._value = 0.0
+        else:
+            self._marks[symbol] = price
+            self._value += after * price
+        self._trade_count += 1
+        if not self._record_trades:
+            return None
+        tr = Trade.unchecked(dt, side, price, qty, commission, symbol)
+        self._trades.append(tr)
+        return tr
+
+    def _round_qty(self, qty: float) -> float:
+        if self._lot_size <= 0:
+            return qty
+        return int(qty / self._lot_size) * self._lot_size
+
+
+class _Context:
+    """Реализация PortfolioContext для движка."""
+
+    def __init__(self, engine_state: "_State", broker: PortfolioBroker) -> None:
+        self._st = engine_state
+        self._broker = broker
+        self._dt: datetime | None = None
+        self._symbols: List[str] = []
+
+    def time(self) -> datetime:
+        assert self._dt is not None
+        return self._dt
+
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    def universe(self) -> List[str]:
+        return list(self._st.names)
+
+    def _row(self, symbol: str) -> Tuple[int, int]:
+        sid = self._st.ids.get(symbol)
+        if sid is None:
+            raise ValidationError(f"Unknown symbol: {symbol}")
+        row = self._st.rows[sid]
+        if row < 0:
+            raise ValidationError(f"No bars yet for {symbol}")
+        return sid, row
+
+    def price(self, symbol: str, series: str = "close") -> float:
+        sid, row = self._row(symbol)
+        return self._st.feeds[sid].column(series)[row]
+
+    def history(self, symbol: str, series: str = "close", n: int = 1) -> memoryview:
+        if n <= 0:
+            raise ValidationError(f"History length must be > 0, got {n}")
+        sid, row = self._row(symbol)
+        return self._st.feeds[sid].window(series, max(0, row + 1 - n), row + 1)
+
+    def position_size(self, symbol: str) -> float:
+        return self._broker.get_position_qty(symbol)
+
+    def positions(self) -> Dict[str, float]:
+        return self._broker.get_positions()
+
+    def cash(self) -> float:
+        return self._broker.get_cash()
+
+    def equity(self) -> float:
+        return self._broker.equity()
+
+
+class _State:
+    """Фиды портфеля и текущая строка каждого из них."""
+
+    __slots__ = ("feeds", "names", "ids", "rows")
+
+    def __init__(self, feeds: Sequence[DataFeed]) -> None:
+        self.feeds = list(feeds)
+        self.names = [f.symbol for f in self.feeds]
+        self.ids = {name: sid for sid, name in enumerate(self.names)}
+        self.rows = [-1] * len(self.feeds)
+
+
+class PortfolioEngine:
+    """
+    Движок для портфеля из многих инструментов.
+
+    Фиды (по одному на инструмент, символ берётся из ``DataFeed.symbol``)
+    сливаются по времени k-путевым слиянием на куче: в куче лежит по одной
+    следующей метке времени на фид, так что обработка метки стоит
+    ``O(k log S)``, где ``k`` — число инструментов с баром на этой метке,
+    ``S`` — размер вселенной. Бары не материализуются: контекст читает
+    цены прямо из колонок фидов.
+
+    На каждой метке времени движок:
+
+    1. исполняет отложенные ордера (режим ``on_next_open``) по ``open``
+       нового бара инструмента;
+    2. обновляет оценку позиций по ``close``;
+    3. вызывает ``strategy.on_bars(ctx)`` и исполняет действия по ``close``
+       (``on_close``) или откладывает их до следующего бара инструмента
+       (действие по инструменту без бара на этой метке исполняется по его
+       последней цене закрытия);
+    4. закрывает позицию по инструменту, у которого это последний бар
+       (по цене исполнения режима, как ``Engine``);
+    5. записывает equity и вызывает анализаторы.
+
+    Первые ``strategy.warmup()`` меток времени стратегия не вызывается
+    и в кривую equity не попадают.
+    """
+
+    def __init__(self) -> None:
+        self._feeds: List[DataFeed] = []
+        self._strategy: PortfolioStrategy | None = None
+        self._settings = BacktestSettings()
+        self._analyzers: List[Analyzer | BatchAnalyzer] = []
+        self.add_analyzer(DrawdownAnalyzer())
+
+    def set_data(self, feeds: Sequence[DataFeed]) -> None:
+        """Задать фиды инструментов; символы фидов должны быть непустыми и различными."""
+        seen = set()
+        for feed in feeds:
+            if not feed.symbol:
+                raise ValidationError("Portfolio feeds must have a symbol")
+            if feed.symbol in seen:
+                raise ValidationError(f"Duplicate symbol in portfolio: {feed.symbol}")
+            seen.add(feed.symbol)
+        self._feeds = list(feeds)
+
+    def set_strategy(self, strategy: PortfolioStrategy) -> None:
+        self._strategy = strategy
+
+    def configure(self, settings: BacktestSettings) -> None:
+        self._settings = settings
+
+    def add_analyzer(self, analyzer: Analyzer | BatchAnalyzer) -> None:
+        self._analyzers.append(analyzer)
+
+    def clear_analyzers(self) -> None:
+        self._analyzers.clear()
+
+    def run(self) -> BacktestResult:
+        assert self._strategy is not None, "Strategy not set"
+        strategy = self._strategy
+        settings = self._settings
+        full = settings.record is RecordLevel.FULL
+        broker = PortfolioBroker(
+            commission_pct=settings.commission_pct,
+            lot_size=settings.lot_size,
+            record_trades=settings.record is not RecordLevel.METRICS,
+        )
+        broker.reset(settings.initial_cash)
+
+        st = _State(self._feeds)
+        ctx = _Context(st, broker)
+        on_close = settings.execution_mode is ExecutionMode.ON_CLOSE
+        warmup = max(0, strategy.warmup())
+        names = st.names
+        rows = st.rows
+        ids = st.ids
+        stamps = [f.timestamps() for f in st.feeds]
+        closes = [f.column("close") for f in st.feeds]
+        opens = [f.column("open") for f in st.feeds]
+        lasts = [f.size() - 1 for f in st.feeds]
+        tz = next((f.tz for f in st.feeds if f.size()), None)
+        per_bar, batch = split_analyzers(self._analyzers)
+        recorder = ChunkRecorder(batch) if batch else None
+
+        heap: List[Tuple[int, int]] = [(stamps[sid][0], sid) for sid in range(len(st.feeds)) if lasts[sid] >= 0]
+        heapq.heapify(heap)
+        pending: Dict[str, Action] = {}
+        index = array("q")
+        equity = array("d")
+        step = 0
+
+        while heap:
+            ts = heap[0][0]
+            due: List[int] = []
+            while heap and heap[0][0] == ts:
+                sid = heap[0][1]
+                row = rows[sid] + 1
+                rows[sid] = row
+                due.append(sid)
+                if row < lasts[sid]:
+                    heapq.heapreplace(heap, (stamps[sid][row + 1], sid))
+                else:
+                    heapq.heappop(heap)
+
+            dt = from_epoch_us(ts, tz)
+            if pending:
+                for sid in due:
+                    act = pending.pop(names[sid], None)
+                    if act is not None:
+                        broker.execute(names[sid], act, opens[sid][rows[sid]], dt)
+            for sid in due:
+                broker.mark(names[sid], closes[sid][rows[sid]])
+
+            if step >= warmup:
+                ctx._dt = dt
+                ctx._symbols = [names[sid] for sid in due]
+                actions = strategy.on_bars(ctx)
+                if actions:
+                    for symbol, act in actions.items():
+                        if act.side is ActionSide.HOLD:
+                            continue
+                        if act.order_type is not OrderType.MARKET:
+                            raise ValidationError("PortfolioEngine supports market orders only")
+                        target = ids.get(symbol)
+                        if target is None:
+                            raise ValidationError(f"Unknown symbol: {symbol}")
+                        if on_close:
+                            row = rows[target]
+                            if row < 0:
+                                raise ValidationError(f"No bars yet for {symbol}")
+                            broker.execute(symbol, act, closes[target][row], dt)
+                        elif rows[target] < lasts[target]:
+                            pending[symbol] = act
+
+            for sid in due:
+                if rows[sid] == lasts[sid] and broker.get_position_qty(names[sid]) > 0:
+                    # Как в Engine: цена авто-выхода зависит от режима исполнения.
+                    price = (closes if on_close else opens)[sid][rows[sid]]
+                    broker.execute(names[sid], _AUTO_EXIT, price, dt)
+
+            if step >= warmup:
+                eq = broker.equity()
+                if full:
+                    index.append(ts)
+                    equity.append(eq)
+                elif equity:
+                    equity[0] = eq
+                else:
+                    equity.append(eq)
+                if recorder is not None:
+                    recorder.push(ts, eq, eq - broker.get_cash())
+                for analyzer in per_bar:
+                    analyzer.on_bar(dt, eq)
+            step += 1
+
+        if recorder is not None:
+            recorder.flush()
+
+        return _build_result(
+            TimeIndex(index, tz), equity, broker.get_trades(), settings, self._analyzers, broker.trade_count()
+        )
+
+
+__all__ = ["PortfolioEngine", "PortfolioBroker"]
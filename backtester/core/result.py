@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List
 
+from .series import EquityCurve
 from .types import Trade, TimeSeries
 from .settings import BacktestSettings
 
+if TYPE_CHECKING:
+    from .timing import RunTimings
+
 
 @dataclass(slots=True)
 class BacktestResult:
@@ -20,21 +23,30 @@ class BacktestResult:
         Список совершённых сделок.
 
     equity_curve
-        История equity во времени в виде списка кортежей (dt, equity).
+        История equity во времени: последовательность пар (dt, equity).
+        Хранится компактно (:class:`~backtester.core.series.EquityCurve`:
+        индекс времени ``times`` и значения ``values``), пары создаются
+        при обращении; сравнивается со списком кортежей.
 
     settings
         Настройки бэктеста, с которыми был запущен прогон.
 
     series
         Дополнительные временные ряды (например, equity как TimeSeries),
-        доступные по строковым ключам.
+        доступные по строковым ключам. Ряды разделяют индекс времени
+        с ``equity_curve``, а ``series["equity"]`` — ещё и значения.
+
+    timings
+        Время прогона по фазам и задержки ``on_bar``, если у движка
+        включён замер (``Engine.set_timing``); иначе ``None``.
     """
 
     metrics: Dict[str, float]
     trades: List[Trade]
-    equity_curve: List[Tuple[datetime, float]]
+    equity_curve: EquityCurve
     settings: BacktestSettings
     series: Dict[str, TimeSeries] = field(default_factory=dict)
+    timings: RunTimings | None = None
 
 
 __all__ = ["BacktestResult"]
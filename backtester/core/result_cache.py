@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from datetime import date, datetime, time, timedelta, tzinfo
+from enum import Enum
+from typing import Any, Dict, List, Sequence
+
+from .datafeed import DataFeed, from_epoch_us, to_epoch_us
+from .enums import RecordLevel, TradeSide
+from .feed_cache import CACHE_DIR_ENV, DEFAULT_MAX_BYTES, DiskLRU, tz_fields, tz_from_fields
+from .result import BacktestResult
+from .series import EquityCurve, TimeIndex, Values, empty_curve
+from .settings import BacktestSettings
+from .types import TimeSeries, Trade
+
+# Версия формата записи и ключа: записи другой версии просто не находятся.
+FORMAT_VERSION = 1
+
+_MAGIC = b"BTRES001"
+_SUFFIX = ".result"
+# magic, порядок байт, флаг tz, смещение tz (с), длина кривой, число сделок, длина JSON
+_HEADER = struct.Struct("<8scbiqqI")
+_BYTEORDER = b"<" if sys.byteorder == "little" else b">"
+_SIDES = (TradeSide.BUY, TradeSide.SELL)
+# Глубина обхода состояния стратегии и анализаторов при построении ключа.
+_MAX_DEPTH = 8
+# Значения, которые описываются своим repr.
+_PRIMITIVES = (bool, int, float, str, bytes, date, time, timedelta)
+
+
+def default_result_dir() -> str:
+    """Каталог кэша результатов: ``$BACKTESTER_CACHE_DIR/results`` или ``$XDG_CACHE_HOME/backtester/results``."""
+    explicit = os.environ.get(CACHE_DIR_ENV)
+    if explicit:
+        return os.path.join(explicit, "results")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "backtester", "results")
+
+
+class Uncacheable(Exception):
+    """Состояние стратегии или анализатора нельзя однозначно описать ключом."""
+
+
+class ResultCache(DiskLRU):
+    """
+    Дисковый кэш результатов :meth:`Engine.run <backtester.core.engine.Engine.run>`
+    с адресацией по содержимому.
+
+    Ключ — хэш от содержимого фида (:meth:`DataFeed.fingerprint`),
+    класса движка, класса и состояния стратегии (параметры и всё, что она
+    хранит до прогона, включая индикаторы), :class:`BacktestSettings`,
+    набора анализаторов с их настройками, а также исходного кода пакетов
+    ``core``, ``indicators``, ``strategies`` и модулей, где определены классы
+    стратегии/анализаторов, — правка кода делает старые записи
+    недостижимыми. Если в состоянии встречается то, что нельзя описать
+    однозначно (функция, открытый файл, множество объектов, ...), прогон идёт мимо кэша и
+    учитывается в ``bypassed``.
+
+    Запись бинарная: кривая equity и сделки — байты колонок ``int64`` /
+    ``float64``, метрики — JSON. Суммарный размер каталога ограничен
+    ``max_bytes`` с вытеснением давно не использованных записей
+    (см. :class:`~backtester.core.feed_cache.DiskLRU`).
+    """
+
+    suffix = _SUFFIX
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        super().__init__(directory or default_result_dir(), max_bytes)
+        self.bypassed = 0
+
+    def key(
+        self,
+        engine: type,
+        feed: DataFeed,
+        strategy: Any,
+        settings: BacktestSettings,
+        analyzers: Sequence[Any],
+    ) -> str | None:
+        """Ключ прогона или ``None``, если состояние не описывается однозначно."""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{FORMAT_VERSION}\0{_code_digest()}\0{feed.fingerprint()}\0{settings!r}\0".encode())
+        try:
+            _digest(engine, h, 0, set())
+            _digest(strategy, h, 0, set())
+            _digest(list(analyzers), h, 0, set())
+        except Uncacheable:
+            self.bypassed += 1
+            return None
+        return h.hexdigest()
+
+    def get(self, key: str, settings: BacktestSettings) -> BacktestResult | None:
+        """Результат по ключу (с переданными настройками) или ``None``."""
+        data = self._read(key)
+        result = None
+        if data is not None:
+            try:
+                result = _read_result(data, settings)
+            except (ValueError, struct.error):
+                result = None
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: BacktestResult, tz: tzinfo | None) -> None:
+        """Сохранить результат; ``tz`` — часовой пояс фида (меток кривой и сделок)."""
+        payload = _write_result(result, tz)
+        if payload is not None:
+            self._write(key, payload)
+
+    def stats(self) -> Dict[str, float]:
+        """Счётчики попаданий/промахов/обходов, доля попаданий и размер каталога."""
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "bypassed": float(self.bypassed),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": float(len(entries)),
+            "size_bytes": float(sum(size for _, size, _ in entries)),
+        }
+
+
+# Пакеты, код которых определяет результат прогона: их исходники входят в ключ целиком.
+_CODE_PACKAGES = ("core", "indicators", "strategies")
+
+# Хэши исходного кода: пакеты — один раз на процесс, модули — один раз на модуль.
+_code: List[str] = []
+_module_digests: Dict[str, str] = {}
+
+
+def _code_digest() -> str:
+    if not _code:
+        h = hashlib.blake2b(digest_size=20)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for package in _CODE_PACKAGES:
+            directory = os.path.join(root, package)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py"):
+                    with open(os.path.join(directory, name), "rb") as f:
+                        h.update(f"{package}/{name}\0".encode() + f.read())
+        _code.append(h.hexdigest())
+    return _code[0]
+
+
+def _module_digest(module_name: str) -> str:
+    """
+    Хэш исходника модуля целиком: правка вспомогательной функции рядом
+    с классом стратегии тоже меняет ключ, а не только тело класса.
+    """
+    digest = _module_digests.get(module_name)
+    if digest is None:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(module_name.encode() + b"\0")
+        module = sys.modules.get(module_name)
+        try:
+            h.update(inspect.getsource(module).encode())  # type: ignore[arg-type]
+        except (OSError, TypeError):
+            # Модуль без исходника (встроенный, REPL, __main__ из stdin): только имя.
+            pass
+        digest = _module_digests[module_name] = h.hexdigest()
+    return digest
+
+
+def _class_digest(cls: type) -> str:
+    return f"{_module_digest(cls.__module__)}:{cls.__qualname__}"
+
+
+def _digest(obj: Any, h: Any, depth: int, seen: set) -> None:
+    """Записать в хэш ``h`` однозначное описание значения ``obj``."""
+    if depth > _MAX_DEPTH:
+        raise Uncacheable("state is nested too deeply")
+    if obj is None or isinstance(obj, _PRIMITIVES):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+        return
+    if isinstance(obj, Enum):
+        h.update(f"{type(obj).__qualname__}.{obj.name};".encode())
+        return
+    if isinstance(obj, (bytes, bytearray)):
+        h.update(b"b%d:" % len(obj) + bytes(obj))
+        return
+    if isinstance(obj, array):
+        h.update(f"a{obj.typecode}{len(obj)}:".encode())
+        h.update(obj)
+        return
+    if isinstance(obj, memoryview):
+        h.update(f"m{obj.format}{len(obj)}:".encode())
+        h.update(obj)
+        return
+    if isinstance(obj, DataFeed):
+        h.update(f"feed:{obj.fingerprint()};".encode())
+        return
+    if isinstance(obj, type):
+        h.update(f"class:{_class_digest(obj)};".encode())
+        return
+    if id(obj) in seen:
+        raise Uncacheable("state has cycles")
+    seen.add(id(obj))
+    try:
+        if isinstance(obj, (list, tuple, deque)):
+            h.update(f"{type(obj).__name__}{len(obj)}[".encode())
+            for item in obj:
+                _digest(item, h, depth + 1, seen)
+            h.update(b"]")
+            return
+        if isinstance(obj, (set, frozenset)):
+            # Порядок обхода множества зависит от хэшей, а repr произвольных
+            # объектов — от адресов: однозначен только порядок примитивов.
+            if not all(item is None or isinstance(item, _PRIMITIVES) for item in obj):
+                raise Uncacheable("set of non-primitive values")
+            h.update(f"{type(obj).__name__}{len(obj)}{{".encode())
+            for item in sorted(obj, key=lambda v: (type(v).__name__, repr(v))):
+                _digest(item, h, depth + 1, seen)
+            h.update(b"}")
+            return
+        if isinstance(obj, dict):
+            h.update(f"dict{len(obj)}{{".encode())
+            for k, v in obj.items():
+                _digest(k, h, depth + 1, seen)
+                _digest(v, h, depth + 1, seen)
+            h.update(b"}")
+            return
+        attrs = _attributes(obj)
+        if attrs is None:
+            raise Uncacheable(f"cannot describe {type(obj).__qualname__}")
+        h.update(f"obj:{_class_digest(type(obj))}{{".encode())
+        for name in sorted(attrs):
+            h.update(name.encode() + b"=")
+            _digest(attrs[name], h, depth + 1, seen)
+        h.update(b"}")
+    finally:
+        seen.discard(id(obj))
+
+
+def _attributes(obj: Any) -> Dict[str, Any] | None:
+    """Атрибуты экземпляра из ``__dict__`` и ``__slots__``; ``None`` — это не «данные»."""
+    if inspect.isroutine(obj) or inspect.ismodule(obj) or inspect.isgenerator(obj):
+        return None
+    slots: List[str] = []
+    for klass in type(obj).__mro__:
+        names = getattr(klass, "__slots__", ())
+        slots.extend((names,) if isinstance(names, str) else names)
+    if not hasattr(obj, "__dict__") and not slots:
+        # Объект без атрибутов Python (файл, сокет, объект C-расширения).
+        return None
+    attrs: Dict[str, Any] = dict(getattr(obj, "__dict__", {}))
+    for name in slots:
+        if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+            attrs[name] = getattr(obj, name)
+    return attrs
+
+
+def _write_result(result: BacktestResult, tz: tzinfo | None) -> bytes | None:
+    fields = tz_fields(tz)
+    if fields is None or any(t.symbol for t in result.trades):
+        return None
+    ts = result.equity_curve.times.timestamps()
+    values = result.equity_curve.values.buffer()
+    trades = result.trades
+    meta = json.dumps({"metrics": result.metrics}).encode()
+    parts = [
+        _HEADER.pack(_MAGIC, _BYTEORDER, fields[0], fields[1], len(ts), len(trades), len(meta)),
+        meta,
+        bytes(ts),
+        bytes(values),
+        array("q", [to_epoch_us(t.dt) for t in trades]).tobytes(),
+        array("b", [0 if t.side is TradeSide.BUY else 1 for t in trades]).tobytes(),
+        array("d", [t.price for t in trades]).tobytes(),
+        array("d", [t.qty for t in trades]).tobytes(),
+        array("d", [t.commission for t in trades]).tobytes(),
+    ]
+    return b"".join(parts)
+
+
+def _read_result(data: bytes, settings: BacktestSettings) -> BacktestResult | None:
+    magic, byteorder, tz_flag, tz_offset, n, m, meta_len = _HEADER.unpack_from(data)
+    if magic != _MAGIC or byteorder != _BYTEORDER:
+        return None
+    if len(data) != _HEADER.size + meta_len + 16 * n + 33 * m:
+        return None
+    view = memoryview(data)
+    pos = _HEADER.size
+    metrics = json.loads(bytes(view[pos : pos + meta_len]))["metrics"]
+    pos += meta_len
+
+    def column(typecode: str, count: int) -> array:
+        nonlocal pos
+        col = array(typecode)
+        col.frombytes(view[pos : pos + col.itemsize * count])
+        pos += col.itemsize * count
+        return col
+
+    ts, values = column("q", n), column("d", n)
+    t_ts, t_side = column("q", m), column("b", m)
+    t_price, t_qty, t_comm = column("d", m), column("d", m), column("d", m)
+    tz = tz_from_fields(tz_flag, tz_offset)
+    trades = [
+        Trade.unchecked(from_epoch_us(t, tz), _SIDES[s], p, q, c)
+        for t, s, p, q, c in zip(t_ts, t_side, t_price, t_qty, t_comm)
+    ]
+    if not n:
+        return BacktestResult(metrics=metrics, trades=trades, equity_curve=empty_curve(), settings=settings)
+    index = TimeIndex(ts, tz)
+    vals = Values(values)
+    series = {"equity": TimeSeries(t=index, v=vals)} if settings.record is RecordLevel.FULL else {}
+    return BacktestResult(
+        metrics=metrics,
+        trades=trades,
+        equity_curve=EquityCurve(index, vals),
+        settings=settings,
+        series=series,
+    )
+
+
+__all__ = ["FORMAT_VERSION", "ResultCache", "Uncacheable", "default_result_dir"]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, tzinfo
+from typing import Any, Iterator, Tuple, Union, overload
+
+from .datafeed import from_epoch_us
+
+IntBuffer = Union["array[int]", memoryview]
+FloatBuffer = Union["array[float]", memoryview]
+
+
+def _as_list(other: Any) -> list | None:
+    if isinstance(other, (list, tuple, Sequence)) and not isinstance(other, (str, bytes)):
+        return list(other)
+    return None
+
+
+class TimeIndex(Sequence):
+    """
+    Компактный индекс времени: эпоха в микросекундах (``int64``) и tz.
+
+    ``datetime`` собирается только при обращении к элементу. Индекс может
+    быть ``memoryview`` поверх колонки времени фида — тогда результат
+    бэктеста не хранит собственной копии меток. Сравнивается с любой
+    последовательностью ``datetime`` (например, со списком).
+    """
+
+    __slots__ = ("_ts", "_tz")
+
+    def __init__(self, ts: IntBuffer, tz: tzinfo | None = None) -> None:
+        self._ts = ts
+        self._tz = tz
+
+    @property
+    def tz(self) -> tzinfo | None:
+        return self._tz
+
+    def timestamps(self) -> IntBuffer:
+        """Метки времени в микросекундах от эпохи (без копирования)."""
+        return self._ts
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    @overload
+    def __getitem__(self, i: int) -> datetime: ...
+    @overload
+    def __getitem__(self, i: slice) -> "TimeIndex": ...
+    def __getitem__(self, i):  # type: ignore[no-untyped-def]
+        if isinstance(i, slice):
+            return TimeIndex(memoryview(self._ts)[i], self._tz)
+        return from_epoch_us(self._ts[i], self._tz)
+
+    def __iter__(self) -> Iterator[datetime]:
+        tz = self._tz
+        for ts in self._ts:
+            yield from_epoch_us(ts, tz)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TimeIndex) and other._tz == self._tz:
+            return len(self) == len(other) and list(self._ts) == list(other._ts)
+        items = _as_list(other)
+        return items is not None and list(self) == items
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TimeIndex(len={len(self)}, tz={self._tz!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # memoryview не сериализуется: при pickle индекс копируется в array.
+        return (TimeIndex, (array("q", self._ts), self._tz))
+
+
+class Values(Sequence):
+    """Компактная колонка ``float64``; сравнивается со списком чисел."""
+
+    __slots__ = ("_v",)
+
+    def __init__(self, values: FloatBuffer) -> None:
+        self._v = values
+
+    def buffer(self) -> FloatBuffer:
+        """Исходный массив значений (без копирования)."""
+        return self._v
+
+    def __len__(self) -> int:
+        return len(self._v)
+
+    @overload
+    def __getitem__(self, i: int) -> float: ...
+    @overload
+    def __getitem__(self, i: slice) -> "Values": ...
+    def __getitem__(self, i):  # type: ignore[no-untyped-def]
+        if isinstance(i, slice):
+            return Values(memoryview(self._v)[i])
+        return self._v[i]
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._v)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Values):
+            return list(self._v) == list(other._v)
+        items = _as_list(other)
+        return items is not None and list(self._v) == items
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Values(len={len(self)})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (Values, (array("d", self._v),))
+
+
+class EquityCurve(Sequence):
+    """
+    Кривая equity как последовательность пар ``(datetime, equity)``.
+
+    Хранит только индекс времени и колонку значений; кортежи и ``datetime``
+    создаются при обращении. Сравнивается со списком пар, как прежний
+    ``List[Tuple[datetime, float]]``.
+    """
+
+    __slots__ = ("times", "values")
+
+    def __init__(self, times: TimeIndex, values: Values) -> None:
+        self.times = times
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @overload
+    def __getitem__(self, i: int) -> Tuple[datetime, float]: ...
+    @overload
+    def __getitem__(self, i: slice) -> "EquityCurve": ...
+    def __getitem__(self, i):  # type: ignore[no-untyped-def]
+        if isinstance(i, slice):
+            return EquityCurve(self.times[i], self.values[i])
+        return self.times[i], self.values[i]
+
+    def __iter__(self) -> Iterator[Tuple[datetime, float]]:
+        return zip(self.times, self.values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, EquityCurve):
+            return self.times == other.times and self.values == other.values
+        items = _as_list(other)
+        return items is not None and list(self) == items
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"EquityCurve(len={len(self)})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (EquityCurve, (self.times, self.values))
+
+
+def empty_curve() -> EquityCurve:
+    """Пустая кривая equity (нет данных или warmup занял все бары)."""
+    return EquityCurve(TimeIndex(array("q")), Values(array("d")))
+
+
+__all__ = ["TimeIndex", "Values", "EquityCurve", "empty_curve"]
@@ -2,16 +2,27 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from .enums import ExecutionMode
+from .enums import ExecutionMode, RecordLevel
 from .errors import ValidationError
 
 
 @dataclass(slots=True)
 class BacktestSettings:
+    """
+    Настройки прогона.
+
+    ``record`` — уровень записи результата: ``FULL`` (по умолчанию) —
+    метрики, сделки и кривая equity; ``TRADES`` — метрики и сделки без
+    кривой; ``METRICS`` — только метрики: движок не хранит кривую и не
+    создаёт объекты ``Trade``, а считает лишь число сделок и то, что нужно
+    анализаторам. Метрики на всех уровнях одинаковы.
+    """
+
     initial_cash: float = 10_000.0
     commission_pct: float = 0.0
     execution_mode: ExecutionMode = ExecutionMode.ON_CLOSE
     lot_size: float = 1.0  # шаг количества (1.0 = целые единицы)
+    record: RecordLevel = RecordLevel.FULL
 
     def __post_init__(self) -> None:
         if self.initial_cash <= 0:
@@ -1,26 +1,180 @@
 from __future__ import annotations
 
+from array import array
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Protocol
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Protocol, Sequence
 
+from .enums import ActionSide, ParamType
+from .errors import ValidationError
 from .types import Action
 
+if TYPE_CHECKING:
+    from .datafeed import DataFeed
+
 
 class StrategyContext(Protocol):
-    """Read-only представление состояния для стратегии на одном баре."""
+    """
+    Представление состояния для стратегии на одном баре.
+
+    Всё, кроме :meth:`cancel_orders`, только читает состояние; ордера
+    ставятся возвращаемым из ``on_bar`` действием.
+    """
 
     def position_size(self) -> float: ...
     def cash(self) -> float: ...
     def price(self, series: str = "close") -> float: ...
+    def history(self, series: str = "close", n: int = 1) -> Sequence[float]: ...
     def time(self) -> datetime: ...
     def index(self) -> int: ...
     def equity(self) -> float: ...
+    def orders(self) -> List[Action]: ...
+    def cancel_orders(self, side: ActionSide | None = None) -> None: ...
 
 
 class Strategy(Protocol):
-    """Контракт торговой стратегии."""
+    """
+    Контракт торговой стратегии.
+
+    Необязательный метод ``idle() -> bool``: ``True`` означает, что до
+    исполнения отложенного ордера стратегии нечего делать. Тогда
+    :meth:`Engine.run <backtester.core.engine.Engine.run>` не вызывает
+    ``on_bar`` на барах, где ни один ордер из книги сработать не может, а
+    перепрыгивает сразу к ближайшему бару срабатывания
+    (:class:`~backtester.core.orders.BarSearch`).
+
+    Необязательный атрибут класса ``params`` — кортеж :class:`Param` с
+    параметрами конструктора: по нему реестр стратегий
+    (:mod:`backtester.strategies.registry`) проверяет и приводит значения,
+    пришедшие из командной строки или манифеста.
+    """
 
     name: str
 
     def warmup(self) -> int: ...
     def on_bar(self, ctx: StrategyContext) -> Action: ...
+
+
+_TRUE = frozenset({"1", "true", "yes", "on"})
+_FALSE = frozenset({"0", "false", "no", "off"})
+
+
+@dataclass(frozen=True, slots=True)
+class Param:
+    """
+    Объявление параметра конструктора стратегии.
+
+    ``minimum``/``maximum`` — включительные границы для ``INT``/``FLOAT``.
+    """
+
+    name: str
+    type: ParamType
+    default: Any = None
+    minimum: float | None = None
+    maximum: float | None = None
+    help: str = ""
+
+    def parse(self, value: Any) -> Any:
+        """
+        Привести ``value`` (строку из CLI или значение из JSON) к типу
+        параметра и проверить границы; ошибка — :class:`ValidationError`.
+        """
+        try:
+            out = _PARSERS[self.type](value)
+        except (TypeError, ValueError):
+            raise ValidationError(
+                f"Parameter {self.name} must be {self.type.value}, got {value!r}"
+            ) from None
+        if isinstance(out, (int, float)) and not isinstance(out, bool):
+            if self.minimum is not None and out < self.minimum:
+                raise ValidationError(f"Parameter {self.name} must be >= {self.minimum}, got {out}")
+            if self.maximum is not None and out > self.maximum:
+                raise ValidationError(f"Parameter {self.name} must be <= {self.maximum}, got {out}")
+        return out
+
+
+def _parse_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise TypeError(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(value)
+        return int(value)
+    return int(value)
+
+
+def _parse_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise TypeError(value)
+    return float(value)
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    key = str(value).strip().lower()
+    if key in _TRUE:
+        return True
+    if key in _FALSE:
+        return False
+    raise ValueError(value)
+
+
+def _parse_string(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+_PARSERS = {
+    ParamType.INT: _parse_int,
+    ParamType.FLOAT: _parse_float,
+    ParamType.BOOL: _parse_bool,
+    ParamType.STRING: _parse_string,
+}
+
+
+class SignalStrategy(Strategy, Protocol):
+    """
+    Стратегия, которая умеет посчитать сигналы сразу для всего фида.
+
+    ``signals(feed)`` возвращает по одному значению на бар: ``+1`` — войти
+    в позицию на весь кэш, если позиции нет; ``-1`` — закрыть позицию,
+    если она есть; ``0`` — ничего не делать. Используется
+    :class:`~backtester.core.vector_engine.VectorEngine`.
+    """
+
+    def signals(self, feed: "DataFeed") -> "array[int]": ...
+
+
+class PortfolioContext(Protocol):
+    """
+    Срез портфеля на одну метку времени для :class:`PortfolioStrategy`.
+
+    ``symbols()`` — инструменты, у которых на этой метке есть бар;
+    цены остальных — последние известные.
+    """
+
+    def time(self) -> datetime: ...
+    def symbols(self) -> List[str]: ...
+    def universe(self) -> List[str]: ...
+    def price(self, symbol: str, series: str = "close") -> float: ...
+    def history(self, symbol: str, series: str = "close", n: int = 1) -> Sequence[float]: ...
+    def position_size(self, symbol: str) -> float: ...
+    def positions(self) -> Dict[str, float]: ...
+    def cash(self) -> float: ...
+    def equity(self) -> float: ...
+
+
+class PortfolioStrategy(Protocol):
+    """
+    Контракт стратегии для :class:`~backtester.core.portfolio.PortfolioEngine`.
+
+    ``on_bars`` вызывается один раз на метку времени и возвращает действия
+    по инструментам (``None`` или пустой словарь — ничего не делать).
+    """
+
+    name: str
+
+    def warmup(self) -> int: ...
+    def on_bars(self, ctx: PortfolioContext) -> Mapping[str, Action] | None: ...
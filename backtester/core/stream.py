@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, tzinfo
+from typing import Dict, Iterator
+
+from .datafeed import SERIES, CsvChunkReader, from_epoch_us, to_epoch_us
+from .errors import ValidationError
+from .types import Bar
+
+
+class RingColumn:
+    """
+    Колонка кольцевого буфера с адресацией по абсолютному индексу бара.
+
+    Доступны только последние ``capacity`` баров; обращение к более
+    старому бару — ошибка, а не тихое чтение перезаписанного значения.
+    Буфер имеет длину ``2 * capacity``: каждое значение пишется в две
+    ячейки, ``slot`` и ``slot + capacity``, поэтому любые последние
+    ``k <= capacity`` значений лежат в буфере подряд и отдаются
+    срезом ``memoryview`` без копирования (см. :meth:`StreamFeed.window`).
+    """
+
+    __slots__ = ("_buf", "_cap", "_feed")
+
+    def __init__(self, buf: "array[float]", feed: "StreamFeed") -> None:
+        self._buf = buf
+        self._cap = len(buf) // 2
+        self._feed = feed
+
+    def __getitem__(self, i: int) -> float:
+        n = self._feed._n
+        if i < 0:
+            i += n
+        if not n - self._cap <= i < n:
+            raise IndexError(f"Bar {i} is outside the stream window")
+        return self._buf[i % self._cap]
+
+    def __len__(self) -> int:
+        return self._feed._n
+
+
+class StreamFeed:
+    """
+    Фид для потокового режима: хранит только последние ``capacity`` баров.
+
+    Бары добавляются методом :meth:`push` по мере чтения источника. Порядок
+    проверяется инкрементально: бар с меньшим временем, чем предыдущий, —
+    ошибка, бар с тем же временем пропускается (как дубликат в
+    :meth:`DataFeed.sort_and_validate`). Индексы баров абсолютные, как
+    у :class:`~backtester.core.datafeed.DataFeed`, поэтому контекст и брокер
+    работают с этим фидом без изменений.
+    """
+
+    def __init__(self, capacity: int, symbol: str = "", timeframe: str = "") -> None:
+        if capacity <= 0:
+            raise ValidationError("StreamFeed capacity must be > 0")
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.capacity = capacity
+        self._n = 0
+        self._tz: tzinfo | None = None
+        self._ts = array("q", bytes(8 * capacity))
+        self._bufs = {name: array("d", bytes(16 * capacity)) for name in SERIES}
+        self._views = {name: memoryview(buf) for name, buf in self._bufs.items()}
+        self._cols: Dict[str, RingColumn] = {name: RingColumn(buf, self) for name, buf in self._bufs.items()}
+
+    def push(self, bar: Bar) -> bool:
+        """Добавить бар; вернуть False, если это дубликат предыдущего по времени."""
+        ts = to_epoch_us(bar.dt)
+        n = self._n
+        if n:
+            last = self._ts[(n - 1) % self.capacity]
+            if ts < last:
+                raise ValidationError(
+                    f"Stream bars must be in ascending time order: {bar.dt} after {self.dt(n - 1)}"
+                )
+            if ts == last:
+                return False
+        else:
+            self._tz = bar.dt.tzinfo
+        cap = self.capacity
+        slot = n % cap
+        self._ts[slot] = ts
+        bufs = self._bufs
+        bufs["open"][slot] = bufs["open"][slot + cap] = bar.open
+        bufs["high"][slot] = bufs["high"][slot + cap] = bar.high
+        bufs["low"][slot] = bufs["low"][slot + cap] = bar.low
+        bufs["close"][slot] = bufs["close"][slot + cap] = bar.close
+        bufs["volume"][slot] = bufs["volume"][slot + cap] = bar.volume
+        self._n = n + 1
+        return True
+
+    @property
+    def tz(self) -> tzinfo | None:
+        return self._tz
+
+    def size(self) -> int:
+        """Сколько баров прочитано из источника на данный момент."""
+        return self._n
+
+    def _slot(self, i: int) -> int:
+        if not self._n - self.capacity <= i < self._n:
+            raise IndexError(f"Bar {i} is outside the stream window")
+        return i % self.capacity
+
+    def get(self, i: int) -> Bar:
+        slot = self._slot(i)
+        return Bar.unchecked(
+            from_epoch_us(self._ts[slot], self._tz),
+            self._bufs["open"][slot],
+            self._bufs["high"][slot],
+            self._bufs["low"][slot],
+            self._bufs["close"][slot],
+            self._bufs["volume"][slot],
+        )
+
+    def dt(self, i: int) -> datetime:
+        return from_epoch_us(self._ts[self._slot(i)], self._tz)
+
+    def timestamp(self, i: int) -> int:
+        return self._ts[self._slot(i)]
+
+    def column(self, series: str) -> RingColumn:
+        try:
+            return self._cols[series]
+        except KeyError:
+            raise ValidationError(f"Unknown price series: {series}") from None
+
+    def columns(self) -> Dict[str, RingColumn]:
+        return dict(self._cols)
+
+    def window(self, series: str, start: int, end: int) -> memoryview:
+        """
+        Значения ряда для баров ``[start, end)`` без копирования.
+
+        Все бары диапазона должны быть в окне буфера, иначе —
+        :class:`~backtester.core.errors.ValidationError`.
+        """
+        try:
+            view = self._views[series]
+        except KeyError:
+            raise ValidationError(f"Unknown price series: {series}") from None
+        if start >= end:
+            return view[0:0]
+        cap = self.capacity
+        if start < self._n - cap or end > self._n:
+            raise ValidationError(
+                f"Bars [{start}, {end}) are outside the stream window of {cap} bars; "
+                "increase the strategy lookback"
+            )
+        # Последние значения лежат подряд, заканчиваясь в ячейке slot(end-1) + capacity.
+        stop = (end - 1) % cap + cap + 1
+        return view[stop - (end - start) : stop]
+
+
+def stream_csv(path: str) -> Iterator[Bar]:
+    """
+    Читать бары из CSV по одному, не загружая файл целиком.
+
+    Разбор идёт блоками :class:`~backtester.core.datafeed.CsvChunkReader`,
+    в памяти одновременно находится только текущий блок. Строки должны
+    идти по возрастанию времени (выгрузки Nasdaq идут по убыванию — их
+    нужно развернуть или сконвертировать в хранилище баров).
+    """
+    reader = CsvChunkReader(path)
+    for ts, opens, highs, lows, closes, volumes in reader:
+        tz = reader.tz
+        for k in range(len(ts)):
+            yield Bar.unchecked(
+                from_epoch_us(ts[k], tz),
+                opens[k],
+                highs[k],
+                lows[k],
+                closes[k],
+                volumes[k],
+            )
+
+
+__all__ = ["StreamFeed", "RingColumn", "stream_csv"]
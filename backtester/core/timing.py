@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+from typing import Any, Dict, List, Sequence
+
+from .analyzers import Analyzer, BatchAnalyzer, EquityChunk, split_analyzers
+from .broker import Broker
+from .context import Context
+from .datafeed import DataFeed
+from .stream import StreamFeed
+from .types import Action
+
+# Фазы прогона. feed — чтение данных фида стратегией через контекст;
+# engine — всё, что осталось от общего времени (цикл движка, запись кривой).
+PHASES = ("feed", "strategy", "broker", "analyzers", "engine")
+
+# Под-корзин на каждую степень двойки: относительная ошибка квантиля ~3 %.
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек в наносекундах с логарифмическими корзинами.
+
+    Корзины — как в HDR-гистограммах: значения до ``32`` нс хранятся точно,
+    дальше каждая степень двойки делится на 16 равных корзин. Запись —
+    несколько целочисленных операций, память постоянна (1024 счётчика)
+    при любом числе баров.
+    """
+
+    __slots__ = ("_counts", "count", "total_ns", "max_ns")
+
+    def __init__(self) -> None:
+        self._counts = [0] * (64 * _SUB)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        shift = ns.bit_length() - _SUB_BITS - 1
+        if shift < 0:
+            shift = 0
+        self._counts[shift * _SUB + (ns >> shift)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q: float) -> float:
+        """Квантиль ``q`` (0–100) в наносекундах: середина корзины, не больше максимума."""
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            seen += c
+            if c and seen >= rank:
+                lo, hi = _bucket_bounds(idx)
+                return min((lo + hi) / 2.0, float(self.max_ns))
+        return float(self.max_ns)
+
+    def mean(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def __repr__(self) -> str:
+        return f"LatencyHistogram(count={self.count}, p50={self.percentile(50):.0f}ns, p99={self.percentile(99):.0f}ns)"
+
+
+def _bucket_bounds(idx: int) -> tuple[int, int]:
+    if idx < 2 * _SUB:
+        return idx, idx
+    shift = idx // _SUB - 1
+    mant = idx - shift * _SUB
+    return mant << shift, ((mant + 1) << shift) - 1
+
+
+@dataclass(slots=True)
+class RunTimings:
+    """
+    Время прогона по фазам и задержки ``on_bar``.
+
+    phases
+        Суммарное время фаз (:data:`PHASES`), секунды. ``strategy`` —
+        время ``on_bar`` без чтения фида через контекст (оно в ``feed``).
+
+    on_bar
+        Гистограмма задержек одного вызова ``on_bar`` (включая чтение фида).
+    """
+
+    total: float
+    phases: Dict[str, float]
+    on_bar: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Плоский словарь для логов и дашбордов."""
+        out = {"time_total_s": self.total}
+        for name in PHASES:
+            out[f"time_{name}_s"] = self.phases.get(name, 0.0)
+        out["on_bar_calls"] = float(self.on_bar.count)
+        out["on_bar_mean_us"] = self.on_bar.mean() / 1e3
+        out["on_bar_p50_us"] = self.on_bar.percentile(50) / 1e3
+        out["on_bar_p99_us"] = self.on_bar.percentile(99) / 1e3
+        out["on_bar_max_us"] = self.on_bar.max_ns / 1e3
+        return out
+
+
+class Timing:
+    """
+    Сборщик времени одного прогона.
+
+    Движок с включённым замером (:meth:`Engine.set_timing
+    <backtester.core.engine.Engine.set_timing>`) оборачивает стратегию,
+    брокера, контекст и анализаторы обёртками из этого модуля; сам цикл
+    по барам не меняется. Поэтому без замера накладных расходов нет вовсе,
+    а с замером они ограничены парой вызовов ``perf_counter_ns`` на
+    обращение к компоненту.
+    """
+
+    __slots__ = ("ns", "on_bar", "_start")
+
+    def __init__(self) -> None:
+        self.ns: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.on_bar = LatencyHistogram()
+        self._start = perf_counter_ns()
+
+    def strategy(self, strategy: Any) -> "_TimedStrategy":
+        return _TimedStrategy(strategy, self)
+
+    def broker(self, broker: Broker) -> "_TimedBroker":
+        return _TimedBroker(broker, self)
+
+    def context(self, feed: DataFeed | StreamFeed, broker: Broker) -> "_TimedContext":
+        return _TimedContext(feed, broker, self)
+
+    def analyzers(self, analyzers: Sequence[Analyzer | BatchAnalyzer]) -> List[Any]:
+        # Порядок вызывающего сохраняется: от него зависит порядок ключей метрик.
+        wrapped: List[Any] = []
+        for analyzer in analyzers:
+            per_bar, batch = split_analyzers([analyzer])
+            if batch:
+                wrapped.append(_TimedBatchAnalyzer(batch[0], self))
+            else:
+                wrapped.append(_TimedAnalyzer(per_bar[0], self))
+        return wrapped
+
+    def finish(self) -> RunTimings:
+        total = perf_counter_ns() - self._start
+        ns = dict(self.ns)
+        # Чтение фида внутри on_bar учтено в feed, а не в strategy.
+        ns["strategy"] = max(0, ns["strategy"] - ns["feed"])
+        ns["engine"] = max(0, total - sum(ns[p] for p in PHASES if p != "engine"))
+        return RunTimings(total=total / 1e9, phases={p: v / 1e9 for p, v in ns.items()}, on_bar=self.on_bar)
+
+
+class _TimedStrategy:
+    """Стратегия с замером ``on_bar``; остальные атрибуты — как у исходной."""
+
+    def __init__(self, inner: Any, timing: Timing) -> None:
+        self._inner = inner
+        self._timing = timing
+        self._record = timing.on_bar.record
+        self.name = getattr(inner, "name", type(inner).__name__)
+
+    def on_bar(self, ctx: Any) -> Action:
+        t0 = perf_counter_ns()
+        act = self._inner.on_bar(ctx)
+        dt = perf_counter_ns() - t0
+        self._timing.ns["strategy"] += dt
+        self._record(dt)
+        return act
+
+    def __getattr__(self, attr: str) -> Any:
+        # warmup, lookback, idle, signals...: отсутствующий у стратегии
+        # метод отсутствует и у обёртки (движок проверяет getattr(..., None)).
+        return getattr(self._inner, attr)
+
+
+class _TimedBroker:
+    """Брокер с замером исполнения; чтение состояния — напрямую у исходного."""
+
+    def __init__(self, inner: Broker, timing: Timing) -> None:
+        self._inner = inner
+        self._ns = timing.ns
+        # Чтение состояния на каждом баре — связанные методы исходного
+        # брокера, без __getattr__.
+        self.get_cash = inner.get_cash
+        self.get_position_qty = inner.get_position_qty
+
+    def execute(self, act: Action, i: int, feed: DataFeed | StreamFeed) -> Any:
+        t0 = perf_counter_ns()
+        try:
+            return self._inner.execute(act, i, feed)
+        finally:
+            self._ns["broker"] += perf_counter_ns() - t0
+
+    def fill_orders(self, i: int, feed: DataFeed | StreamFeed) -> None:
+        t0 = perf_counter_ns()
+        try:
+            self._inner.fill_orders(i, feed)
+        finally:
+            self._ns["broker"] += perf_counter_ns() - t0
+
+    def place(self, act: Action) -> None:
+        t0 = perf_counter_ns()
+        try:
+            self._inner.place(act)
+        finally:
+            self._ns["broker"] += perf_counter_ns() - t0
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._inner, attr)
+
+
+class _TimedContext(Context):
+    """Контекст, который считает время чтения фида стратегией."""
+
+    def __init__(self, feed: DataFeed | StreamFeed, broker: Broker, timing: Timing) -> None:
+        super().__init__(feed, broker)
+        self._ns = timing.ns
+
+    def price(self, series: str = "close") -> float:
+        t0 = perf_counter_ns()
+        try:
+            return super().price(series)
+        finally:
+            self._ns["feed"] += perf_counter_ns() - t0
+
+    def history(self, series: str = "close", n: int = 1) -> memoryview:
+        t0 = perf_counter_ns()
+        try:
+            return super().history(series, n)
+        finally:
+            self._ns["feed"] += perf_counter_ns() - t0
+
+    def bar(self) -> Any:
+        t0 = perf_counter_ns()
+        try:
+            return super().bar()
+        finally:
+            self._ns["feed"] += perf_counter_ns() - t0
+
+    def time(self) -> Any:
+        t0 = perf_counter_ns()
+        try:
+            return super().time()
+        finally:
+            self._ns["feed"] += perf_counter_ns() - t0
+
+    def equity(self) -> float:
+        # Оценка позиции читает close из фида.
+        t0 = perf_counter_ns()
+        try:
+            return super().equity()
+        finally:
+            self._ns["feed"] += perf_counter_ns() - t0
+
+
+class _TimedAnalyzer:
+    def __init__(self, inner: Analyzer, timing: Timing) -> None:
+        self._inner = inner
+        self._ns = timing.ns
+        self.name = inner.name
+
+    def on_bar(self, dt: Any, equity: float) -> None:
+        t0 = perf_counter_ns()
+        self._inner.on_bar(dt, equity)
+        self._ns["analyzers"] += perf_counter_ns() - t0
+
+    def finalize(self) -> Dict[str, float]:
+        t0 = perf_counter_ns()
+        try:
+            return self._inner.finalize()
+        finally:
+            self._ns["analyzers"] += perf_counter_ns() - t0
+
+
+class _TimedBatchAnalyzer:
+    def __init__(self, inner: BatchAnalyzer, timing: Timing) -> None:
+        self._inner = inner
+        self._ns = timing.ns
+        self.name = inner.name
+
+    def on_chunk(self, chunk: EquityChunk) -> None:
+        t0 = perf_counter_ns()
+        self._inner.on_chunk(chunk)
+        self._ns["analyzers"] += perf_counter_ns() - t0
+
+    def finalize(self) -> Dict[str, float]:
+        t0 = perf_counter_ns()
+        try:
+            return self._inner.finalize()
+        finally:
+            self._ns["analyzers"] += perf_counter_ns() - t0
+
+
+__all__ = ["LatencyHistogram", "PHASES", "RunTimings", "Timing"]
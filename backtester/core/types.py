@@ -1,10 +1,18 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
-from .enums import ActionSide, TradeSide
+from typing import Sequence
+from .enums import ActionSide, OrderType, TradeSide
 from .errors import ValidationError
 
+_new = object.__new__
+_set = object.__setattr__
+
+# Конструкторы ``unchecked`` ниже — для значений, которые собрал сам движок
+# (колонки фида, цены брокера): проверки __post_init__ там заведомо
+# проходят, а на каждом баре/сделке стоят заметно дороже самой сборки.
+# Данные от пользователя создаются обычным конструктором, с проверками.
+
 @dataclass(slots=True)
 class Bar:
     dt: datetime
@@ -20,6 +28,19 @@ class Bar:
             val = getattr(self, name)
             if not isinstance(val, (int,float)):
                 raise ValidationError(f"Bar.{name} must be float-like")
+    @classmethod
+    def unchecked(
+        cls, dt: datetime, open: float, high: float, low: float, close: float, volume: float = 0.0
+    ) -> "Bar":
+        """Бар без проверок — только для данных, уже проверенных фидом."""
+        bar = _new(cls)
+        bar.dt = dt
+        bar.open = open
+        bar.high = high
+        bar.low = low
+        bar.close = close
+        bar.volume = volume
+        return bar
 
 @dataclass(slots=True)
 class Trade:
@@ -28,6 +49,7 @@ class Trade:
     price: float
     qty: float
     commission: float = 0.0
+    symbol: str = ""  # заполняется в портфельном режиме
     def __post_init__(self) -> None:
         if not isinstance(self.dt, datetime):
             raise ValidationError("Trade.dt must be datetime")
@@ -39,22 +61,82 @@ class Trade:
             raise ValidationError("Trade.qty must be > 0")
         if self.commission < 0:
             raise ValidationError("Trade.commission must be >= 0")
+    @classmethod
+    def unchecked(
+        cls,
+        dt: datetime,
+        side: TradeSide,
+        price: float,
+        qty: float,
+        commission: float = 0.0,
+        symbol: str = "",
+    ) -> "Trade":
+        """Сделка без проверок — для сделок, исполненных брокером."""
+        tr = _new(cls)
+        tr.dt = dt
+        tr.side = side
+        tr.price = price
+        tr.qty = qty
+        tr.commission = commission
+        tr.symbol = symbol
+        return tr
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class Action:
+    # Неизменяемый: готовые действия (HOLD, BUY_ALL, SELL_ALL) можно
+    # возвращать с каждого бара, не создавая новый объект.
+    # order_type LIMIT/STOP — отложенный ордер с уровнем price (см. core.orders).
     side: ActionSide
     qty_hint: float = 0.0
     comment: str = ""
+    order_type: OrderType = OrderType.MARKET
+    price: float = 0.0
     def __post_init__(self) -> None:
         if self.qty_hint < 0:
             raise ValidationError("Action.qty_hint must be >= 0")
+        if self.order_type is not OrderType.MARKET:
+            if self.side is ActionSide.HOLD:
+                raise ValidationError("HOLD cannot be a limit or stop order")
+            if not self.price > 0:
+                raise ValidationError("Limit and stop orders need price > 0")
+    @classmethod
+    def limit(cls, side: ActionSide, price: float, qty_hint: float = 0.0, comment: str = "") -> "Action":
+        """Лимитный ордер: покупка по ``price`` или ниже, продажа по ``price`` или выше."""
+        return cls(side, qty_hint, comment, OrderType.LIMIT, price)
+    @classmethod
+    def stop(cls, side: ActionSide, price: float, qty_hint: float = 0.0, comment: str = "") -> "Action":
+        """Стоп-ордер: покупка при росте до ``price``, продажа при падении до ``price``."""
+        return cls(side, qty_hint, comment, OrderType.STOP, price)
+    @classmethod
+    def unchecked(
+        cls,
+        side: ActionSide,
+        qty_hint: float = 0.0,
+        comment: str = "",
+        order_type: OrderType = OrderType.MARKET,
+        price: float = 0.0,
+    ) -> "Action":
+        """Действие без проверок — для действий, которые строит сам движок."""
+        act = _new(cls)
+        _set(act, "side", side)
+        _set(act, "qty_hint", qty_hint)
+        _set(act, "comment", comment)
+        _set(act, "order_type", order_type)
+        _set(act, "price", price)
+        return act
+
+HOLD = Action(ActionSide.HOLD)
+BUY_ALL = Action(ActionSide.BUY)  # на весь свободный кэш
+SELL_ALL = Action(ActionSide.SELL)  # закрыть позицию целиком
 
 @dataclass(slots=True)
 class TimeSeries:
-    t: List[datetime]
-    v: List[float]
+    # Любые последовательности; движок кладёт сюда компактные
+    # TimeIndex/Values из core.series (сравниваются со списками).
+    t: Sequence[datetime]
+    v: Sequence[float]
     def __post_init__(self) -> None:
         if len(self.t) != len(self.v):
             raise ValidationError("TimeSeries.t and TimeSeries.v must be equal length")
 
-__all__ = ["Bar","Trade","Action","TimeSeries"]
+__all__ = ["Bar","Trade","Action","TimeSeries","HOLD","BUY_ALL","SELL_ALL"]
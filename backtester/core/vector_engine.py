@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from time import perf_counter_ns
+
+from .analyzers import EquityChunk, split_analyzers
+from .engine import _AUTO_EXIT, Engine, _feed_index
+from .enums import ActionSide, ExecutionMode, RecordLevel
+from .errors import ValidationError
+from .result import BacktestResult
+from .timing import Timing
+from .types import Action
+
+_BUY = Action(ActionSide.BUY, 0.0, "signal")
+_SELL = Action(ActionSide.SELL, 0.0, "signal")
+
+
+class VectorEngine(Engine):
+    """
+    Движок для сигнальных стратегий без вызова стратегии на каждом баре.
+
+    Стратегия должна реализовать :class:`~backtester.core.strategy_base.SignalStrategy`:
+    один раз вернуть массив сигналов на весь фид (``+1`` — войти в позицию
+    на весь кэш, если позиции нет; ``-1`` — закрыть позицию, если она есть;
+    ``0`` — ничего не делать). Это ровно та логика, которую встроенные
+    стратегии реализуют в ``on_bar``.
+
+    Дальше движок не проходит по барам по одному: по отсортированным
+    индексам сигналов он бинарным поиском находит следующий бар, на котором
+    состояние позиции может измениться, исполняет там сделку тем же
+    :class:`~backtester.core.broker.Broker` (те же комиссии, округление лота,
+    режимы ``on_close``/``on_next_open`` и авто-выход на последнем баре),
+    а кривую equity между сделками заполняет одним выражением на отрезок.
+    Число шагов цикла пропорционально числу сделок, а не числу баров.
+
+    Результат совпадает с :meth:`Engine.run` для той же стратегии
+    (см. ``tests/test_vector_engine.py``). Если стратегия объявляет
+    ``warmup() > 0``, сигналы до warmup игнорируются.
+
+    При включённом замере (:meth:`Engine.set_timing`) фаза ``strategy`` —
+    это вызов ``signals()``; ``on_bar`` не вызывается, и гистограмма
+    задержек остаётся пустой.
+    """
+
+    def _run(self) -> BacktestResult:
+        assert self._feed is not None
+        assert self._strategy is not None
+        assert self._broker is not None
+
+        feed = self._feed
+        strategy = self._strategy
+        timing = Timing() if self._timing else None
+        broker = self._broker
+        broker.reset(self._settings.initial_cash, self._settings.lot_size)
+        analyzers = self._analyzers
+        if timing is not None:
+            broker = timing.broker(broker)  # type: ignore[assignment]
+            analyzers = timing.analyzers(analyzers)
+
+        n = feed.size()
+        start = max(0, strategy.warmup())
+        if start >= n:
+            return self._build_result(_feed_index(feed, 0, 0), array("d"), broker, analyzers, timing)
+
+        t0 = perf_counter_ns()
+        signals = strategy.signals(feed)
+        if timing is not None:
+            timing.ns["strategy"] += perf_counter_ns() - t0
+        if len(signals) != n:
+            raise ValidationError("Strategy.signals() must return one value per bar")
+        buys = [i for i in range(start, n) if signals[i] > 0]
+        sells = [i for i in range(start, n) if signals[i] < 0]
+
+        closes = feed.column("close")
+        equity = array("d")
+        on_close = self._settings.execution_mode is ExecutionMode.ON_CLOSE
+        full = self._settings.record is RecordLevel.FULL
+        per_bar, batch = split_analyzers(analyzers)
+        # Без записи кривой и без анализаторов equity по барам не нужен вовсе.
+        track = full or bool(analyzers)
+        invested = array("d") if batch else None
+
+        def fill(a: int, b: int) -> None:
+            # Между сделками кэш и позиция постоянны: equity[a:b] одним проходом.
+            if track and a < b:
+                cash = broker.get_cash()
+                qty = broker.get_position_qty()
+                equity.extend([cash + qty * c for c in closes[a:b]])
+                if invested is not None:
+                    invested.extend([qty * c for c in closes[a:b]])
+
+        def next_decision(i: int) -> int:
+            # Ближайший бар >= i, на котором стратегия вернула бы BUY/SELL.
+            events = sells if broker.get_position_qty() > 0 else buys
+            k = bisect_left(events, i)
+            return events[k] if k < len(events) else n
+
+        last = n - 1
+        i = start
+        if on_close:
+            while i < last:
+                d = next_decision(i)
+                if d >= last:
+                    break
+                fill(i, d)
+                broker.execute(_SELL if broker.get_position_qty() > 0 else _BUY, d, feed)
+                fill(d, d + 1)
+                i = d + 1
+            fill(i, last)
+            if next_decision(last) == last:
+                broker.execute(_SELL if broker.get_position_qty() > 0 else _BUY, last, feed)
+        else:
+            pending: Action | None = None
+            while True:
+                if pending is not None:
+                    broker.execute(pending, i, feed)
+                    pending = None
+                if i >= last:
+                    break
+                d = next_decision(i)
+                if d >= last:
+                    break
+                fill(i, d + 1)
+                pending = _SELL if broker.get_position_qty() > 0 else _BUY
+                i = d + 1
+            fill(i, last)
+
+        if broker.get_position_qty() > 0:
+            broker.execute(_AUTO_EXIT, last, feed)
+        fill(last, n)
+
+        index = _feed_index(feed, start, n)
+        if per_bar:
+            for dt, eq in zip(index, equity):
+                for analyzer in per_bar:
+                    analyzer.on_bar(dt, eq)
+        if batch:
+            # Кривая уже целиком в памяти: пакетные анализаторы получают её одним куском.
+            chunk = EquityChunk(index.timestamps(), equity, invested)
+            for analyzer in batch:
+                analyzer.on_chunk(chunk)
+
+        if not full:
+            # Для метрик хватает equity на последнем баре.
+            equity = array("d", [broker.get_cash() + broker.get_position_qty() * closes[last]])
+        return self._build_result(index, equity, broker, analyzers, timing)
+
+
+__all__ = ["VectorEngine"]
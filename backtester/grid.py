@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Sequence, Set, Tuple
+
+from backtester.core.analyzers import DrawdownAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ExecutionMode, RecordLevel
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.core.vector_engine import VectorEngine
+from backtester.strategies.registry import get_strategy, parse_assignments
+
+ENGINES = ("event", "vector")
+
+
+@dataclass(slots=True)
+class FeedSource:
+    """
+    Откуда воркер берёт данные: CSV (через кэш разбора) или хранилище баров.
+
+    Передаётся в процессы вместо самого фида: каждый воркер загружает
+    данные один раз при старте.
+    """
+
+    csv: str | None = None
+    store: str | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+    cache: bool = False
+
+    def __post_init__(self) -> None:
+        if (self.csv is None) == (self.store is None):
+            raise ValidationError("FeedSource needs exactly one of csv or store")
+
+    def load(self) -> DataFeed:
+        if self.store is not None:
+            return DataFeed.open_store(self.store, start=self.start, end=self.end)
+        assert self.csv is not None
+        feed = DataFeed.load_csv(self.csv, cache=self.cache)
+        if self.start is None and self.end is None:
+            return feed
+        return feed.slice(self.start, self.end)
+
+
+@dataclass(slots=True)
+class GridResult:
+    """Метрики одного прогона сетки."""
+
+    params: Dict[str, Any]
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Все комбинации значений параметров (декартово произведение)."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[k] for k in names))]
+
+
+def run_backtest(
+    feed: DataFeed,
+    strategy: str,
+    params: Mapping[str, Any],
+    settings: BacktestSettings,
+    engine: str = "event",
+) -> Dict[str, float]:
+    """
+    Один прогон стратегии ``strategy`` с параметрами ``params``; возвращает метрики.
+
+    Нужны только метрики, поэтому прогон идёт с ``RecordLevel.METRICS``:
+    без кривой equity и объектов ``Trade``.
+    """
+    spec = get_strategy(strategy)
+    if engine not in ENGINES:
+        raise ValidationError(f"Unknown engine: {engine}")
+    eng = VectorEngine() if engine == "vector" else Engine()
+    eng.set_data(feed)
+    eng.set_strategy(spec.create(**params))
+    eng.configure(replace(settings, record=RecordLevel.METRICS))
+    return eng.run().metrics
+
+
+# Состояние процесса-воркера: фид загружается один раз в initializer.
+_worker_feed: DataFeed | None = None
+
+
+def _init_worker(source: FeedSource) -> None:
+    global _worker_feed
+    _worker_feed = source.load()
+
+
+def _run_batch(
+    strategy: str,
+    batch: List[Dict[str, Any]],
+    settings: BacktestSettings,
+    engine: str,
+) -> List[GridResult]:
+    assert _worker_feed is not None, "worker is not initialized"
+    return _run_combos(_worker_feed, strategy, batch, settings, engine)
+
+
+def _run_combos(
+    feed: DataFeed,
+    strategy: str,
+    batch: List[Dict[str, Any]],
+    settings: BacktestSettings,
+    engine: str,
+) -> List[GridResult]:
+    if engine != "event":
+        return [
+            GridResult(params=params, metrics=run_backtest(feed, strategy, params, settings, engine))
+            for params in batch
+        ]
+    # Событийный движок прогоняет всю пачку за один проход по фиду.
+    spec = get_strategy(strategy)
+    settings = replace(settings, record=RecordLevel.METRICS)
+    eng = Engine()
+    eng.set_data(feed)
+    results = eng.run_many([(spec.create(**params), settings, [DrawdownAnalyzer()]) for params in batch])
+    return [GridResult(params=params, metrics=res.metrics) for params, res in zip(batch, results)]
+
+
+def run_grid(
+    source: FeedSource,
+    strategy: str,
+    grid: Mapping[str, Sequence[Any]] | Sequence[Dict[str, Any]],
+    settings: BacktestSettings,
+    workers: int | None = None,
+    batch_size: int | None = None,
+    engine: str = "event",
+    constraint: Callable[[Dict[str, Any]], bool] | None = None,
+) -> Iterator[GridResult]:
+    """
+    Прогнать стратегию на всех комбинациях параметров.
+
+    Комбинации раздаются пулу процессов (``ProcessPoolExecutor``) пачками
+    по ``batch_size``, чтобы накладные расходы на IPC приходились на пачку,
+    а не на один прогон; событийный движок прогоняет пачку за один проход
+    по фиду (:meth:`Engine.run_many`). Каждый воркер загружает фид один раз при старте
+    (CSV — через кэш разбора, хранилище баров — через ``mmap``, страницы
+    которого ОС разделяет между процессами). Результаты отдаются по мере
+    готовности, порядок не гарантируется.
+
+    ``grid`` — словарь «параметр -> значения» (см. :func:`expand_grid`)
+    или готовый список комбинаций. ``constraint`` отбрасывает недопустимые
+    комбинации ещё в родительском процессе (например, ``fast >= slow``).
+    При ``workers=1`` прогоны идут в текущем процессе без пула.
+    """
+    combos = expand_grid(grid) if isinstance(grid, Mapping) else [dict(c) for c in grid]
+    # Плохой параметр — ошибка здесь, а не в воркере посреди перебора.
+    spec = get_strategy(strategy)
+    combos = [spec.bind(c) for c in combos]
+    if constraint is not None:
+        combos = [c for c in combos if constraint(c)]
+    if not combos:
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(combos)))
+    if batch_size is None:
+        # ~4 пачки на воркер: баланс между IPC и равномерной загрузкой.
+        batch_size = min(64, max(1, math.ceil(len(combos) / (workers * 4))))
+    batches = [combos[k : k + batch_size] for k in range(0, len(combos), batch_size)]
+
+    if workers == 1:
+        feed = source.load()
+        for batch in batches:
+            yield from _run_combos(feed, strategy, batch, settings, engine)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+        # Держим в полёте ограниченное число пачек, чтобы не копить
+        # готовые результаты в памяти при больших сетках.
+        todo = iter(batches)
+        running: Set[Future[List[GridResult]]] = set()
+        for batch in itertools.islice(todo, workers * 2):
+            running.add(pool.submit(_run_batch, strategy, batch, settings, engine))
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
+                nxt = next(todo, None)
+                if nxt is not None:
+                    running.add(pool.submit(_run_batch, strategy, nxt, settings, engine))
+
+
+def parse_values(spec: str, kind: Callable[[str], Any] = int) -> List[Any]:
+    """
+    Разобрать значения параметра из командной строки.
+
+    ``5,10,20`` — список; ``10:50:10`` — диапазон ``от:до:шаг``
+    включительно (шаг по умолчанию 1). Значение, которое не приводится
+    к ``kind``, — :class:`ValidationError`.
+    """
+
+    def convert(text: str) -> Any:
+        try:
+            return kind(text.strip())
+        except (TypeError, ValueError):
+            raise ValidationError(f"Bad value {text.strip()!r} in {spec!r}") from None
+
+    if ":" in spec:
+        parts = spec.split(":")
+        if len(parts) not in (2, 3):
+            raise ValidationError(f"Bad range spec: {spec}")
+        lo, hi = convert(parts[0]), convert(parts[1])
+        step = convert(parts[2]) if len(parts) == 3 else convert("1")
+        if step <= 0:
+            raise ValidationError(f"Range step must be > 0: {spec}")
+        count = int(math.floor((hi - lo) / step + 1e-9)) + 1
+        return [lo + k * step for k in range(max(0, count))]
+    return [convert(v) for v in spec.split(",") if v.strip()]
+
+
+def add_sweep_arguments(p: argparse.ArgumentParser) -> None:
+    """Общие аргументы CLI перебора: источник данных, стратегия, сетка, настройки."""
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", help="Path to CSV with bars")
+    src.add_argument("--store", help="Path to a bar store file")
+    p.add_argument("--start", type=datetime.fromisoformat, default=None, help="Only bars >= START")
+    p.add_argument("--end", type=datetime.fromisoformat, default=None, help="Only bars < END")
+    p.add_argument("--cache", action="store_true", help="Use the CSV parse cache")
+    # Прежний флаг: кэш теперь выключен по умолчанию, флаг оставлен для старых скриптов.
+    p.add_argument("--no-cache", action="store_false", dest="cache", help=argparse.SUPPRESS)
+    p.add_argument("--strategy", default="ma", help="Strategy key (bh, ma, donchian or a plugin)")
+    p.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=VALUES",
+        help="Values of a declared strategy parameter (repeatable), e.g. window=10:50:5",
+    )
+    p.add_argument("--fast", default="5", help="MA fast values (for ma), e.g. 3,5,8 or 3:15:2")
+    p.add_argument("--slow", default="10", help="MA slow values (for ma)")
+    p.add_argument("--donchian-window", default="20", help="Donchian window values (for donchian)")
+    p.add_argument("--cash", type=float, default=10_000.0, help="Initial cash")
+    p.add_argument("--commission", type=float, default=0.0, help="Commission, fraction")
+    p.add_argument("--mode", choices=["on_close", "on_next_open"], default="on_close", help="Execution mode")
+    p.add_argument("--lot", type=float, default=1.0, help="Lot size step")
+    p.add_argument("--engine", choices=ENGINES, default="event", help="Engine implementation")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    p.add_argument("--metric", default="return_pct", help="Metric to rank by")
+
+
+def sweep_from_args(
+    args: argparse.Namespace,
+) -> Tuple[FeedSource, Dict[str, List[Any]], Callable[[Dict[str, Any]], bool] | None, BacktestSettings]:
+    """
+    Источник, сетка, ограничение и настройки из аргументов :func:`add_sweep_arguments`.
+
+    Значения ``--param`` разбираются :func:`parse_values` с приведением
+    типа по объявленному стратегией параметру; для ``ma`` и ``donchian``
+    сетка по умолчанию берётся из прежних флагов ``--fast``/``--slow``
+    и ``--donchian-window``.
+    """
+    spec = get_strategy(args.strategy)
+    declared = {p.name: p for p in spec.params}
+    grid: Dict[str, List[Any]] = {}
+    constraint: Callable[[Dict[str, Any]], bool] | None = None
+    if args.strategy == "ma":
+        grid = {"fast": parse_values(args.fast), "slow": parse_values(args.slow)}
+        constraint = _fast_below_slow
+    elif args.strategy == "donchian":
+        grid = {"window": parse_values(args.donchian_window)}
+    for name, values in parse_assignments(args.param).items():
+        param = declared.get(name)
+        if param is None:
+            raise ValidationError(f"Strategy {args.strategy} has no parameter {name!r}")
+        grid[name] = parse_values(values, kind=param.parse)
+
+    source = FeedSource(
+        csv=args.csv,
+        store=args.store,
+        start=args.start,
+        end=args.end,
+        cache=args.cache,
+    )
+    settings = BacktestSettings(
+        initial_cash=args.cash,
+        commission_pct=args.commission,
+        execution_mode=ExecutionMode(args.mode),
+        lot_size=args.lot,
+    )
+    return source, grid, constraint, settings
+
+
+def _fast_below_slow(c: Dict[str, Any]) -> bool:
+    return 0 < c["fast"] < c["slow"]
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    CLI перебора параметров (``backtester-cli grid ...``).
+
+    Пример запуска:
+
+        backtester-cli grid --csv backtester/data/AAPL_5Y.csv \\
+          --strategy ma --fast 3:15:2 --slow 20:100:10 --workers 8
+    """
+    p = argparse.ArgumentParser(prog="backtester-cli grid", description="Parameter grid sweep")
+    add_sweep_arguments(p)
+    p.add_argument("--batch-size", type=int, default=None, help="Combinations per task")
+    p.add_argument("--top", type=int, default=10, help="How many best results to print")
+    args = p.parse_args(argv)
+    try:
+        source, grid, constraint, settings = sweep_from_args(args)
+    except ValidationError as exc:
+        p.error(str(exc))
+
+    results: List[GridResult] = []
+    names = list(grid)
+    print(", ".join([*names, "return_pct", "max_drawdown_pct", "trades"]))
+    for res in run_grid(
+        source,
+        args.strategy,
+        grid if grid else [{}],
+        settings,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        engine=args.engine,
+        constraint=constraint,
+    ):
+        results.append(res)
+        m = res.metrics
+        values = [str(res.params[k]) for k in names]
+        print(
+            ", ".join(
+                [
+                    *values,
+                    f"{m.get('return_pct', 0.0):.4f}",
+                    f"{m.get('max_drawdown_pct', 0.0):.4f}",
+                    f"{m.get('trades', 0.0):.0f}",
+                ]
+            ),
+            flush=True,
+        )
+
+    results.sort(key=lambda r: r.metrics.get(args.metric, float("-inf")), reverse=True)
+    print(f"\n=== TOP {args.top} by {args.metric} ===")
+    for res in results[: args.top]:
+        print(f"{res.params}: {args.metric}={res.metrics.get(args.metric, float('nan')):.4f}")
+
+
+__all__ = ["FeedSource", "GridResult", "expand_grid", "run_backtest", "run_grid", "parse_values"]
@@ -0,0 +1,17 @@
+"""
+Потоковые индикаторы для стратегий.
+
+Каждый индикатор обновляется методом ``update(...)`` на очередном баре
+за ``O(1)`` (в среднем) и хранит не больше своего окна значений.
+``update`` возвращает текущее значение или ``None``, пока окно
+не заполнено; последнее значение доступно в ``value``, готовность —
+в ``ready``.
+"""
+
+from __future__ import annotations
+
+from .extremes import DonchianChannel, RollingMax, RollingMin
+from .moving import EMA, SMA
+from .volatility import ATR, RollingStd
+
+__all__ = ["SMA", "EMA", "RollingMax", "RollingMin", "RollingStd", "ATR", "DonchianChannel"]
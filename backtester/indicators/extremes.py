@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Tuple
+
+from .moving import _check_period
+
+
+class RollingMax:
+    """
+    Максимум за последние ``period`` значений (монотонная очередь).
+
+    В очереди лежат пары (номер, значение) по убыванию значения: новое
+    значение выталкивает с конца все, что не больше него, а с начала
+    уходят элементы, выпавшие из окна. Каждый элемент добавляется
+    и удаляется ровно один раз — ``O(1)`` в среднем на обновление,
+    память не больше ``period`` пар.
+    """
+
+    __slots__ = ("period", "_q", "_n", "value")
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        self._q: Deque[Tuple[int, float]] = deque()
+        self._n = 0
+        self.value: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float) -> float | None:
+        q = self._q
+        n = self._n
+        while q and q[-1][1] <= x:
+            q.pop()
+        q.append((n, x))
+        if q[0][0] <= n - self.period:
+            q.popleft()
+        self._n = n + 1
+        if self._n < self.period:
+            return None
+        self.value = q[0][1]
+        return self.value
+
+
+class RollingMin:
+    """Минимум за последние ``period`` значений; см. :class:`RollingMax`."""
+
+    __slots__ = ("period", "_q", "_n", "value")
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        self._q: Deque[Tuple[int, float]] = deque()
+        self._n = 0
+        self.value: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float) -> float | None:
+        q = self._q
+        n = self._n
+        while q and q[-1][1] >= x:
+            q.pop()
+        q.append((n, x))
+        if q[0][0] <= n - self.period:
+            q.popleft()
+        self._n = n + 1
+        if self._n < self.period:
+            return None
+        self.value = q[0][1]
+        return self.value
+
+
+class DonchianChannel:
+    """
+    Канал Дончиана: максимум ``high`` и минимум ``low`` за ``period`` баров.
+
+    Границы включают последний переданный бар. Стратегии, которым нужен
+    канал по предыдущим барам, читают ``upper``/``lower`` до вызова
+    :meth:`update` с текущим баром.
+    """
+
+    __slots__ = ("period", "_upper", "_lower")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._upper = RollingMax(period)
+        self._lower = RollingMin(period)
+
+    @property
+    def ready(self) -> bool:
+        return self._upper.value is not None
+
+    @property
+    def upper(self) -> float | None:
+        return self._upper.value
+
+    @property
+    def lower(self) -> float | None:
+        return self._lower.value
+
+    @property
+    def middle(self) -> float | None:
+        upper, lower = self._upper.value, self._lower.value
+        if upper is None or lower is None:
+            return None
+        return (upper + lower) / 2.0
+
+    def update(self, high: float, low: float) -> Tuple[float, float] | None:
+        """Добавить бар; вернуть (upper, lower) или None, пока окно не заполнено."""
+        upper = self._upper.update(high)
+        lower = self._lower.update(low)
+        if upper is None or lower is None:
+            return None
+        return upper, lower
+
+
+__all__ = ["RollingMax", "RollingMin", "DonchianChannel"]
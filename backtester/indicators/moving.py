@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+from array import array
+
+from backtester.core.errors import ValidationError
+
+
+def _check_period(period: int) -> None:
+    if period <= 0:
+        raise ValidationError(f"Indicator period must be > 0, got {period}")
+
+
+class SMA:
+    """
+    Простое скользящее среднее за последние ``period`` значений.
+
+    Хранит окно в кольцевом буфере фиксированного размера и скользящую
+    сумму: обновление — одно сложение и одно вычитание. Чтобы ошибка
+    округления не накапливалась, сумма раз в ``period`` обновлений
+    пересчитывается точно (``math.fsum``), что остаётся ``O(1)`` в среднем.
+    """
+
+    __slots__ = ("period", "_buf", "_pos", "_count", "_sum", "value")
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        self._buf = array("d", bytes(8 * period))
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+        self.value: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float) -> float | None:
+        """Добавить значение; вернуть среднее или None, пока окно не заполнено."""
+        pos = self._pos
+        old = self._buf[pos]
+        self._buf[pos] = x
+        pos += 1
+        if pos == self.period:
+            pos = 0
+        self._pos = pos
+        if self._count < self.period:
+            self._count += 1
+            self._sum += x
+            if self._count < self.period:
+                return None
+        elif pos == 0:
+            self._sum = math.fsum(self._buf)
+        else:
+            self._sum += x - old
+        self.value = self._sum / self.period
+        return self.value
+
+    def exact(self) -> float:
+        """
+        Среднее по точной сумме окна (``math.fsum``) — для заполненного окна
+        (:attr:`ready`). Не зависит от истории обновлений и стоит
+        ``O(period)``; нужно, когда важен знак разности близких средних:
+        скользящая сумма может отличаться от точной на несколько ulp.
+        """
+        return math.fsum(self._buf) / self.period
+
+
+class EMA:
+    """
+    Экспоненциальное скользящее среднее с ``alpha = 2 / (period + 1)``.
+
+    Первое значение — простое среднее первых ``period`` значений, дальше
+    ``ema += alpha * (x - ema)``. Память — несколько чисел.
+    """
+
+    __slots__ = ("period", "alpha", "_count", "_seed", "value")
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._count = 0
+        self._seed = 0.0
+        self.value: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float) -> float | None:
+        value = self.value
+        if value is not None:
+            value += self.alpha * (x - value)
+            self.value = value
+            return value
+        self._count += 1
+        self._seed += x
+        if self._count < self.period:
+            return None
+        self.value = self._seed / self.period
+        return self.value
+
+
+__all__ = ["SMA", "EMA"]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from array import array
+
+from backtester.core.errors import ValidationError
+
+from .moving import _check_period
+
+
+class RollingStd:
+    """
+    Стандартное отклонение за последние ``period`` значений.
+
+    Скользящие суммы значений и их квадратов считаются относительно
+    первого значения ряда (сдвиг уменьшает потерю точности на ценах
+    вида ``100 ± 1``) и раз в ``period`` обновлений пересчитываются точно
+    по кольцевому буферу. ``ddof=0`` — стандартное отклонение генеральной
+    совокупности, ``ddof=1`` — выборочное.
+    """
+
+    __slots__ = ("period", "ddof", "_buf", "_pos", "_count", "_shift", "_s1", "_s2", "value")
+
+    def __init__(self, period: int, ddof: int = 0) -> None:
+        _check_period(period)
+        if not 0 <= ddof < period:
+            raise ValidationError(f"RollingStd ddof must be in [0, {period}), got {ddof}")
+        self.period = period
+        self.ddof = ddof
+        self._buf = array("d", bytes(8 * period))
+        self._pos = 0
+        self._count = 0
+        self._shift = 0.0
+        self._s1 = 0.0
+        self._s2 = 0.0
+        self.value: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float) -> float | None:
+        if self._count == 0:
+            self._shift = x
+        d = x - self._shift
+        pos = self._pos
+        old = self._buf[pos]
+        self._buf[pos] = d
+        pos += 1
+        if pos == self.period:
+            pos = 0
+        self._pos = pos
+        if self._count < self.period:
+            self._count += 1
+            self._s1 += d
+            self._s2 += d * d
+            if self._count < self.period:
+                return None
+        elif pos == 0:
+            self._s1 = math.fsum(self._buf)
+            self._s2 = math.fsum(v * v for v in self._buf)
+        else:
+            self._s1 += d - old
+            self._s2 += d * d - old * old
+        n = self.period
+        var = (self._s2 - self._s1 * self._s1 / n) / (n - self.ddof)
+        self.value = math.sqrt(var) if var > 0.0 else 0.0
+        return self.value
+
+
+class ATR:
+    """
+    Средний истинный диапазон (Average True Range) по Уайлдеру.
+
+    Истинный диапазон бара — ``max(high - low, |high - prev_close|,
+    |low - prev_close|)`` (для первого бара — ``high - low``). Первое
+    значение ATR — среднее первых ``period`` диапазонов, дальше
+    ``atr = (atr * (period - 1) + tr) / period``.
+    """
+
+    __slots__ = ("period", "_prev_close", "_count", "_seed", "value")
+
+    def __init__(self, period: int = 14) -> None:
+        _check_period(period)
+        self.period = period
+        self._prev_close: float | None = None
+        self._count = 0
+        self._seed = 0.0
+        self.value: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, high: float, low: float, close: float) -> float | None:
+        prev = self._prev_close
+        tr = high - low
+        if prev is not None:
+            tr = max(tr, abs(high - prev), abs(low - prev))
+        self._prev_close = close
+        value = self.value
+        if value is not None:
+            value = (value * (self.period - 1) + tr) / self.period
+            self.value = value
+            return value
+        self._count += 1
+        self._seed += tr
+        if self._count < self.period:
+            return None
+        self.value = self._seed / self.period
+        return self.value
+
+
+__all__ = ["RollingStd", "ATR"]
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import math
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate
+from operator import mul, sub
+from typing import Dict, List, Sequence, Tuple
+
+from backtester.core.enums import RecordLevel, TradeSide
+from backtester.core.errors import ValidationError
+from backtester.core.result import BacktestResult
+
+METHODS = ("trades", "bars")
+DEFAULT_BATCH = 500
+
+
+def trade_returns(result: BacktestResult) -> List[float]:
+    """
+    Доходности сделок «вход — полный выход» в долях капитала.
+
+    Стратегии long-only и входят из flat-состояния, поэтому в моменты
+    входа и выхода equity равен кэшу: доходность сделки —
+    ``кэш после выхода / кэш до входа - 1`` (комиссии учтены).
+    """
+    cash = result.metrics.get("start_equity", result.settings.initial_cash)
+    qty = 0.0
+    entry_cash = cash
+    out: List[float] = []
+    for tr in result.trades:
+        if tr.side is TradeSide.BUY:
+            if qty <= 0:
+                entry_cash = cash
+            cash -= tr.price * tr.qty + tr.commission
+            qty += tr.qty
+        else:
+            cash += tr.price * tr.qty - tr.commission
+            qty -= tr.qty
+            if qty <= 1e-12:
+                qty = 0.0
+                out.append(cash / entry_cash - 1.0)
+    return out
+
+
+def bar_returns(result: BacktestResult) -> List[float]:
+    """Доходности equity от бара к бару (первая — относительно стартового капитала)."""
+    start = result.metrics.get("start_equity", result.settings.initial_cash)
+    values = [start] + [eq for _, eq in result.equity_curve]
+    return [b / a - 1.0 for a, b in zip(values, values[1:])]
+
+
+@dataclass(slots=True)
+class MonteCarloResult:
+    """
+    Распределения метрик по ``n_paths`` смоделированным траекториям.
+
+    Все массивы одной длины, элемент ``k`` относится к траектории ``k``.
+    ``max_drawdown``/``max_drawdown_pct`` считаются так же, как в
+    :class:`~backtester.core.analyzers.DrawdownAnalyzer`.
+    """
+
+    method: str
+    start_equity: float
+    end_equity: "array[float]"
+    return_pct: "array[float]"
+    max_drawdown: "array[float]"
+    max_drawdown_pct: "array[float]"
+
+    def percentiles(self, metric: str, qs: Sequence[float] = (5, 25, 50, 75, 95)) -> Dict[float, float]:
+        """Перцентили распределения метрики (линейная интерполяция)."""
+        values = sorted(getattr(self, metric))
+        if not values:
+            return {q: 0.0 for q in qs}
+        out = {}
+        for q in qs:
+            pos = (len(values) - 1) * q / 100.0
+            lo = int(pos)
+            hi = min(lo + 1, len(values) - 1)
+            out[q] = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+        return out
+
+    def summary(self) -> Dict[str, float]:
+        """Среднее, 5-й, 50-й и 95-й перцентили по каждой метрике."""
+        out: Dict[str, float] = {}
+        for metric in ("end_equity", "return_pct", "max_drawdown", "max_drawdown_pct"):
+            values = getattr(self, metric)
+            p = self.percentiles(metric, (5, 50, 95))
+            out[f"{metric}_mean"] = math.fsum(values) / len(values) if values else 0.0
+            out[f"{metric}_p5"] = p[5]
+            out[f"{metric}_p50"] = p[50]
+            out[f"{metric}_p95"] = p[95]
+        return out
+
+
+def _simulate_batch(
+    method: str,
+    mults: List[float],
+    n_paths: int,
+    block: int,
+    replace: bool,
+    start: float,
+    seed: int,
+) -> Tuple["array[float]", "array[float]", "array[float]"]:
+    """
+    Смоделировать ``n_paths`` траекторий и вернуть (end equity, max DD, max DD %).
+
+    Траектория собирается срезами списка множителей ``1 + r``, а equity,
+    пики и просадки считаются через ``itertools.accumulate``/``map``, —
+    внутренние циклы идут в C, а не в байткоде.
+    """
+    rnd = random.Random(seed)
+    n = len(mults)
+    ends = array("d")
+    dds = array("d")
+    dd_pcts = array("d")
+    if method == "bars":
+        block = max(1, min(block, n))
+        # Кольцевой бутстрэп блоками: блок может «переходить» через конец ряда.
+        ring = mults + mults[: block - 1]
+        n_blocks = -(-n // block)
+        starts = range(n)
+    for _ in range(n_paths):
+        if method == "trades":
+            path = rnd.choices(mults, k=n) if replace else rnd.sample(mults, n)
+        else:
+            path = []
+            for s in rnd.choices(starts, k=n_blocks):
+                path += ring[s : s + block]
+            del path[n:]
+        equity = list(accumulate(path, mul, initial=start))
+        peaks = list(accumulate(equity, max))
+        drawdowns = list(map(sub, peaks, equity))
+        worst = max(drawdowns)
+        ends.append(equity[-1])
+        dds.append(worst)
+        if worst > 0.0:
+            k = drawdowns.index(worst)
+            dd_pcts.append(worst / peaks[k] * 100.0 if peaks[k] > 0 else 0.0)
+        else:
+            dd_pcts.append(0.0)
+    return ends, dds, dd_pcts
+
+
+def monte_carlo(
+    result: BacktestResult,
+    method: str = "trades",
+    n_paths: int = 10_000,
+    block: int = 20,
+    replace: bool = True,
+    seed: int = 0,
+    workers: int | None = None,
+    batch_size: int | None = None,
+) -> MonteCarloResult:
+    """
+    Monte Carlo проверка устойчивости результата бэктеста без перезапуска движка.
+
+    ``method="trades"`` — траектория из доходностей сделок
+    (:func:`trade_returns`), выбранных с возвращением (``replace=True``)
+    или перестановкой (``replace=False``: конечный капитал тот же, меняется
+    порядок и просадка). ``method="bars"`` — кольцевой блочный бутстрэп
+    доходностей баров (:func:`bar_returns`) с блоками длиной ``block``,
+    сохраняющий автокорреляцию внутри блока.
+
+    Траектории считаются пачками по ``batch_size`` в пуле процессов
+    (``workers=1`` — в текущем процессе). Пачка ``k`` использует генератор
+    с зерном ``seed + k``, поэтому результат не зависит от числа воркеров.
+    """
+    if method not in METHODS:
+        raise ValidationError(f"Unknown Monte Carlo method: {method}")
+    if n_paths <= 0:
+        raise ValidationError("n_paths must be > 0")
+    if block <= 0:
+        raise ValidationError("block must be > 0")
+    needed = RecordLevel.TRADES if method == "trades" else RecordLevel.FULL
+    if result.settings.record is not needed and result.settings.record is not RecordLevel.FULL:
+        raise ValidationError(f"Monte Carlo method {method!r} needs a result recorded at {needed.value!r} level")
+    returns = trade_returns(result) if method == "trades" else bar_returns(result)
+    start = result.metrics.get("start_equity", result.settings.initial_cash)
+    mults = [1.0 + r for r in returns]
+
+    ends = array("d")
+    dds = array("d")
+    dd_pcts = array("d")
+    if mults:
+        batch = batch_size or DEFAULT_BATCH
+        sizes = [min(batch, n_paths - k) for k in range(0, n_paths, batch)]
+        args = [(method, mults, size, block, replace, start, seed + k) for k, size in enumerate(sizes)]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(sizes)))
+        if workers == 1:
+            parts = [_simulate_batch(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_simulate_batch, *zip(*args)))
+        for e, d, dp in parts:
+            ends.extend(e)
+            dds.extend(d)
+            dd_pcts.extend(dp)
+    else:
+        # Нет сделок/баров: все траектории совпадают с исходной.
+        ends = array("d", [start]) * n_paths
+        dds = array("d", bytes(8 * n_paths))
+        dd_pcts = array("d", bytes(8 * n_paths))
+
+    return_pct = array("d", [(e / start - 1.0) * 100.0 for e in ends])
+    return MonteCarloResult(
+        method=method,
+        start_equity=start,
+        end_equity=ends,
+        return_pct=return_pct,
+        max_drawdown=dds,
+        max_drawdown_pct=dd_pcts,
+    )
+
+
+__all__ = ["MonteCarloResult", "trade_returns", "bar_returns", "monte_carlo"]
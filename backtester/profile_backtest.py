@@ -4,26 +4,31 @@ import argparse
 import cProfile
 import pstats
 
+from backtester.bench.memory import MemoryReport, profile_memory
+from backtester.cli import add_strategy_arguments, make_strategy
 from backtester.core.datafeed import DataFeed
 from backtester.core.engine import Engine
 from backtester.core.enums import ExecutionMode
 from backtester.core.settings import BacktestSettings
-from backtester.core.strategy_base import Strategy
-from backtester.strategies.buy_and_hold import BuyAndHold
-from backtester.strategies.ma_cross import MovingAverageCross
-from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.core.errors import ValidationError
 
 
-def _make_strategy(args: argparse.Namespace) -> Strategy:
-    """
-    Построить экземпляр стратегии по аргументам командной строки.
-    Логика совпадает с CLI-бинарником.
-    """
-    if args.strategy == "bh":
-        return BuyAndHold()
-    if args.strategy == "ma":
-        return MovingAverageCross(fast=args.fast, slow=args.slow)
-    return DonchianBreakout(window=args.donchian_window)
+def _settings(args: argparse.Namespace) -> BacktestSettings:
+    return BacktestSettings(
+        initial_cash=args.cash,
+        commission_pct=args.commission,
+        execution_mode=ExecutionMode(args.mode),
+        lot_size=args.lot,
+    )
+
+
+def _print_metrics(metrics: dict) -> None:
+    print("\n=== METRICS (profiling run) ===")
+    for k, v in metrics.items():
+        if isinstance(v, (int, float)):
+            print(f"{k}: {v:.4f}")
+        else:
+            print(f"{k}: {v}")
 
 
 def _run_backtest(args: argparse.Namespace) -> None:
@@ -31,31 +36,58 @@ def _run_backtest(args: argparse.Namespace) -> None:
     Запустить один прогон бэктеста и вывести краткие метрики.
     Используется как «нагрузка» для профилирования.
     """
-    feed = DataFeed.load_csv(args.csv)
+    feed = DataFeed.load_csv(args.csv, cache=args.cache)
 
     eng = Engine()
     eng.set_data(feed)
 
-    strat = _make_strategy(args)
+    strat = make_strategy(args)
     eng.set_strategy(strat)
 
-    eng.configure(
-        BacktestSettings(
-            initial_cash=args.cash,
-            commission_pct=args.commission,
-            execution_mode=ExecutionMode(args.mode),
-            lot_size=args.lot,
-        )
-    )
+    eng.configure(_settings(args))
+    eng.set_timing(args.timing)
 
     result = eng.run()
-
-    print("\n=== METRICS (profiling run) ===")
-    for k, v in result.metrics.items():
-        if isinstance(v, (int, float)):
-            print(f"{k}: {v:.4f}")
-        else:
-            print(f"{k}: {v}")
+    _print_metrics(result.metrics)
+
+    if result.timings is not None:
+        print("\n=== TIMINGS (engine instrumentation) ===")
+        for k, v in result.timings.as_dict().items():
+            print(f"{k}: {v:.6f}")
+
+
+def _run_memory(args: argparse.Namespace) -> None:
+    """Прогон под tracemalloc: пик и удержанная память по фазам, топ аллокаций."""
+    report, result = profile_memory(
+        args.csv,
+        make_strategy(args),
+        _settings(args),
+        cache=args.cache,
+        top=args.lines,
+    )
+    _print_metrics(result.metrics)
+    _print_memory(report)
+
+
+def _print_memory(report: MemoryReport) -> None:
+    kib = 1024.0
+    print(f"\n=== MEMORY (tracemalloc, {report.bars} bars) ===")
+    print(f"{'phase':<18} {'peak KiB':>12} {'retained KiB':>14} {'peak B/bar':>12} {'retained B/bar':>15}")
+    for ph in report.phases:
+        print(
+            f"{ph.name:<18} {ph.peak / kib:>12.1f} {ph.retained / kib:>14.1f} "
+            f"{report.per_bar(ph.peak):>12.1f} {report.per_bar(ph.retained):>15.1f}"
+        )
+    print(
+        f"{'total':<18} {report.peak / kib:>12.1f} {report.retained / kib:>14.1f} "
+        f"{report.per_bar(report.peak):>12.1f} {report.per_bar(report.retained):>15.1f}"
+    )
+    for ph in report.phases:
+        if not ph.top:
+            continue
+        print(f"\n--- top allocation sites: {ph.name} (retained) ---")
+        for site in ph.top:
+            print(f"{site.size / kib:>10.1f} KiB {site.count:>8} blocks  {site.location}")
 
 
 def main() -> None:
@@ -81,20 +113,7 @@ def main() -> None:
         required=True,
         help="Path to CSV with columns: datetime,open,high,low,close[,volume]",
     )
-    p.add_argument(
-        "--strategy",
-        choices=["bh", "ma", "donchian"],
-        default="ma",
-        help="bh=Buy&Hold, ma=Moving Average Cross, donchian=Donchian breakout",
-    )
-    p.add_argument("--fast", type=int, default=5, help="MA fast (for ma)")
-    p.add_argument("--slow", type=int, default=10, help="MA slow (for ma)")
-    p.add_argument(
-        "--donchian-window",
-        type=int,
-        default=20,
-        help="Window for Donchian breakout (for strategy=donchian)",
-    )
+    add_strategy_arguments(p)
     p.add_argument("--cash", type=float, default=10_000.0, help="Initial cash")
     p.add_argument(
         "--commission",
@@ -114,6 +133,23 @@ def main() -> None:
         default=1.0,
         help="Lot size step (e.g. 1 for whole units, 0.1 for tenths)",
     )
+    p.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the on-disk parse cache for the CSV",
+    )
+    # Прежний флаг: кэш теперь выключен по умолчанию, флаг оставлен для старых скриптов.
+    p.add_argument("--no-cache", action="store_false", dest="cache", help=argparse.SUPPRESS)
+    p.add_argument(
+        "--timing",
+        action="store_true",
+        help="Use the engine's per-phase timing instead of cProfile",
+    )
+    p.add_argument(
+        "--memory",
+        action="store_true",
+        help="Report tracemalloc peak/retained memory per phase instead of cProfile",
+    )
     p.add_argument(
         "--sort",
         choices=["time", "cumulative"],
@@ -124,10 +160,24 @@ def main() -> None:
         "--lines",
         type=int,
         default=30,
-        help="Сколько строк показывать в выводе профилировщика.",
+        help="Сколько строк показывать в выводе профилировщика (и мест аллокаций в --memory).",
     )
 
     args = p.parse_args()
+    # Неизвестная стратегия или плохой параметр — ошибка до загрузки CSV.
+    try:
+        make_strategy(args)
+    except ValidationError as exc:
+        p.error(str(exc))
+
+    if args.memory:
+        _run_memory(args)
+        return
+
+    if args.timing:
+        # Встроенный замер движка не искажает время так, как cProfile.
+        _run_backtest(args)
+        return
 
     profiler = cProfile.Profile()
     profiler.enable()
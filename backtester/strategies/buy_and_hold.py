@@ -1,19 +1,29 @@
 from __future__ import annotations
 
+from array import array
+
+from backtester.core.datafeed import DataFeed
 from backtester.core.enums import ActionSide
 from backtester.core.strategy_base import StrategyContext
-from backtester.core.types import Action
+from backtester.core.types import HOLD, Action
+
+_ENTER = Action(ActionSide.BUY, 0.0, "enter")
 
 
 class BuyAndHold:
     """Простейшая стратегия: один раз покупает и держит позицию до конца ряда."""
 
     name = "Buy & Hold"
+    params = ()
 
     def warmup(self) -> int:
         return 0
 
     def on_bar(self, ctx: StrategyContext) -> Action:
         if ctx.position_size() <= 0:
-            return Action(ActionSide.BUY, 0.0, "enter")
-        return Action(ActionSide.HOLD, 0.0)
+            return _ENTER
+        return HOLD
+
+    def signals(self, feed: DataFeed) -> "array[int]":
+        # Входить на каждом баре, пока позиции нет.
+        return array("b", [1]) * feed.size()
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from typing import List
+from array import array
 
-from backtester.core.enums import ActionSide
-from backtester.core.strategy_base import StrategyContext
-from backtester.core.types import Action
+from backtester.core.datafeed import DataFeed
+from backtester.core.enums import ActionSide, ParamType
+from backtester.core.strategy_base import Param, StrategyContext
+from backtester.core.types import HOLD, Action
+from backtester.indicators import DonchianChannel
+
+_BUY = Action(ActionSide.BUY, 0.0, "donchian_breakout_up")
+_SELL = Action(ActionSide.SELL, 0.0, "donchian_breakdown")
 
 
 class DonchianBreakout:
@@ -21,18 +26,18 @@ class DonchianBreakout:
     """
 
     name = "Donchian Breakout"
+    params = (Param("window", ParamType.INT, 20, minimum=2, help="Окно канала, баров"),)
 
     def __init__(self, window: int = 20) -> None:
         if window <= 1:
             # Защита от некорректных параметров, используем дефолт.
             window = 20
         self.window = window
-        self._highs: List[float] = []
-        self._lows: List[float] = []
+        self._channel = DonchianChannel(window)
 
     def warmup(self) -> int:
         """
-        Стратегия сама контролирует готовность по длине внутренних буферов.
+        Стратегия сама контролирует готовность канала.
 
         Возвращаем 0, чтобы движок не пропускал начальные бары целиком.
         """
@@ -42,40 +47,52 @@ class DonchianBreakout:
         """
         Основная логика стратегии на одном баре.
 
-        - обновляем историю high/low;
+        - берём границы канала по предыдущим `window` барам;
+        - добавляем текущий бар в канал (для следующих баров);
         - если истории мало — HOLD;
-        - строим канал по предыдущим `window` барам;
         - проверяем условия входа/выхода.
         """
-        high = ctx.price("high")
-        low = ctx.price("low")
         close = ctx.price("close")
 
-        self._highs.append(high)
-        self._lows.append(low)
+        # Канал строим по ПРЕДЫДУЩИМ барам: читаем границы до обновления.
+        channel = self._channel
+        upper = channel.upper
+        lower = channel.lower
+        channel.update(ctx.price("high"), ctx.price("low"))
 
         # Пока не накопили достаточно истории — ничего не делаем.
-        if len(self._highs) <= self.window:
-            return Action(ActionSide.HOLD, 0.0)
-
-        # Канал строим по ПРЕДЫДУЩИМ барам, текущий бар не включаем.
-        lookback_highs = self._highs[-(self.window + 1) : -1]
-        lookback_lows = self._lows[-(self.window + 1) : -1]
-
-        upper = max(lookback_highs)
-        lower = min(lookback_lows)
+        if upper is None or lower is None:
+            return HOLD
 
         in_pos = ctx.position_size() > 0
 
         # Вход при пробое верхней границы.
         if not in_pos and close > upper:
-            return Action(ActionSide.BUY, 0.0, "donchian_breakout_up")
+            return _BUY
 
         # Выход при пробое вниз нижней границы.
         if in_pos and close < lower:
-            return Action(ActionSide.SELL, 0.0, "donchian_breakdown")
-
-        return Action(ActionSide.HOLD, 0.0)
+            return _SELL
+
+        return HOLD
+
+    def signals(self, feed: DataFeed) -> "array[int]":
+        """+1 при пробое верхней границы канала, -1 при пробое нижней."""
+        highs = feed.column("high")
+        lows = feed.column("low")
+        closes = feed.column("close")
+        out = array("b", bytes(feed.size()))
+        channel = DonchianChannel(self.window)
+        for i, close in enumerate(closes):
+            upper, lower = channel.upper, channel.lower
+            channel.update(highs[i], lows[i])
+            if upper is None or lower is None:
+                continue
+            if close > upper:
+                out[i] = 1
+            elif close < lower:
+                out[i] = -1
+        return out
 
 
 __all__ = ["DonchianBreakout"]
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from array import array
 
-from backtester.core.enums import ActionSide
-from backtester.core.strategy_base import StrategyContext
-from backtester.core.types import Action
+from backtester.core.datafeed import DataFeed
+from backtester.core.enums import ActionSide, ParamType
+from backtester.core.strategy_base import Param, StrategyContext
+from backtester.core.types import HOLD, Action
+from backtester.indicators import SMA
 
+# Действия неизменяемы — возвращаем одни и те же объекты на каждом баре.
+_BUY = Action(ActionSide.BUY, 0.0, "fast>slow")
+_SELL = Action(ActionSide.SELL, 0.0, "fast<slow")
 
-def sma(values: List[float], period: int) -> Optional[float]:
-    """Простое скользящее среднее по последним period значениям."""
-    if len(values) < period:
-        return None
-    window = values[-period:]
-    return sum(window) / float(period)
+# Относительная разность средних, ниже которой знак берётся по точным
+# суммам окон: ошибка скользящей суммы на порядки меньше.
+_TIE_TOL = 1e-9
+
+
+def _cross(fast_ma: SMA, slow_ma: SMA, f: float, s: float) -> int:
+    """Знак ``fast - slow``; почти равные средние сравниваются по точным суммам окон."""
+    if abs(f - s) <= _TIE_TOL * max(abs(f), abs(s)):
+        f, s = fast_ma.exact(), slow_ma.exact()
+    return (f > s) - (f < s)
 
 
 class MovingAverageCross:
@@ -23,27 +32,45 @@ class MovingAverageCross:
     """
 
     name = "MA Cross"
+    params = (
+        Param("fast", ParamType.INT, 5, minimum=1, help="Период короткой SMA"),
+        Param("slow", ParamType.INT, 10, minimum=2, help="Период длинной SMA"),
+    )
 
     def __init__(self, fast: int = 5, slow: int = 10) -> None:
         if fast <= 0 or slow <= 0 or fast >= slow:
             fast, slow = 5, 10
         self.fast = fast
         self.slow = slow
-        self._closes: List[float] = []
+        self._fast_ma = SMA(fast)
+        self._slow_ma = SMA(slow)
 
     def warmup(self) -> int:
-        # Стратегия сама контролирует готовность через sma(...).
+        # Стратегия сама контролирует готовность через индикаторы SMA.
         return 0
 
     def on_bar(self, ctx: StrategyContext) -> Action:
-        self._closes.append(ctx.price("close"))
-        f = sma(self._closes, self.fast)
-        s = sma(self._closes, self.slow)
+        close = ctx.price("close")
+        f = self._fast_ma.update(close)
+        s = self._slow_ma.update(close)
         if f is None or s is None:
-            return Action(ActionSide.HOLD, 0.0)
+            return HOLD
+        cross = _cross(self._fast_ma, self._slow_ma, f, s)
         in_pos = ctx.position_size() > 0
-        if not in_pos and f > s:
-            return Action(ActionSide.BUY, 0.0, "fast>slow")
-        if in_pos and f < s:
-            return Action(ActionSide.SELL, 0.0, "fast<slow")
-        return Action(ActionSide.HOLD, 0.0)
+        if not in_pos and cross > 0:
+            return _BUY
+        if in_pos and cross < 0:
+            return _SELL
+        return HOLD
+
+    def signals(self, feed: DataFeed) -> "array[int]":
+        """+1 при fast > slow, -1 при fast < slow (то же условие, что в on_bar)."""
+        closes = feed.column("close")
+        out = array("b", bytes(feed.size()))
+        fast_ma, slow_ma = SMA(self.fast), SMA(self.slow)
+        for i, close in enumerate(closes):
+            f = fast_ma.update(close)
+            s = slow_ma.update(close)
+            if f is not None and s is not None:
+                out[i] = _cross(fast_ma, slow_ma, f, s)
+        return out
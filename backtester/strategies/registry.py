@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+from backtester.core.errors import ValidationError
+from backtester.core.strategy_base import Param, Strategy
+
+# Группа entry points, в которой сторонние пакеты объявляют стратегии:
+#
+#   [project.entry-points."backtester.strategies"]
+#   my_strategy = "my_package.module:MyStrategy"
+ENTRY_POINT_GROUP = "backtester.strategies"
+
+# Встроенные стратегии: ключ -> (модуль:атрибут, описание).
+_BUILTIN: Dict[str, Tuple[str, str]] = {
+    "bh": ("backtester.strategies.buy_and_hold:BuyAndHold", "Buy & Hold"),
+    "ma": ("backtester.strategies.ma_cross:MovingAverageCross", "Moving Average Cross"),
+    "donchian": ("backtester.strategies.donchian_breakout:DonchianBreakout", "Donchian breakout"),
+}
+
+
+@dataclass(slots=True)
+class StrategySpec:
+    """
+    Стратегия в реестре: ключ и ссылка ``модуль:атрибут`` на фабрику.
+
+    Модуль импортируется при первом обращении к :meth:`load` (или к
+    :attr:`params`/:meth:`create`), а не при регистрации.
+    """
+
+    key: str
+    target: str
+    description: str = ""
+    _factory: Callable[..., Strategy] | None = field(default=None, repr=False, compare=False)
+
+    def load(self) -> Callable[..., Strategy]:
+        if self._factory is None:
+            module, _, attr = self.target.partition(":")
+            if not attr:
+                raise ValidationError(f"Strategy {self.key}: target must be 'module:attr', got {self.target!r}")
+            obj: Any = import_module(module)
+            for part in attr.split("."):
+                obj = getattr(obj, part)
+            self._factory = obj
+        return self._factory
+
+    @property
+    def params(self) -> Tuple[Param, ...]:
+        """Объявленные стратегией параметры (атрибут ``params``); пусто — не объявлены."""
+        return tuple(getattr(self.load(), "params", None) or ())
+
+    def bind(self, values: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Проверить и привести значения параметров.
+
+        Если стратегия объявляет ``params``, неизвестные имена — ошибка,
+        значения приводятся :meth:`Param.parse`, пропущенные остаются
+        значениями по умолчанию конструктора. Без объявления значения
+        передаются как есть.
+        """
+        declared = {p.name: p for p in self.params}
+        if not declared:
+            if values and getattr(self.load(), "params", None) is not None:
+                raise ValidationError(f"Strategy {self.key} takes no parameters, got {sorted(values)}")
+            return dict(values)
+        out: Dict[str, Any] = {}
+        for name, value in values.items():
+            param = declared.get(name)
+            if param is None:
+                raise ValidationError(
+                    f"Strategy {self.key} has no parameter {name!r} (known: {', '.join(declared)})"
+                )
+            out[name] = param.parse(value)
+        return out
+
+    def create(self, **params: Any) -> Strategy:
+        """Экземпляр стратегии с проверенными параметрами."""
+        return self.load()(**self.bind(params))
+
+
+class StrategyRegistry:
+    """
+    Реестр стратегий по ключам CLI.
+
+    Встроенные стратегии известны без импорта; стратегии сторонних пакетов
+    находятся через entry points группы :data:`ENTRY_POINT_GROUP`, но
+    только когда спрошен неизвестный ключ или полный список
+    (:meth:`names`): импорт :mod:`importlib.metadata` и обход метаданных
+    установленных пакетов стоят дороже, чем весь остальной старт CLI.
+    Встроенный ключ entry point не перекрывает.
+    """
+
+    def __init__(self, group: str | None = ENTRY_POINT_GROUP) -> None:
+        self._specs: Dict[str, StrategySpec] = {}
+        self._group = group
+        self._discovered = group is None
+
+    def register(self, key: str, target: str | Callable[..., Strategy], description: str = "") -> StrategySpec:
+        """Зарегистрировать стратегию: ``модуль:атрибут`` или уже импортированную фабрику."""
+        if isinstance(target, str):
+            spec = StrategySpec(key, target, description)
+        else:
+            name = f"{target.__module__}:{target.__qualname__}"
+            spec = StrategySpec(key, name, description, _factory=target)
+        self._specs[key] = spec
+        return spec
+
+    def get(self, key: str) -> StrategySpec:
+        spec = self._specs.get(key)
+        if spec is None:
+            self._discover()
+            spec = self._specs.get(key)
+        if spec is None:
+            raise ValidationError(f"Unknown strategy: {key} (available: {', '.join(self.names())})")
+        return spec
+
+    def names(self) -> List[str]:
+        self._discover()
+        return sorted(self._specs)
+
+    def create(self, key: str, **params: Any) -> Strategy:
+        return self.get(key).create(**params)
+
+    def _discover(self) -> None:
+        group = self._group
+        if self._discovered or group is None:
+            return
+        self._discovered = True
+        from importlib.metadata import entry_points
+
+        for ep in entry_points(group=group):
+            if ep.name not in self._specs:
+                self._specs[ep.name] = StrategySpec(ep.name, ep.value, ep.value)
+
+
+def default_registry() -> StrategyRegistry:
+    """Реестр со встроенными стратегиями и поиском по entry points."""
+    reg = StrategyRegistry()
+    for key, (target, description) in _BUILTIN.items():
+        reg.register(key, target, description)
+    return reg
+
+
+REGISTRY = default_registry()
+
+
+def get_strategy(key: str) -> StrategySpec:
+    """Спецификация стратегии ``key`` из :data:`REGISTRY`."""
+    return REGISTRY.get(key)
+
+
+def create_strategy(key: str, **params: Any) -> Strategy:
+    """Экземпляр стратегии ``key`` из :data:`REGISTRY` с проверкой параметров."""
+    return REGISTRY.create(key, **params)
+
+
+def strategy_names() -> List[str]:
+    """Ключи всех доступных стратегий, включая найденные по entry points."""
+    return REGISTRY.names()
+
+
+def parse_assignments(items: Sequence[str] | None) -> Dict[str, str]:
+    """``["fast=5", "slow=20"]`` -> ``{"fast": "5", "slow": "20"}`` (аргументы ``--param``)."""
+    out: Dict[str, str] = {}
+    for item in items or ():
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            raise ValidationError(f"Expected NAME=VALUE, got {item!r}")
+        out[name.strip()] = value.strip()
+    return out
+
+
+__all__ = [
+    "ENTRY_POINT_GROUP",
+    "REGISTRY",
+    "StrategyRegistry",
+    "StrategySpec",
+    "create_strategy",
+    "default_registry",
+    "get_strategy",
+    "parse_assignments",
+    "strategy_names",
+]
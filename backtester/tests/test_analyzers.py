@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+import math
+import random
+import statistics
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import pytest
 
-from backtester.core.analyzers import DrawdownAnalyzer
+from backtester.core.analyzers import (
+    BatchAnalyzer,
+    CagrAnalyzer,
+    CalmarAnalyzer,
+    ChunkRecorder,
+    DrawdownAnalyzer,
+    EquityChunk,
+    ExposureAnalyzer,
+    SharpeAnalyzer,
+    SortinoAnalyzer,
+    VolatilityAnalyzer,
+)
 from backtester.core.datafeed import DataFeed
 from backtester.core.engine import Engine
 from backtester.core.enums import ActionSide
 from backtester.core.settings import BacktestSettings
 from backtester.core.strategy_base import StrategyContext
 from backtester.core.types import Action, Bar
+from backtester.core.vector_engine import VectorEngine
 from backtester.strategies.buy_and_hold import BuyAndHold
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+DAY_US = 86_400 * 1_000_000
 
 
 def _feed_from_closes(closes: list[float]) -> DataFeed:
@@ -99,3 +119,170 @@ def test_equity_series_matches_equity_curve() -> None:
 
     assert equity_ts.t == times_from_curve
     assert equity_ts.v == values_from_curve
+
+
+def _batch_analyzers() -> list:
+    return [
+        DrawdownAnalyzer(),
+        SharpeAnalyzer(),
+        SortinoAnalyzer(periods_per_year=252),
+        VolatilityAnalyzer(),
+        CagrAnalyzer(),
+        CalmarAnalyzer(),
+        ExposureAnalyzer(),
+    ]
+
+
+def _metrics(analyzers: list) -> dict:
+    out: dict = {}
+    for analyzer in analyzers:
+        out.update(analyzer.finalize())
+    return out
+
+
+def _random_curve(rnd: random.Random, n: int) -> list[float]:
+    eq = [1000.0]
+    for _ in range(n - 1):
+        eq.append(eq[-1] * (1.0 + rnd.gauss(0.0, 0.02)))
+    return eq
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 10_000])
+def test_chunked_metrics_do_not_depend_on_chunk_size(size: int) -> None:
+    """Куски любой длины дают те же метрики, что и один кусок на всю кривую."""
+    rnd = random.Random(size)
+    eq = _random_curve(rnd, 500)
+    ts = [k * DAY_US for k in range(len(eq))]
+    invested = [0.0 if k % 5 == 0 else e * 0.5 for k, e in enumerate(eq)]
+
+    whole = _batch_analyzers()
+    for analyzer in whole:
+        analyzer.on_chunk(EquityChunk(ts, eq, invested))
+
+    chunked = _batch_analyzers()
+    rec = ChunkRecorder(chunked, size=size)
+    for t, e, v in zip(ts, eq, invested):
+        rec.push(t, e, v)
+    rec.flush()
+
+    expected = _metrics(whole)
+    got = _metrics(chunked)
+    assert got.keys() == expected.keys()
+    for key, value in expected.items():
+        assert got[key] == pytest.approx(value, rel=1e-12, abs=1e-12), key
+
+
+def test_drawdown_chunks_match_per_bar_updates() -> None:
+    rnd = random.Random(7)
+    for _ in range(200):
+        n = rnd.randint(1, 60)
+        # В том числе неположительная equity: просадка от такого пика не считается.
+        eq = [rnd.choice([rnd.uniform(-50.0, 0.0), rnd.uniform(0.0, 200.0)]) for _ in range(n)]
+        per_bar = DrawdownAnalyzer()
+        for e in eq:
+            per_bar.on_bar(datetime(2020, 1, 1), e)
+        batch = DrawdownAnalyzer()
+        rec = ChunkRecorder([batch], size=rnd.randint(1, 10))
+        for k, e in enumerate(eq):
+            rec.push(k, e, 0.0)
+        rec.flush()
+        assert batch.finalize() == per_bar.finalize()
+
+
+def test_return_metrics_match_textbook_formulas() -> None:
+    rnd = random.Random(3)
+    eq = _random_curve(rnd, 300)
+    ts = [k * DAY_US for k in range(len(eq))]
+    rets = [b / a - 1.0 for a, b in zip(eq, eq[1:])]
+    chunk = EquityChunk(ts, eq, [0.0] * len(eq))
+
+    sharpe = SharpeAnalyzer(periods_per_year=252, risk_free=0.02)
+    sortino = SortinoAnalyzer(periods_per_year=252)
+    vol = VolatilityAnalyzer(periods_per_year=252)
+    for analyzer in (sharpe, sortino, vol):
+        analyzer.on_chunk(chunk)
+
+    mean = statistics.fmean(rets)
+    std = statistics.stdev(rets)
+    down = math.sqrt(sum(r * r for r in rets if r < 0) / len(rets))
+    assert sharpe.finalize()["sharpe"] == pytest.approx((mean - 0.02 / 252) / std * math.sqrt(252))
+    assert sortino.finalize()["sortino"] == pytest.approx(mean / down * math.sqrt(252))
+    assert vol.finalize()["volatility_pct"] == pytest.approx(std * math.sqrt(252) * 100.0)
+
+
+def test_cagr_calmar_and_exposure_on_known_curve() -> None:
+    # Два года: рост вдвое, затем просадка 10 % и восстановление до 2x.
+    year = int(365.25 * DAY_US)
+    ts = [0, year, year + DAY_US, 2 * year]
+    eq = [100.0, 200.0, 180.0, 200.0]
+    invested = [0.0, 200.0, 180.0, 0.0]
+    analyzers: list[BatchAnalyzer] = [CagrAnalyzer(), CalmarAnalyzer(), ExposureAnalyzer()]
+    for analyzer in analyzers:
+        analyzer.on_chunk(EquityChunk(ts, eq, invested))
+    m = _metrics(analyzers)
+
+    cagr = (math.sqrt(2.0) - 1.0) * 100.0
+    assert m["cagr_pct"] == pytest.approx(cagr)
+    assert m["calmar"] == pytest.approx(cagr / 10.0)
+    assert m["exposure_pct"] == pytest.approx(50.0)
+    assert m["avg_exposure_pct"] == pytest.approx(50.0)
+
+
+def test_batch_analyzers_on_empty_run_return_zeros() -> None:
+    analyzers = _batch_analyzers()
+    ChunkRecorder(analyzers).flush()
+    assert all(v == 0.0 for v in _metrics(analyzers).values())
+
+
+def test_engines_agree_on_batch_metrics() -> None:
+    """Событийный, векторный движок и run_many дают одинаковые пакетные метрики."""
+    feed = DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"))
+    settings = BacktestSettings(initial_cash=10_000.0, commission_pct=0.001)
+
+    results = []
+    for engine in (Engine(), VectorEngine()):
+        engine.set_data(feed)
+        engine.set_strategy(MovingAverageCross(fast=5, slow=20))
+        engine.configure(settings)
+        for analyzer in _batch_analyzers():
+            engine.add_analyzer(analyzer)
+        results.append(engine.run().metrics)
+    eng = Engine()
+    eng.set_data(feed)
+    results.append(eng.run_many([(MovingAverageCross(fast=5, slow=20), settings, _batch_analyzers())])[0].metrics)
+
+    event, vector, many = results
+    assert 0.0 < event["exposure_pct"] < 100.0
+    assert event["sharpe"] != 0.0
+    for key, value in event.items():
+        assert vector[key] == pytest.approx(value, rel=1e-9), key
+        assert many[key] == pytest.approx(value, rel=1e-9), key
+
+
+def test_per_bar_and_batch_analyzers_run_together() -> None:
+    calls: list[float] = []
+
+    class Recorder:
+        name = "recorder"
+
+        def on_bar(self, dt: datetime, equity: float) -> None:
+            calls.append(equity)
+
+        def finalize(self) -> dict:
+            return {"bars_seen": float(len(calls))}
+
+    feed = _feed_from_closes([100.0, 200.0, 50.0])
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(BuyAndHold())
+    eng.configure(BacktestSettings(initial_cash=1000.0))
+    eng.add_analyzer(Recorder())
+    eng.add_analyzer(ExposureAnalyzer())
+
+    result = eng.run()
+
+    assert calls == [1000.0, 2000.0, 500.0]
+    assert result.metrics["bars_seen"] == 3.0
+    assert result.metrics["max_drawdown_pct"] == pytest.approx(75.0)
+    # Позиция открыта на первом баре и закрыта авто-выходом на последнем.
+    assert result.metrics["exposure_pct"] == pytest.approx(200.0 / 3.0)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backtester.core.barstore import BarStore, convert_csv, write_store
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.errors import ValidationError
+from backtester.core.series import EquityCurve
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import Bar
+from backtester.strategies.ma_cross import MovingAverageCross
+
+BASE = datetime(2021, 1, 1)
+
+
+def _write_csv(path, days: list[int]) -> None:
+    lines = ["Date,Close/Last,Volume,Open,High,Low"]
+    for d in days:
+        dt = BASE + timedelta(days=d)
+        p = 100.0 + d
+        lines.append(f"{dt:%m/%d/%Y},${p:.2f},{1000 + d},${p - 1:.2f},${p + 1:.2f},${p - 2:.2f}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _assert_same(a: DataFeed, b: DataFeed) -> None:
+    assert a.size() == b.size()
+    assert list(a.timestamps()) == list(b.timestamps())
+    for name, col in a.columns().items():
+        assert list(b.column(name)) == list(col)
+
+
+@pytest.mark.parametrize("days", [list(range(300)), list(reversed(range(300))), [5, 1, 3, 3, 0, 2, 4]])
+def test_convert_csv_matches_load_csv(tmp_path, days) -> None:
+    # по возрастанию, по убыванию (как Nasdaq) и неупорядоченный файл с дублем
+    csv_path = tmp_path / "bars.csv"
+    _write_csv(csv_path, days)
+    store_path = str(tmp_path / "bars.bts")
+
+    n = convert_csv(str(csv_path), store_path, chunk_rows=32)
+
+    ref = DataFeed.load_csv(str(csv_path))
+    assert n == ref.size()
+    _assert_same(ref, DataFeed.open_store(store_path))
+
+
+def test_store_range_pushdown_matches_slice(tmp_path) -> None:
+    csv_path = tmp_path / "bars.csv"
+    _write_csv(csv_path, list(range(1000)))
+    store_path = str(tmp_path / "bars.bts")
+    convert_csv(str(csv_path), store_path, chunk_rows=50)
+    ref = DataFeed.load_csv(str(csv_path))
+    store = BarStore(store_path)
+
+    # Месячный срез затрагивает только чанки с этим месяцем.
+    start, end = BASE + timedelta(days=400), BASE + timedelta(days=430)
+    assert store.chunk_range(start, end) == (8, 9)
+
+    rng = random.Random(7)
+    for _ in range(50):
+        a, b = sorted(rng.randint(-10, 1010) for _ in range(2))
+        start, end = BASE + timedelta(days=a), BASE + timedelta(days=b)
+        _assert_same(ref.slice(start, end), store.feed(start, end))
+
+
+def test_engine_runs_on_store_feed(tmp_path) -> None:
+    csv_path = tmp_path / "bars.csv"
+    _write_csv(csv_path, [d for d in range(200) if d % 7 < 5])
+    ref = DataFeed.load_csv(str(csv_path))
+    store_path = str(tmp_path / "bars.bts")
+    write_store(ref, store_path, chunk_rows=16)
+
+    def run(feed: DataFeed) -> EquityCurve:
+        eng = Engine()
+        eng.set_data(feed)
+        eng.set_strategy(MovingAverageCross(fast=3, slow=8))
+        eng.configure(BacktestSettings(initial_cash=1000.0))
+        return eng.run().equity_curve
+
+    assert run(DataFeed.open_store(store_path)) == run(ref)
+
+
+def test_open_store_rejects_other_files(tmp_path) -> None:
+    path = tmp_path / "not_a_store.bin"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValidationError):
+        BarStore(str(path))
+
+
+def test_write_store_keeps_caller_feed_and_store_closes(tmp_path) -> None:
+    feed = DataFeed([Bar(dt=BASE + timedelta(days=d), open=d, high=d, low=d, close=d) for d in (3, 1, 2, 1)])
+    store_path = str(tmp_path / "bars.bts")
+    write_store(feed, store_path)
+    assert list(feed.column("close")) == [3.0, 1.0, 2.0, 1.0]
+
+    with BarStore(store_path) as store:
+        assert list(store.feed().column("close")) == [1.0, 2.0, 3.0]
+    assert store._mm.closed
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backtester.batch import load_manifest, metrics_table, parse_manifest, run_batch
+from backtester.cli import main as cli_main
+from backtester.core.datafeed import DataFeed
+from backtester.core.enums import RecordLevel
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.grid import run_backtest
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+AAPL = str(DATA / "AAPL_5Y.csv")
+NVDA = str(DATA / "NVDA_5Y.csv")
+
+
+def _manifest(tmp_path: Path) -> Path:
+    manifest = {
+        "defaults": {"csv": AAPL, "cache": False, "commission": 0.001},
+        "runs": [
+            {"name": "ma", "strategy": "ma", "params": {"fast": 5, "slow": 20}, "equity": "out/ma.csv"},
+            {"name": "ma2", "strategy": "ma", "params": {"fast": "3", "slow": 30}, "trades": "out/ma2_trades.csv"},
+            {"name": "dc", "strategy": "donchian", "params": {"window": 30}, "start": "2022-01-01"},
+            {"name": "bh_vec", "strategy": "bh", "engine": "vector"},
+            {"name": "nvda", "csv": NVDA, "strategy": "ma", "mode": "on_next_open"},
+        ],
+    }
+    path = tmp_path / "runs.json"
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_matches_single_runs_and_writes_outputs(tmp_path: Path, workers: int) -> None:
+    runs = load_manifest(str(_manifest(tmp_path)))
+    assert [r.settings.record for r in runs] == [
+        RecordLevel.FULL,
+        RecordLevel.TRADES,
+        RecordLevel.METRICS,
+        RecordLevel.METRICS,
+        RecordLevel.METRICS,
+    ]
+    assert runs[1].params == {"fast": 3, "slow": 30}
+
+    results = sorted(run_batch(runs, workers=workers), key=lambda r: r.index)
+    assert [r.name for r in results] == ["ma", "ma2", "dc", "bh_vec", "nvda"]
+    for run, res in zip(runs, results):
+        assert run.source.csv is not None
+        feed = DataFeed.load_csv(run.source.csv)
+        feed = feed.slice(run.source.start, run.source.end)
+        assert res.metrics == run_backtest(feed, run.strategy, run.params, run.settings, run.engine)
+
+    equity = (tmp_path / "out" / "ma.csv").read_text(encoding="utf-8").splitlines()
+    assert equity[0] == "datetime,equity"
+    assert len(equity) == DataFeed.load_csv(AAPL).size() + 1
+    with open(tmp_path / "out" / "ma2_trades.csv", encoding="utf-8") as f:
+        trades = list(csv.DictReader(f))
+    assert len(trades) == results[1].metrics["trades"]
+
+
+def test_runs_share_one_feed_per_file(tmp_path: Path, monkeypatch) -> None:
+    loads = []
+    original = DataFeed.load_csv
+
+    def load_csv(path, *args, **kwargs):
+        loads.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(DataFeed, "load_csv", staticmethod(load_csv))
+    list(run_batch(load_manifest(str(_manifest(tmp_path))), workers=1))
+    assert sorted(loads) == sorted([AAPL, NVDA])
+
+
+def test_parse_manifest_rejects_bad_runs(tmp_path: Path) -> None:
+    base = {"csv": AAPL}
+    bad = [
+        [{**base, "strategy": "nope"}],
+        [{**base, "params": {"fast": 0}}],
+        [{**base, "fastt": 5}],
+        [{**base, "name": "x"}, {**base, "name": "x"}],
+        [{**base, "name": "a", "equity": "o.csv"}, {**base, "name": "b", "trades": "o.csv"}],
+        [{**base, "equity": "o.csv", "record": "metrics"}],
+        [{**base, "cash": "lots"}],
+        [{"strategy": "ma"}],
+        {"runs": [], "extra": 1},
+    ]
+    for manifest in bad:
+        with pytest.raises(ValidationError):
+            parse_manifest(manifest, base_dir=str(tmp_path))
+    [run] = parse_manifest([{"csv": "data/x.csv", "equity": "out/e.csv"}], base_dir=str(tmp_path))
+    assert run.source.csv == str(tmp_path / "data" / "x.csv")
+    assert run.equity == str(tmp_path / "out" / "e.csv")
+    assert run.settings == BacktestSettings(record=RecordLevel.FULL)
+
+
+def test_cli_batch_subcommand(tmp_path: Path, capsys) -> None:
+    out = tmp_path / "metrics.csv"
+    cli_main(["batch", str(_manifest(tmp_path)), "--workers", "1", "--metrics-out", str(out)])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "name, strategy, return_pct, max_drawdown_pct, trades"
+    assert sum(1 for line in lines if line.count(",") == 4) == 6
+
+    with open(out, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ["name", "strategy", "params"]
+    assert [r[0] for r in rows[1:]] == ["ma", "ma2", "dc", "bh_vec", "nvda"]
+    assert json.loads(rows[2][2]) == {"fast": 3, "slow": 30}
+    header, _ = metrics_table([])
+    assert header == ["name", "strategy", "params"]
+
+
+def _manifest_with_missing_csv(tmp_path: Path) -> Path:
+    manifest = {
+        "defaults": {"csv": AAPL},
+        "runs": [
+            {"name": "ok", "strategy": "ma", "params": {"fast": 5, "slow": 20}},
+            {"name": "missing", "csv": "nope.csv", "strategy": "ma"},
+            {"name": "vec", "strategy": "bh", "engine": "vector"},
+        ],
+    }
+    path = tmp_path / "runs.json"
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_run_does_not_abort_the_batch(tmp_path: Path, workers: int) -> None:
+    runs = load_manifest(str(_manifest_with_missing_csv(tmp_path)))
+    results = sorted(run_batch(runs, workers=workers), key=lambda r: r.index)
+    assert [r.name for r in results] == ["ok", "missing", "vec"]
+    assert results[0].error is None and results[0].metrics
+    assert results[1].error is not None and "nope.csv" in results[1].error
+    assert results[1].metrics == {}
+    assert results[2].error is None and results[2].metrics
+
+    header, rows = metrics_table(results)
+    assert header[-1] == "error"
+    assert [row[-1] for row in rows] == ["", results[1].error, ""]
+
+
+def test_cli_batch_reports_failures_and_keeps_metrics(tmp_path: Path, capsys) -> None:
+    out = tmp_path / "metrics.csv"
+    with pytest.raises(SystemExit) as exc:
+        cli_main(["batch", str(_manifest_with_missing_csv(tmp_path)), "--workers", "1", "--metrics-out", str(out)])
+    assert exc.value.code == 1
+    captured = capsys.readouterr()
+    assert "missing: FAILED" in captured.err and "1 of 3 runs failed" in captured.err
+    with open(out, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert [r[0] for r in rows[1:]] == ["ok", "missing", "vec"]
+
+
+def test_batch_module_is_runnable() -> None:
+    proc = subprocess.run(
+        [sys.executable, "-m", "backtester.batch", "--help"],
+        capture_output=True,
+        text=True,
+        cwd=str(Path(__file__).resolve().parents[2]),
+    )
+    assert proc.returncode == 0
+    assert "manifest" in proc.stdout
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from backtester.bench.suite import BenchResult, case_names, compare, load_results, run_suite, to_json
+from backtester.core.errors import ValidationError
+
+
+def _res(name: str, rate: float, peak: float | None = 100.0, size: int = 1000) -> BenchResult:
+    return BenchResult(name=name, size=size, unit="bars/s", seconds=size / rate, rate=rate, peak_kib=peak)
+
+
+def test_run_suite_reports_every_selected_case() -> None:
+    results = run_suite(sizes=[300], repeat=1, only=["engine.*", "analyzers.*"], memory=True)
+    names = [r.name for r in results]
+    assert names == [n for n in case_names() if n.startswith(("engine.", "analyzers."))]
+    for r in results:
+        assert r.size == 300
+        assert r.rate > 0
+        assert r.peak_kib is not None and r.peak_kib > 0
+
+
+def test_run_suite_skips_csv_above_limit_and_rejects_unknown_names() -> None:
+    assert run_suite(sizes=[500], repeat=1, only=["csv_load.*"], memory=False, max_csv_rows=100) == []
+    with pytest.raises(ValidationError):
+        run_suite(sizes=[100], only=["no.such.bench"])
+
+
+def test_compare_flags_throughput_and_memory_regressions() -> None:
+    baseline = [_res("a", 1000.0), _res("b", 1000.0), _res("c", 1000.0, peak=100.0), _res("a", 10.0, size=5)]
+    current = [
+        _res("a", 950.0),  # в пределах 10 %
+        _res("b", 800.0),  # медленнее на 20 %
+        _res("c", 1000.0, peak=200.0),  # памяти вдвое больше
+        _res("d", 1.0),  # нет в базовой линии
+    ]
+    regs = compare(current, baseline, threshold=0.10, memory_threshold=0.25)
+    assert [(r.name, r.metric) for r in regs] == [("b", "rate"), ("c", "peak_kib")]
+    assert regs[0].change_pct == pytest.approx(-20.0)
+    assert compare(current, baseline, threshold=0.25, memory_threshold=None) == []
+
+
+def test_report_round_trip(tmp_path) -> None:
+    results = [_res("engine.ma.on_close", 1234.5), _res("broker.execute", 99.0, peak=None)]
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(to_json(results)), encoding="utf-8")
+    assert load_results(str(path)) == results
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["version"] = 999
+    path.write_text(json.dumps(data), encoding="utf-8")
+    with pytest.raises(ValidationError):
+        load_results(str(path))
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import random
 from datetime import datetime, timedelta
+from pathlib import Path
 
-from backtester.core.broker import Broker
+from backtester.core.broker import CASH_TOLERANCE, Broker, affordable_qty, lot_count
 from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
 from backtester.core.enums import ActionSide, ExecutionMode, TradeSide
+from backtester.core.settings import BacktestSettings
 from backtester.core.types import Action, Bar
+from backtester.strategies.ma_cross import MovingAverageCross
 
 
 def _make_feed(prices: list[float]) -> DataFeed:
@@ -56,3 +61,133 @@ def test_broker_commission_reduces_profit() -> None:
 
     # из-за комиссии после buy+sell кэш должен быть < начального
     assert broker.get_cash() < 1000.0
+
+
+def _fits(price: float, qty: float, cash: float, commission_pct: float) -> bool:
+    return price * qty * (1.0 + commission_pct) - cash <= CASH_TOLERANCE
+
+
+def _reference_qty(price: float, lots: int, cash: float, commission_pct: float, lot: float) -> float:
+    """Прежняя семантика: снимать по лоту, пока не хватит кэша (число лотов — целое)."""
+    m = lots
+    while m > 0 and not _fits(price, m * lot, cash, commission_pct):
+        m -= 1
+    return m * lot
+
+
+def _baseline_shrink(price: float, qty: float, cash: float, commission_pct: float, lot: float) -> float:
+    """Исходный Broker._shrink_qty_for_cash дословно: вычитание лота из float и округление."""
+    while qty > 0 and price * qty * (1.0 + commission_pct) - cash > 1e-9:
+        qty -= lot
+    qty = max(qty, 0.0)
+    return int(qty / lot) * lot
+
+
+def test_affordable_qty_matches_lot_by_lot_search() -> None:
+    rnd = random.Random(2024)
+    for _ in range(20_000):
+        lot = rnd.choice([1.0, 0.5, 0.25, 0.1, 0.01, 0.001, 3.0])
+        price = round(rnd.uniform(0.5, 500.0), rnd.choice([0, 2, 4]))
+        commission_pct = rnd.choice([0.0, 0.0005, 0.001, 0.0025, 0.01])
+        cash = round(rnd.uniform(0.0, 20_000.0), 2)
+        all_in = cash / (price * (1.0 + commission_pct))
+        # Эталон перебирает лоты по одному, поэтому превышение — до 500 лотов.
+        want = rnd.choice([all_in * rnd.uniform(0.5, 1.0), all_in, all_in + rnd.randint(1, 500) * lot])
+        lots = int(want / lot)
+        qty = lots * lot
+
+        got = affordable_qty(price, qty, cash, commission_pct, lot)
+        assert got == _reference_qty(price, lots, cash, commission_pct, lot)
+        assert 0.0 <= got <= qty
+        assert _fits(price, got, cash, commission_pct)
+
+
+def test_affordable_qty_against_original_loop_with_fractional_lots() -> None:
+    # Исходный цикл терял лот из-за ошибок float; новый результат не меньше,
+    # больше не более чем на лот, и этот лот действительно помещается в кэш.
+    rnd = random.Random(11)
+    shorter = 0
+    for _ in range(20_000):
+        lot = rnd.choice([0.1, 0.3, 0.7, 0.01, 0.25])
+        price = round(rnd.uniform(0.5, 500.0), 2)
+        commission_pct = rnd.choice([0.0, 0.001, 0.0025])
+        cash = round(rnd.uniform(1.0, 20_000.0), 2)
+        all_in = cash / (price * (1.0 + commission_pct))
+        qty = int(all_in * rnd.uniform(0.5, 1.2) / lot) * lot
+
+        got = affordable_qty(price, qty, cash, commission_pct, lot)
+        old = _baseline_shrink(price, qty, cash, commission_pct, lot)
+        assert _fits(price, got, cash, commission_pct) and got <= qty
+        assert old <= got <= old + lot * (1 + 1e-9)
+        shorter += got > old
+    assert shorter > 0
+
+    # 3 * 0.7 / 0.7 == 2.999...: количество, уже кратное лоту, не теряет лот.
+    assert affordable_qty(1.0, 3 * 0.7, 100.0, 0.0, 0.7) == 3 * 0.7
+    assert lot_count(3 * 0.7, 0.7) == 3
+    assert lot_count(0.3, 0.1) == 2  # 3 * 0.1 == 0.30000000000000004 > 0.3
+
+
+def test_affordable_qty_with_fine_lots_and_huge_hints() -> None:
+    rnd = random.Random(7)
+    for _ in range(2_000):
+        lot = rnd.choice([1e-4, 1e-6, 1e-8])
+        price = rnd.uniform(1.0, 70_000.0)
+        commission_pct = rnd.choice([0.0, 0.001])
+        cash = rnd.uniform(1.0, 1e6)
+        qty = int(rnd.uniform(1e3, 1e9) / lot) * lot
+
+        got = affordable_qty(price, qty, cash, commission_pct, lot)
+        assert _fits(price, got, cash, commission_pct)
+        steps = round(got / lot)
+        # максимальность: на лот больше уже не помещается
+        assert not _fits(price, (steps + 1) * lot, cash, commission_pct)
+
+
+def test_affordable_qty_edge_cases() -> None:
+    assert affordable_qty(100.0, 5.0, 0.0, 0.0, 1.0) == 0.0
+    assert affordable_qty(100.0, 5.0, 500.0, 0.0, 1.0) == 5.0
+    # стоимость ровно на границе допуска всё ещё проходит
+    assert affordable_qty(100.0, 5.0, 500.0 - CASH_TOLERANCE / 2, 0.0, 1.0) == 5.0
+    assert affordable_qty(100.0, 5.0, 499.99, 0.0, 1.0) == 4.0
+    # без округления по лоту — непрерывное количество
+    q = affordable_qty(3.0, 10.0, 10.0, 0.001, 0.0)
+    assert _fits(3.0, q, 10.0, 0.001) and q > 3.32
+
+
+def test_broker_caps_huge_hint_with_fine_lot() -> None:
+    feed = _make_feed([123.45])
+    broker = Broker(commission_pct=0.001, exec_mode=ExecutionMode.ON_CLOSE, lot_size=0.0001)
+    broker.reset(initial_cash=10_000.0)
+    tr = broker.execute(Action(ActionSide.BUY, 1e9), 0, feed)
+    assert tr is not None
+    assert broker.get_cash() >= -CASH_TOLERANCE
+    assert broker.get_cash() < 123.45 * 0.0001 * 1.001
+
+
+def test_order_rounding_keeps_truncating_division() -> None:
+    # lot_count нужен только при урезании покупки под кэш; обычное округление
+    # ордеров — прежнее int(qty / lot): 3 * 0.7 / 0.7 == 2.999... -> 2 лота.
+    feed = _make_feed([1.0, 1.0])
+    broker = Broker(commission_pct=0.0, exec_mode=ExecutionMode.ON_CLOSE, lot_size=0.7)
+    broker.reset(initial_cash=100.0)
+    tr = broker.execute(Action(ActionSide.BUY, 3 * 0.7), 0, feed)
+    assert tr is not None and tr.qty == 2 * 0.7
+    tr = broker.execute(Action(ActionSide.SELL, 3 * 0.7), 1, feed)
+    assert tr is not None and tr.qty == 2 * 0.7
+
+
+def test_fractional_lot_backtests_match_original_rounding() -> None:
+    data = Path(__file__).resolve().parents[1] / "data"
+    cases = [
+        ("AAPL_5Y.csv", 0.1, ExecutionMode.ON_CLOSE, 16, 10.14),
+        ("NVDA_5Y.csv", 0.01, ExecutionMode.ON_NEXT_OPEN, 48, 557.52),
+    ]
+    for name, lot, mode, trades, return_pct in cases:
+        eng = Engine()
+        eng.set_data(DataFeed.load_csv(str(data / name)))
+        eng.set_strategy(MovingAverageCross(5, 20))
+        eng.configure(BacktestSettings(lot_size=lot, execution_mode=mode))
+        metrics = eng.run().metrics
+        assert metrics["trades"] == trades
+        assert round(metrics["return_pct"], 2) == return_pct
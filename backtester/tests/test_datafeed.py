@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime
+from array import array
+from datetime import datetime, timedelta, timezone
 from textwrap import dedent
 
-from backtester.core.datafeed import DataFeed
+import pytest
+
+from backtester.core.broker import Broker
+from backtester.core.context import Context
+from backtester.core.datafeed import CsvChunkReader, DataFeed
 from backtester.core.errors import ValidationError
+from backtester.core.types import Bar
 
 
 def test_datafeed_simple_csv(tmp_path) -> None:
@@ -65,3 +71,100 @@ def test_datafeed_missing_columns(tmp_path) -> None:
         pass
     else:
         raise AssertionError("Expected ValidationError for missing columns")
+
+
+def test_datafeed_columnar_storage_and_get_compat() -> None:
+    base = datetime(2020, 1, 1)
+    bars = [
+        Bar(dt=base + timedelta(days=2), open=3, high=3.5, low=2.5, close=3.2, volume=30),
+        Bar(dt=base, open=1, high=1.5, low=0.5, close=1.2, volume=10),
+        Bar(dt=base + timedelta(days=1), open=2, high=2.5, low=1.5, close=2.2, volume=20),
+        # дубликат по времени: должен остаться первый бар с этой датой
+        Bar(dt=base, open=9, high=9, low=9, close=9, volume=0),
+    ]
+    feed = DataFeed(bars)
+    feed.sort_and_validate()
+
+    assert feed.size() == 3
+    assert isinstance(feed.column("close"), array)
+    assert list(feed.column("close")) == [1.2, 2.2, 3.2]
+    assert list(feed.column("volume")) == [10.0, 20.0, 30.0]
+    assert feed.dt(0) == base
+    assert feed.get(1) == bars[2]
+
+
+def test_datafeed_unknown_series() -> None:
+    feed = DataFeed([Bar(dt=datetime(2020, 1, 1), open=1, high=1, low=1, close=1)])
+    with pytest.raises(ValidationError):
+        feed.column("vwap")
+
+
+def test_datafeed_keeps_timezone() -> None:
+    tz = timezone(timedelta(hours=3))
+    dt = datetime(2024, 5, 1, 10, 0, tzinfo=tz)
+    feed = DataFeed([Bar(dt=dt, open=1, high=1, low=1, close=1)])
+
+    assert feed.dt(0) == dt
+    assert feed.dt(0).utcoffset() == timedelta(hours=3)
+
+
+def test_datafeed_csv_chunk_boundaries_and_mixed_formats(tmp_path) -> None:
+    # Формат даты и чисел определяется по первой строке; строки другого
+    # формата дальше по файлу должны разбираться универсальным путём.
+    csv_content = dedent(
+        """\
+        datetime,open,high,low,close,volume
+        2025-01-01,1,2,0.5,1.5,1000
+
+        2025-01-02 00:00:00,1.5,2.5,1.0,2.0,"1,500"
+        01/03/2025,$2,$3,$1.5,$2.5,
+        2025-01-04,2.5,3.5,2.0,3.0,2000
+        """
+    )
+    path = tmp_path / "mixed.csv"
+    path.write_text(csv_content, encoding="utf-8")
+
+    for chunk_rows in (1, 2, 1000):
+        chunks = list(CsvChunkReader(str(path), chunk_rows=chunk_rows))
+        assert sum(len(c[0]) for c in chunks) == 4
+
+    feed = DataFeed.load_csv(str(path))
+    assert feed.size() == 4
+    assert [feed.dt(i).day for i in range(4)] == [1, 2, 3, 4]
+    assert list(feed.column("close")) == [1.5, 2.0, 2.5, 3.0]
+    assert list(feed.column("volume")) == [1000.0, 1500.0, 0.0, 2000.0]
+
+
+def test_datafeed_csv_short_row_and_bad_number(tmp_path) -> None:
+    short = tmp_path / "short.csv"
+    short.write_text("datetime,open,high,low,close\n2025-01-01,1,2,0.5\n", encoding="utf-8")
+    with pytest.raises(ValidationError):
+        DataFeed.load_csv(str(short))
+
+    bad = tmp_path / "bad_number.csv"
+    bad.write_text(
+        "datetime,open,high,low,close\n2025-01-01,1,2,0.5,1.5\n2025-01-02,1,x,0.5,1.5\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValidationError):
+        DataFeed.load_csv(str(bad))
+
+
+def test_context_history_is_a_view_of_feed_storage() -> None:
+    base = datetime(2020, 1, 1)
+    bars = [
+        Bar(dt=base + timedelta(days=i), open=i, high=i + 1.0, low=i - 1.0, close=i + 0.5, volume=0.0)
+        for i in range(10)
+    ]
+    feed = DataFeed(bars)
+    ctx = Context(feed, Broker())
+    ctx.set_index(5)
+    view = ctx.history("close", 3)
+    assert isinstance(view, memoryview)
+    assert view.obj is feed.column("close")
+    assert list(view) == [3.5, 4.5, 5.5]
+    assert list(ctx.history("high", 100)) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    with pytest.raises(ValidationError):
+        ctx.history("close", 0)
+    with pytest.raises(ValidationError):
+        ctx.history("nope", 2)
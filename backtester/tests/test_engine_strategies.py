@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+import random
 from datetime import datetime, timedelta
 
 from backtester.core.datafeed import DataFeed
@@ -56,3 +58,45 @@ def test_engine_ma_cross_trend_profit() -> None:
     assert result.trades[-1].side is TradeSide.SELL
     # На такой тривиальной трендовой серии стратегия не должна сливать в ноль
     assert result.metrics["end_equity"] >= result.metrics["start_equity"]
+
+
+def _tick_walk(n: int, seed: int) -> list[float]:
+    # Цены с шагом 0.01: равенство быстрой и медленной средних здесь частое.
+    rnd = random.Random(seed)
+    out, p = [], 100.0
+    for _ in range(n):
+        p = max(1.0, round(p + 0.01 * rnd.choice((-1, 0, 1)) * rnd.randint(0, 30), 2))
+        out.append(p)
+    return out
+
+
+def test_ma_cross_ties_follow_exact_window_sums() -> None:
+    # Сигнал на каждом баре — знак разности средних по точным суммам окон
+    # (math.fsum), а не по скользящей сумме с накопленной ошибкой округления.
+    fast, slow = 5, 20
+    ties = 0
+    for seed in range(10):
+        closes = _tick_walk(1500, seed)
+        expected = [0] * len(closes)
+        for i in range(slow - 1, len(closes)):
+            f = math.fsum(closes[i - fast + 1 : i + 1]) / fast
+            s = math.fsum(closes[i - slow + 1 : i + 1]) / slow
+            expected[i] = (f > s) - (f < s)
+            ties += f == s
+        feed = _feed_from_closes(closes)
+        assert list(MovingAverageCross(fast, slow).signals(feed)) == expected
+
+        eng = Engine()
+        eng.set_data(feed)
+        eng.set_strategy(MovingAverageCross(fast, slow))
+        eng.configure(BacktestSettings(initial_cash=1000.0))
+        entries = [t.dt for t in eng.run().trades if t.side is TradeSide.BUY]
+        in_pos, want = False, []
+        for i, sig in enumerate(expected):
+            if not in_pos and sig > 0:
+                in_pos = True
+                want.append(feed.dt(i))
+            elif in_pos and sig < 0:
+                in_pos = False
+        assert entries == want
+    assert ties > 0
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from textwrap import dedent
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.feed_cache import CACHE_ENABLED_ENV, FeedCache
+
+
+def _write_csv(path, closes: list[float]) -> None:
+    base = datetime(2025, 1, 1)
+    lines = ["datetime,open,high,low,close,volume"]
+    for i, c in enumerate(closes):
+        dt = base + timedelta(days=i)
+        lines.append(f"{dt:%Y-%m-%d},{c},{c + 1},{c - 1},{c},{100 + i}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_cache_hit_returns_same_columns(tmp_path) -> None:
+    csv_path = tmp_path / "data.csv"
+    _write_csv(csv_path, [10.0, 11.0, 12.0])
+    cache = FeedCache(directory=str(tmp_path / "cache"))
+
+    first = DataFeed.load_csv(str(csv_path), symbol="X", cache=cache)
+    second = DataFeed.load_csv(str(csv_path), symbol="X", cache=cache)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.symbol == "X"
+    assert list(second.timestamps()) == list(first.timestamps())
+    for name, col in first.columns().items():
+        assert list(second.column(name)) == list(col)
+    assert second.get(2) == first.get(2)
+
+
+def test_cache_invalidated_when_file_changes(tmp_path) -> None:
+    csv_path = tmp_path / "data.csv"
+    _write_csv(csv_path, [10.0, 11.0])
+    cache = FeedCache(directory=str(tmp_path / "cache"))
+    DataFeed.load_csv(str(csv_path), cache=cache)
+
+    _write_csv(csv_path, [10.0, 11.0, 12.0, 13.0])
+    feed = DataFeed.load_csv(str(csv_path), cache=cache)
+
+    assert feed.size() == 4
+    assert cache.hits == 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path) -> None:
+    # Одна запись на 3 бара: заголовок + 6 колонок по 3 значения.
+    cache = FeedCache(directory=str(tmp_path / "cache"), max_bytes=400)
+    paths = []
+    for k in range(3):
+        p = tmp_path / f"data{k}.csv"
+        _write_csv(p, [1.0 + k, 2.0, 3.0])
+        paths.append(p)
+        DataFeed.load_csv(str(p), cache=cache)
+        # разводим mtime записей, чтобы порядок LRU был однозначным
+        for full, _, mtime in cache.entries():
+            os.utime(full, (mtime - 10, mtime - 10))
+
+    assert cache.size_bytes() <= 400
+    assert len(cache.entries()) == 2
+    # самая старая запись вытеснена, свежие остались
+    DataFeed.load_csv(str(paths[2]), cache=cache)
+    assert cache.hits == 1
+
+
+def test_cache_disabled_by_env(tmp_path, monkeypatch) -> None:
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(
+        dedent(
+            """\
+            datetime,open,high,low,close
+            2025-01-01,1,2,0.5,1.5
+            """
+        ),
+        encoding="utf-8",
+    )
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_ENABLED_ENV, "0")
+
+    DataFeed.load_csv(str(csv_path), cache=FeedCache(directory=str(cache_dir)))
+
+    assert not cache_dir.exists()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pytest
+
+from backtester.cli import main as cli_main
+from backtester.core.datafeed import DataFeed
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.grid import (
+    FeedSource,
+    add_sweep_arguments,
+    expand_grid,
+    parse_values,
+    run_backtest,
+    run_grid,
+    sweep_from_args,
+)
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+CSV = str(DATA / "AAPL_5Y.csv")
+
+
+def _key(params):
+    return tuple(sorted(params.items()))
+
+
+def test_expand_grid_and_parse_values():
+    assert expand_grid({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+    assert parse_values("5,10,20") == [5, 10, 20]
+    assert parse_values("10:50:10") == [10, 20, 30, 40, 50]
+    assert parse_values("3:5") == [3, 4, 5]
+    assert parse_values("0.5:1.5:0.5", float) == [0.5, 1.0, 1.5]
+    with pytest.raises(ValidationError):
+        parse_values("1:5:0")
+    for bad in ("abc", "1:x", "1:5:y", "0.5,z"):
+        with pytest.raises(ValidationError):
+            parse_values(bad)
+
+
+@pytest.mark.parametrize(("flags", "cache"), [([], False), (["--cache"], True), (["--no-cache"], False)])
+def test_parse_cache_is_opt_in(flags, cache):
+    p = argparse.ArgumentParser()
+    add_sweep_arguments(p)
+    source, _, _, _ = sweep_from_args(p.parse_args(["--csv", CSV, *flags]))
+    assert source.cache is cache
+    assert FeedSource(csv=CSV).cache is False
+
+
+def test_feed_source_requires_one_input():
+    with pytest.raises(ValidationError):
+        FeedSource()
+    with pytest.raises(ValidationError):
+        FeedSource(csv="a.csv", store="b.bts")
+
+
+@pytest.mark.parametrize("engine", ["event", "vector"])
+def test_run_grid_pool_matches_serial(engine):
+    settings = BacktestSettings(initial_cash=10_000.0, commission_pct=0.001)
+    grid = {"fast": [2, 5, 8], "slow": [5, 20, 30]}
+
+    def ok(c):
+        return c["fast"] < c["slow"]
+
+    source = FeedSource(csv=CSV, cache=False)
+    pooled = list(run_grid(source, "ma", grid, settings, workers=2, batch_size=2, engine=engine, constraint=ok))
+    serial = list(run_grid(source, "ma", grid, settings, workers=1, engine=engine, constraint=ok))
+
+    assert len(pooled) == len(serial) == 7
+    assert {_key(r.params): r.metrics for r in pooled} == {_key(r.params): r.metrics for r in serial}
+
+    feed = DataFeed.load_csv(CSV)
+    for res in serial:
+        assert res.metrics == run_backtest(feed, "ma", res.params, settings)
+
+
+def test_run_grid_date_slice_and_unknown_strategy():
+    settings = BacktestSettings()
+    source = FeedSource(csv=CSV, cache=False, start=DataFeed.load_csv(CSV).dt(100))
+    [res] = list(run_grid(source, "bh", [{}], settings, workers=1))
+    feed = DataFeed.load_csv(CSV)
+    assert res.metrics == run_backtest(feed.slice(feed.dt(100), None), "bh", {}, settings)
+
+    with pytest.raises(ValidationError):
+        list(run_grid(source, "nope", [{}], settings, workers=1))
+
+
+def test_cli_grid_subcommand(capsys):
+    cli_main(["grid", "--csv", CSV, "--no-cache", "--strategy", "ma", "--fast", "3,5", "--slow", "4:6", "--workers", "1"])
+    out = capsys.readouterr().out
+    lines = out.splitlines()
+    assert lines[0].startswith("fast, slow, return_pct")
+    # fast < slow: (3,4), (3,5), (3,6), (5,6)
+    assert sum(1 for line in lines[1:] if line and line[0].isdigit()) == 4
+    assert "=== TOP" in out
+
+
+def test_cli_grid_bad_values_are_usage_errors(capsys):
+    with pytest.raises(SystemExit) as exc:
+        cli_main(["grid", "--csv", CSV, "--strategy", "ma", "--fast", "1:x", "--workers", "1"])
+    assert exc.value.code == 2
+    assert "Bad value 'x'" in capsys.readouterr().err
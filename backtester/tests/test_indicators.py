@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from backtester.core.errors import ValidationError
+from backtester.indicators import ATR, EMA, SMA, DonchianChannel, RollingMax, RollingMin, RollingStd
+
+
+def _prices(n: int, seed: int = 1) -> list[float]:
+    rnd = random.Random(seed)
+    out, p = [], 100.0
+    for _ in range(n):
+        p = max(1.0, p + rnd.uniform(-2.0, 2.0))
+        out.append(round(p, 2))
+    return out
+
+
+@pytest.mark.parametrize("period", [1, 3, 20])
+def test_sma_matches_naive(period):
+    xs = _prices(500)
+    ind = SMA(period)
+    for i, x in enumerate(xs):
+        got = ind.update(x)
+        if i + 1 < period:
+            assert got is None and not ind.ready
+        else:
+            assert got == pytest.approx(sum(xs[i - period + 1 : i + 1]) / period, rel=1e-12)
+            assert ind.value == got
+
+
+def test_ema_seeded_with_sma():
+    xs = [1.0, 2.0, 3.0, 4.0, 5.0]
+    ind = EMA(3)
+    assert ind.update(xs[0]) is None
+    assert ind.update(xs[1]) is None
+    assert ind.update(xs[2]) == pytest.approx(2.0)
+    assert ind.update(xs[3]) == pytest.approx(2.0 + 0.5 * (4.0 - 2.0))
+    assert ind.update(xs[4]) == pytest.approx(3.0 + 0.5 * (5.0 - 3.0))
+
+
+@pytest.mark.parametrize("period", [1, 5, 50])
+def test_rolling_extremes_match_naive(period):
+    xs = _prices(400, seed=2)
+    hi, lo = RollingMax(period), RollingMin(period)
+    for i, x in enumerate(xs):
+        h, l = hi.update(x), lo.update(x)
+        if i + 1 < period:
+            assert h is None and l is None
+        else:
+            assert h == max(xs[i - period + 1 : i + 1])
+            assert l == min(xs[i - period + 1 : i + 1])
+    # память ограничена окном
+    assert len(hi._q) <= period and len(lo._q) <= period
+
+
+@pytest.mark.parametrize("ddof", [0, 1])
+def test_rolling_std_matches_naive(ddof):
+    period = 10
+    xs = _prices(300, seed=3)
+    ind = RollingStd(period, ddof=ddof)
+    for i, x in enumerate(xs):
+        got = ind.update(x)
+        if i + 1 < period:
+            assert got is None
+            continue
+        w = xs[i - period + 1 : i + 1]
+        mean = sum(w) / period
+        expected = math.sqrt(sum((v - mean) ** 2 for v in w) / (period - ddof))
+        assert got == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_rolling_std_constant_series_is_zero():
+    ind = RollingStd(4)
+    for _ in range(20):
+        value = ind.update(123.45)
+    assert value == 0.0
+
+
+def test_atr_wilder_smoothing():
+    bars = [(10.0, 8.0, 9.0), (11.0, 9.0, 10.0), (12.0, 9.5, 11.0), (11.5, 10.0, 10.5)]
+    ind = ATR(2)
+    assert ind.update(*bars[0]) is None
+    # TR: 2.0, max(2.0, |11-9|, |9-9|) = 2.0 -> ATR = 2.0
+    assert ind.update(*bars[1]) == pytest.approx(2.0)
+    # TR = max(2.5, |12-10|, |9.5-10|) = 2.5 -> (2.0 * 1 + 2.5) / 2
+    assert ind.update(*bars[2]) == pytest.approx(2.25)
+    # TR = max(1.5, |11.5-11|, |10-11|) = 1.5
+    assert ind.update(*bars[3]) == pytest.approx((2.25 + 1.5) / 2)
+
+
+def test_donchian_channel():
+    ch = DonchianChannel(3)
+    assert ch.update(10.0, 5.0) is None
+    assert ch.update(12.0, 6.0) is None
+    assert ch.update(11.0, 4.0) == (12.0, 4.0)
+    assert ch.update(9.0, 7.0) == (12.0, 4.0)
+    assert ch.update(9.0, 7.0) == (11.0, 4.0)
+    assert ch.upper == 11.0 and ch.lower == 4.0 and ch.middle == 7.5
+
+
+def test_bad_period():
+    with pytest.raises(ValidationError):
+        SMA(0)
+    with pytest.raises(ValidationError):
+        RollingStd(3, ddof=3)
+
+
+def test_sma_exact_ignores_running_sum_drift():
+    xs = [0.1, 0.2, 0.3, 0.7, 0.1, 0.2, 0.3]
+    ind = SMA(3)
+    for x in xs:
+        ind.update(x)
+    assert ind.exact() == math.fsum(xs[-3:]) / 3
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from backtester.bench.csv_load import write_synthetic_csv
+from backtester.bench.memory import PHASES, profile_memory
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.settings import BacktestSettings
+from backtester.strategies.ma_cross import MovingAverageCross
+
+
+def test_profile_memory_splits_run_into_phases(tmp_path) -> None:
+    path = str(tmp_path / "bars.csv")
+    # Выгрузка Nasdaq идёт по убыванию дат — сортировка пересобирает колонки.
+    write_synthetic_csv(path, 3000, fmt="nasdaq")
+    original = DataFeed.sort_and_validate
+
+    report, result = profile_memory(path, MovingAverageCross(fast=5, slow=20), BacktestSettings(), top=5)
+
+    assert not tracemalloc.is_tracing()
+    assert DataFeed.sort_and_validate is original
+    assert report.bars == 3000
+    assert [p.name for p in report.phases] == list(PHASES)
+    phases = {p.name: p for p in report.phases}
+    # Шесть колонок по 8 байт на бар живут после сортировки.
+    assert report.per_bar(phases["sort_and_validate"].retained) >= 48
+    # Кривая equity результата — ещё 8 байт на бар.
+    assert report.per_bar(phases["engine"].retained + phases["result"].retained) >= 8
+    # Разбор CSV держит строки куска — пик заметно выше самих колонок.
+    assert phases["load_csv"].peak > phases["sort_and_validate"].retained
+    assert report.peak == max(p.peak for p in report.phases)
+    assert any("datafeed.py" in site.location for site in phases["sort_and_validate"].top)
+    assert all(len(p.top) <= 5 for p in report.phases)
+
+    plain = Engine()
+    plain.set_data(DataFeed.load_csv(path))
+    plain.set_strategy(MovingAverageCross(fast=5, slow=20))
+    plain.configure(BacktestSettings())
+    assert result.metrics == plain.run().metrics
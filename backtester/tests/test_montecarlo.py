@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.montecarlo import bar_returns, monte_carlo, trade_returns
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+@pytest.fixture(scope="module")
+def result():
+    eng = Engine()
+    eng.set_data(DataFeed.load_csv(str(DATA / "AAPL_5Y.csv")))
+    eng.set_strategy(MovingAverageCross(fast=5, slow=20))
+    eng.configure(BacktestSettings(initial_cash=10_000.0, commission_pct=0.001))
+    return eng.run()
+
+
+def _prod(xs):
+    out = 1.0
+    for x in xs:
+        out *= 1.0 + x
+    return out
+
+
+def test_returns_reproduce_the_original_path(result):
+    start = result.metrics["start_equity"]
+    assert len(trade_returns(result)) == result.metrics["trades"] / 2
+    assert start * _prod(trade_returns(result)) == pytest.approx(result.metrics["end_equity"], rel=1e-9)
+    assert len(bar_returns(result)) == len(result.equity_curve)
+    assert start * _prod(bar_returns(result)) == pytest.approx(result.metrics["end_equity"], rel=1e-9)
+
+
+def test_permutations_keep_end_equity(result):
+    mc = monte_carlo(result, "trades", n_paths=200, replace=False, workers=1)
+    assert len(mc.end_equity) == 200
+    assert all(e == pytest.approx(result.metrics["end_equity"], rel=1e-9) for e in mc.end_equity)
+    # порядок сделок влияет на просадку
+    assert min(mc.max_drawdown) < max(mc.max_drawdown)
+
+    # кольцевой блок на весь ряд — это сдвиг, произведение то же
+    mc = monte_carlo(result, "bars", n_paths=20, block=len(result.equity_curve), workers=1)
+    assert all(e == pytest.approx(result.metrics["end_equity"], rel=1e-9) for e in mc.end_equity)
+
+
+@pytest.mark.parametrize("method", ["trades", "bars"])
+def test_seeded_and_independent_of_workers(result, method):
+    a = monte_carlo(result, method, n_paths=300, batch_size=70, seed=7, workers=1)
+    b = monte_carlo(result, method, n_paths=300, batch_size=70, seed=7, workers=2)
+    assert list(a.end_equity) == list(b.end_equity)
+    assert list(a.max_drawdown_pct) == list(b.max_drawdown_pct)
+    assert list(a.return_pct) == pytest.approx([(e / 10_000.0 - 1.0) * 100.0 for e in a.end_equity])
+    p = a.percentiles("end_equity", (0, 50, 100))
+    assert p[0] == min(a.end_equity) and p[100] == max(a.end_equity)
+    assert a.summary()["end_equity_p5"] <= a.summary()["end_equity_p95"]
+
+
+def test_validation(result):
+    with pytest.raises(ValidationError):
+        monte_carlo(result, "nope")
+    with pytest.raises(ValidationError):
+        monte_carlo(result, n_paths=0)
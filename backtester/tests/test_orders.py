@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from backtester.core.analyzers import DrawdownAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ActionSide, ExecutionMode, RecordLevel, TradeSide
+from backtester.core.errors import ValidationError
+from backtester.core.orders import BarSearch, trigger_price
+from backtester.core.portfolio import PortfolioEngine
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import HOLD, Action, Bar
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+def _feed(rows: list[tuple[float, float, float, float]]) -> DataFeed:
+    base = datetime(2024, 1, 1)
+    return DataFeed([Bar(base + timedelta(days=k), o, h, l, c) for k, (o, h, l, c) in enumerate(rows)])
+
+
+def test_trigger_price_with_gaps() -> None:
+    buy_lim = Action.limit(ActionSide.BUY, 100.0)
+    sell_lim = Action.limit(ActionSide.SELL, 110.0)
+    buy_stop = Action.stop(ActionSide.BUY, 110.0)
+    sell_stop = Action.stop(ActionSide.SELL, 90.0)
+
+    assert trigger_price(buy_lim, 105.0, 106.0, 101.0) is None
+    assert trigger_price(buy_lim, 105.0, 106.0, 99.0) == 100.0
+    assert trigger_price(buy_lim, 97.0, 98.0, 95.0) == 97.0  # гэп вниз — по open, лучше лимита
+    assert trigger_price(sell_lim, 105.0, 111.0, 104.0) == 110.0
+    assert trigger_price(sell_lim, 112.0, 113.0, 111.0) == 112.0
+    assert trigger_price(buy_stop, 105.0, 109.0, 104.0) is None
+    assert trigger_price(buy_stop, 105.0, 111.0, 104.0) == 110.0
+    assert trigger_price(buy_stop, 115.0, 116.0, 114.0) == 115.0  # гэп вверх — проскальзывание
+    assert trigger_price(sell_stop, 95.0, 96.0, 89.0) == 90.0
+    assert trigger_price(sell_stop, 85.0, 86.0, 80.0) == 85.0
+
+
+def test_order_actions_are_validated() -> None:
+    with pytest.raises(ValidationError):
+        Action.stop(ActionSide.SELL, 0.0)
+    with pytest.raises(ValidationError):
+        Action.limit(ActionSide.HOLD, 10.0)
+
+
+def test_bar_search_matches_linear_scan() -> None:
+    rnd = random.Random(7)
+    for n in (1, 2, 3, 17, 64, 100):
+        lows = [rnd.uniform(0, 100) for _ in range(n)]
+        highs = [lo + rnd.uniform(0, 10) for lo in lows]
+        search = BarSearch(lows, highs)
+        for _ in range(200):
+            start = rnd.randrange(n + 1)
+            x = rnd.uniform(-5, 115)
+            want_low = next((k for k in range(start, n) if lows[k] <= x), n)
+            want_high = next((k for k in range(start, n) if highs[k] >= x), n)
+            assert search.first_low_at_most(start, x) == want_low
+            assert search.first_high_at_least(start, x) == want_high
+
+
+class _Script:
+    """Возвращает заданные действия на заданных барах."""
+
+    name = "script"
+
+    def __init__(self, plan: dict[int, Action]) -> None:
+        self.plan = plan
+
+    def warmup(self) -> int:
+        return 0
+
+    def on_bar(self, ctx) -> Action:
+        return self.plan.get(ctx.index(), HOLD)
+
+
+def _run(feed, strategy, settings=None):
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(strategy)
+    eng.configure(settings or BacktestSettings(initial_cash=1_000.0))
+    return eng.run()
+
+
+def test_stop_loss_fills_at_level_or_gap_open() -> None:
+    feed = _feed(
+        [
+            (100.0, 101.0, 99.0, 100.0),  # 0: покупка по close
+            (100.0, 101.0, 99.0, 100.0),  # 1: ставим стоп 95
+            (100.0, 100.0, 96.0, 97.0),  # 2: не задевает
+            (97.0, 98.0, 94.0, 95.5),  # 3: стоп по 95
+            (95.5, 96.0, 95.0, 95.5),
+        ]
+    )
+    plan = {0: Action(ActionSide.BUY, 5.0), 1: Action.stop(ActionSide.SELL, 95.0)}
+    res = _run(feed, _Script(plan))
+    assert [(t.side, t.price) for t in res.trades] == [(TradeSide.BUY, 100.0), (TradeSide.SELL, 95.0)]
+    assert res.trades[1].dt == feed.dt(3)
+
+    gap = _feed([(100.0, 101.0, 99.0, 100.0), (100.0, 101.0, 99.0, 100.0), (90.0, 91.0, 88.0, 89.0)])
+    res = _run(gap, _Script(plan))
+    assert res.trades[1].price == 90.0  # гэп ниже стопа — исполнение по open
+
+
+def test_bracket_is_one_cancels_other_and_orders_replace() -> None:
+    feed = _feed(
+        [
+            (100.0, 101.0, 99.0, 100.0),
+            (100.0, 101.0, 99.0, 100.0),
+            (100.0, 101.0, 99.0, 100.0),
+            (100.0, 101.0, 99.0, 100.0),
+            (100.0, 106.0, 99.0, 105.0),  # тейк-профит 105
+            (100.0, 101.0, 80.0, 100.0),  # стоп уже снят
+        ]
+    )
+    plan = {
+        0: Action(ActionSide.BUY, 5.0),
+        1: Action.stop(ActionSide.SELL, 90.0),
+        2: Action.stop(ActionSide.SELL, 95.0),  # подтянутый стоп заменяет прежний
+        3: Action.limit(ActionSide.SELL, 105.0),
+    }
+    seen = []
+
+    class _Probe(_Script):
+        def on_bar(self, ctx):
+            seen.append(ctx.orders())
+            return super().on_bar(ctx)
+
+    res = _run(feed, _Probe(plan))
+    assert [t.price for t in res.trades] == [100.0, 105.0]
+    assert seen[3] == [Action.stop(ActionSide.SELL, 95.0)]
+    assert seen[5] == []
+
+
+def test_cancel_orders_from_context() -> None:
+    feed = _feed([(100.0, 101.0, 99.0, 100.0)] * 3 + [(100.0, 120.0, 99.0, 100.0)])
+
+    class _Cancel(_Script):
+        def on_bar(self, ctx):
+            if ctx.index() == 2:
+                ctx.cancel_orders(ActionSide.BUY)
+            return super().on_bar(ctx)
+
+    res = _run(feed, _Cancel({1: Action.stop(ActionSide.BUY, 110.0)}))
+    assert res.trades == []
+
+
+class _Bracket:
+    """Вход стопом выше close, выход стопом или тейк-профитом."""
+
+    name = "breakout-bracket"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._waiting = False
+
+    def warmup(self) -> int:
+        return 0
+
+    def on_bar(self, ctx) -> Action:
+        self.calls += 1
+        act = self._decide(ctx)
+        self._waiting = act is HOLD and bool(ctx.orders())
+        return act
+
+    def _decide(self, ctx) -> Action:
+        close = ctx.price("close")
+        orders = ctx.orders()
+        if ctx.position_size() <= 0:
+            return HOLD if orders else Action.stop(ActionSide.BUY, close * 1.03)
+        types = {o.order_type for o in orders}
+        if len(types) == 0:
+            return Action.stop(ActionSide.SELL, close * 0.93)
+        if len(types) == 1:
+            return Action.limit(ActionSide.SELL, close * 1.1)
+        return HOLD
+
+
+class _IdleBracket(_Bracket):
+    def idle(self) -> bool:
+        return self._waiting
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.ON_CLOSE, ExecutionMode.ON_NEXT_OPEN])
+@pytest.mark.parametrize("level", [RecordLevel.FULL, RecordLevel.METRICS])
+def test_idle_skipping_matches_bar_by_bar(mode, level) -> None:
+    feed = DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"))
+    settings = BacktestSettings(initial_cash=10_000.0, commission_pct=0.001, execution_mode=mode, record=level)
+
+    plain = _Bracket()
+    expected = _run(feed, plain, settings)
+    idle = _IdleBracket()
+    got = _run(feed, idle, settings)
+
+    assert expected.metrics["trades"] >= 10
+    assert got.metrics == expected.metrics
+    assert got.trades == expected.trades
+    assert got.equity_curve == expected.equity_curve
+    assert idle.calls < plain.calls / 3
+
+
+def test_idle_skipping_without_analyzers() -> None:
+    feed = DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"))
+    settings = BacktestSettings(record=RecordLevel.METRICS)
+    results = []
+    for strategy in (_Bracket(), _IdleBracket()):
+        eng = Engine()
+        eng.clear_analyzers()
+        eng.set_data(feed)
+        eng.set_strategy(strategy)
+        eng.configure(settings)
+        results.append(eng.run())
+    assert results[0].metrics == results[1].metrics
+
+
+def test_run_many_and_stream_fill_orders_like_run() -> None:
+    feed = DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"))
+    settings = BacktestSettings(initial_cash=10_000.0)
+    expected = _run(feed, _Bracket(), settings)
+
+    eng = Engine()
+    eng.set_data(feed)
+    [got] = eng.run_many([(_IdleBracket(), settings, [DrawdownAnalyzer()])])
+    assert got.trades == expected.trades
+    assert got.metrics == expected.metrics
+
+    eng = Engine()
+    eng.set_strategy(_IdleBracket())
+    eng.configure(replace(settings))
+    streamed = eng.run_stream(feed.get(i) for i in range(feed.size()))
+    assert streamed.trades == expected.trades
+
+
+def test_portfolio_rejects_resting_orders() -> None:
+    feed = _feed([(100.0, 101.0, 99.0, 100.0)] * 3)
+    feed.symbol = "A"
+
+    class _Limit:
+        name = "limit"
+
+        def warmup(self) -> int:
+            return 0
+
+        def on_bars(self, ctx):
+            return {"A": Action.limit(ActionSide.BUY, 90.0)}
+
+    eng = PortfolioEngine()
+    eng.set_data([feed])
+    eng.set_strategy(_Limit())
+    with pytest.raises(ValidationError):
+        eng.run()
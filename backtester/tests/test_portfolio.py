@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ActionSide, ExecutionMode, TradeSide
+from backtester.core.errors import ValidationError
+from backtester.core.portfolio import PortfolioBroker, PortfolioEngine
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import Action, Bar
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+class _Single:
+    """Адаптер: однобумажная стратегия как портфельная (для сравнения с Engine)."""
+
+    name = "single"
+
+    def __init__(self, symbol: str, strategy) -> None:
+        self.symbol = symbol
+        self.strategy = strategy
+
+    def warmup(self) -> int:
+        return self.strategy.warmup()
+
+    def on_bars(self, ctx):
+        outer = self
+
+        class _Ctx:
+            def price(self, series: str = "close") -> float:
+                return ctx.price(outer.symbol, series)
+
+            def position_size(self) -> float:
+                return ctx.position_size(outer.symbol)
+
+        return {self.symbol: self.strategy.on_bar(_Ctx())}
+
+
+class _EqualWeight:
+    """Держит равные доли всех инструментов, у которых есть бар (раз в rebalance меток)."""
+
+    name = "equal-weight"
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[datetime, list[str]]] = []
+
+    def warmup(self) -> int:
+        return 0
+
+    def on_bars(self, ctx):
+        self.calls.append((ctx.time(), ctx.symbols()))
+        acts = {}
+        budget = ctx.equity() / len(ctx.universe())
+        for sym in ctx.symbols():
+            if ctx.position_size(sym) == 0:
+                acts[sym] = Action(ActionSide.BUY, budget / ctx.price(sym) * 0.99)
+        return acts
+
+
+def _feed(symbol: str, start: datetime, closes: list[float], step_days: int = 1) -> DataFeed:
+    bars = [
+        Bar(dt=start + timedelta(days=i * step_days), open=c - 0.5, high=c + 1.0, low=c - 1.0, close=c)
+        for i, c in enumerate(closes)
+    ]
+    return DataFeed(bars, symbol=symbol)
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.ON_CLOSE, ExecutionMode.ON_NEXT_OPEN])
+@pytest.mark.parametrize("make", [lambda: MovingAverageCross(5, 20), lambda: DonchianBreakout(10)])
+def test_single_symbol_matches_engine(mode, make) -> None:
+    feed = DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"), symbol="AAPL")
+    settings = BacktestSettings(initial_cash=10_000.0, commission_pct=0.001, execution_mode=mode)
+
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(make())
+    eng.configure(settings)
+    expected = eng.run()
+
+    peng = PortfolioEngine()
+    peng.set_data([feed])
+    peng.set_strategy(_Single("AAPL", make()))
+    peng.configure(settings)
+    got = peng.run()
+
+    assert [(t.dt, t.side, t.price, t.qty, t.commission) for t in got.trades] == [
+        (t.dt, t.side, t.price, t.qty, t.commission) for t in expected.trades
+    ]
+    assert all(t.symbol == "AAPL" for t in got.trades)
+    assert [dt for dt, _ in got.equity_curve] == [dt for dt, _ in expected.equity_curve]
+    for (_, a), (_, b) in zip(got.equity_curve, expected.equity_curve):
+        assert a == pytest.approx(b, rel=1e-9)
+    assert got.metrics["end_equity"] == pytest.approx(expected.metrics["end_equity"], rel=1e-9)
+
+
+def test_heap_merge_and_cross_section() -> None:
+    t0 = datetime(2021, 1, 1)
+    a = _feed("A", t0, [10.0, 11.0, 12.0, 13.0, 14.0])  # каждый день
+    b = _feed("B", t0 + timedelta(days=1), [20.0, 22.0], step_days=2)  # дни 1 и 3
+    c = _feed("C", t0 + timedelta(days=10), [5.0])  # начинается после конца A
+    strat = _EqualWeight()
+    eng = PortfolioEngine()
+    eng.set_data([a, b, c])
+    eng.set_strategy(strat)
+    eng.configure(BacktestSettings(initial_cash=3_000.0))
+    res = eng.run()
+
+    assert [(dt.day, syms) for dt, syms in strat.calls] == [
+        (1, ["A"]),
+        (2, ["A", "B"]),
+        (3, ["A"]),
+        (4, ["A", "B"]),
+        (5, ["A"]),
+        (11, ["C"]),
+    ]
+    assert len(res.equity_curve) == 6
+    # Позиции закрываются на последнем баре своего инструмента.
+    sells = [(t.symbol, t.dt.day) for t in res.trades if t.side is TradeSide.SELL]
+    assert sorted(sells) == [("A", 5), ("B", 4), ("C", 11)]
+    assert res.metrics["end_equity"] == pytest.approx(res.equity_curve[-1][1])
+
+
+def test_equity_tracks_positions_incrementally() -> None:
+    t0 = datetime(2021, 1, 1)
+    feeds = [_feed(f"S{k}", t0, [100.0 + k + d for d in range(30)]) for k in range(50)]
+    strat = _EqualWeight()
+    eng = PortfolioEngine()
+    eng.set_data(feeds)
+    eng.set_strategy(strat)
+    eng.configure(BacktestSettings(initial_cash=100_000.0))
+    res = eng.run()
+    buys = [t for t in res.trades if t.side is TradeSide.BUY]
+    assert len(buys) == 50
+    cash = 100_000.0 - sum(t.price * t.qty for t in buys)
+    # на предпоследнем баре все позиции ещё открыты
+    expected = cash + sum(t.qty * (100.0 + int(t.symbol[1:]) + 28) for t in buys)
+    assert res.equity_curve[-2][1] == pytest.approx(expected, rel=1e-12)
+
+
+def test_trades_update_only_the_traded_symbol() -> None:
+    t0 = datetime(2021, 1, 1)
+    broker = PortfolioBroker(commission_pct=0.001)
+    broker.reset(1_000_000.0)
+    marks = {}
+    for k in range(40):
+        symbol = f"S{k}"
+        marks[symbol] = 10.0 + k
+        broker.execute(symbol, Action(ActionSide.BUY, 10.0 + k), marks[symbol], t0)
+    for k in range(0, 40, 3):
+        symbol = f"S{k}"
+        marks[symbol] = 11.5 + k
+        broker.mark(symbol, marks[symbol])
+    # Частичные продажи, полные продажи и докупки на одной метке времени.
+    for k in range(0, 40, 2):
+        symbol = f"S{k}"
+        marks[symbol] = 12.25 + k
+        side = ActionSide.SELL if k % 4 else ActionSide.BUY
+        broker.execute(symbol, Action(side, 0.0 if k % 8 == 2 else 3.0), marks[symbol], t0)
+
+    positions = broker.get_positions()
+    assert len(positions) < 40
+    expected = broker.get_cash() + sum(q * marks[s] for s, q in positions.items())
+    assert broker.equity() == pytest.approx(expected, rel=1e-12)
+
+    for symbol in positions:
+        broker.execute(symbol, Action(ActionSide.SELL), marks[symbol], t0)
+    assert broker.equity() == broker.get_cash()
+
+
+def test_portfolio_validation() -> None:
+    t0 = datetime(2021, 1, 1)
+    eng = PortfolioEngine()
+    with pytest.raises(ValidationError):
+        eng.set_data([_feed("", t0, [1.0])])
+    with pytest.raises(ValidationError):
+        eng.set_data([_feed("A", t0, [1.0]), _feed("A", t0, [2.0])])
+
+    class _Bad:
+        name = "bad"
+
+        def warmup(self) -> int:
+            return 0
+
+        def on_bars(self, ctx):
+            return {"ZZZ": Action(ActionSide.BUY)}
+
+    eng.set_data([_feed("A", t0, [1.0, 2.0])])
+    eng.set_strategy(_Bad())
+    with pytest.raises(ValidationError):
+        eng.run()
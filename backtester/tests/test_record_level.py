@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from backtester.core.analyzers import DrawdownAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ExecutionMode, RecordLevel
+from backtester.core.errors import ValidationError
+from backtester.core.portfolio import PortfolioEngine
+from backtester.core.settings import BacktestSettings
+from backtester.core.vector_engine import VectorEngine
+from backtester.montecarlo import monte_carlo
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+SETTINGS = [
+    BacktestSettings(initial_cash=10_000.0, commission_pct=0.001),
+    BacktestSettings(initial_cash=5_000.0, execution_mode=ExecutionMode.ON_NEXT_OPEN, lot_size=0.1),
+]
+
+
+@pytest.fixture(scope="module")
+def feed() -> DataFeed:
+    return DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"))
+
+
+def _run(engine_cls, feed, settings, level):
+    eng = engine_cls()
+    eng.set_data(feed)
+    eng.set_strategy(MovingAverageCross(fast=5, slow=20))
+    eng.configure(replace(settings, record=level))
+    return eng.run()
+
+
+@pytest.mark.parametrize("engine_cls", [Engine, VectorEngine])
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_levels_give_same_metrics(engine_cls, feed, settings) -> None:
+    full = _run(engine_cls, feed, settings, RecordLevel.FULL)
+    trades = _run(engine_cls, feed, settings, RecordLevel.TRADES)
+    metrics = _run(engine_cls, feed, settings, RecordLevel.METRICS)
+
+    assert full.metrics["trades"] > 0
+    assert trades.metrics == full.metrics
+    assert metrics.metrics == full.metrics
+
+    assert trades.trades == full.trades
+    assert metrics.trades == []
+    for res in (trades, metrics):
+        assert res.equity_curve == []
+        assert res.series == {}
+
+
+def test_levels_in_stream_and_run_many(feed) -> None:
+    settings = SETTINGS[0]
+    full = _run(Engine, feed, settings, RecordLevel.FULL)
+
+    eng = Engine()
+    eng.set_strategy(MovingAverageCross(fast=5, slow=20))
+    eng.configure(replace(settings, record=RecordLevel.METRICS))
+    streamed = eng.run_stream(feed.get(i) for i in range(feed.size()))
+    assert streamed.metrics == full.metrics
+    assert streamed.equity_curve == []
+
+    eng = Engine()
+    eng.set_data(feed)
+    got = eng.run_many(
+        [
+            (MovingAverageCross(fast=5, slow=20), replace(settings, record=level), [DrawdownAnalyzer()])
+            for level in RecordLevel
+        ]
+    )
+    for res in got:
+        assert res.metrics == full.metrics
+    assert [len(r.trades) for r in got] == [0, len(full.trades), len(full.trades)]
+
+
+def test_metrics_level_without_analyzers(feed) -> None:
+    full = _run(VectorEngine, feed, SETTINGS[0], RecordLevel.FULL)
+    eng = VectorEngine()
+    eng.clear_analyzers()
+    eng.set_data(feed)
+    eng.set_strategy(MovingAverageCross(fast=5, slow=20))
+    eng.configure(replace(SETTINGS[0], record=RecordLevel.METRICS))
+    res = eng.run()
+    for key in ("end_equity", "profit", "return_pct", "trades"):
+        assert res.metrics[key] == full.metrics[key]
+
+
+def test_portfolio_levels(feed) -> None:
+    feeds = [feed.slice(None, None), feed.slice(feed.dt(100), None)]
+    feeds[0].symbol, feeds[1].symbol = "A", "B"
+
+    class _Rotate:
+        name = "rotate"
+
+        def warmup(self) -> int:
+            return 0
+
+        def on_bars(self, ctx):
+            from backtester.core.enums import ActionSide
+            from backtester.core.types import Action
+
+            if ctx.position_size("A") == 0 and ctx.position_size("B") == 0:
+                return {"A": Action(ActionSide.BUY, 10.0)}
+            if ctx.position_size("A") > 0 and "B" in ctx.symbols():
+                return {"A": Action(ActionSide.SELL, 0.0), "B": Action(ActionSide.BUY, 5.0)}
+            return {}
+
+    results = {}
+    for level in RecordLevel:
+        eng = PortfolioEngine()
+        eng.set_data(feeds)
+        eng.set_strategy(_Rotate())
+        eng.configure(BacktestSettings(record=level))
+        results[level] = eng.run()
+    full = results[RecordLevel.FULL]
+    assert full.metrics["trades"] > 0
+    assert results[RecordLevel.METRICS].metrics == full.metrics
+    assert results[RecordLevel.TRADES].trades == full.trades
+    assert results[RecordLevel.METRICS].trades == []
+
+
+def test_monte_carlo_needs_recorded_data(feed) -> None:
+    res = _run(Engine, feed, SETTINGS[0], RecordLevel.TRADES)
+    monte_carlo(res, method="trades", n_paths=10, workers=1)
+    with pytest.raises(ValidationError):
+        monte_carlo(res, method="bars", n_paths=10, workers=1)
+    res = _run(Engine, feed, SETTINGS[0], RecordLevel.METRICS)
+    with pytest.raises(ValidationError):
+        monte_carlo(res, method="trades", n_paths=10, workers=1)
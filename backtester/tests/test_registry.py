@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import argparse
+import importlib.metadata
+from typing import Any
+
+import pytest
+
+from backtester.cli import add_strategy_arguments, make_strategy
+from backtester.core.enums import ParamType
+from backtester.core.errors import ValidationError
+from backtester.core.strategy_base import Param, StrategyContext
+from backtester.core.types import HOLD, Action
+from backtester.grid import add_sweep_arguments, sweep_from_args
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+from backtester.strategies.registry import (
+    ENTRY_POINT_GROUP,
+    StrategyRegistry,
+    default_registry,
+    parse_assignments,
+)
+
+
+def test_param_parse_converts_and_checks_bounds() -> None:
+    window = Param("window", ParamType.INT, 20, minimum=2)
+    assert window.parse("30") == 30
+    assert window.parse(30.0) == 30
+    for bad in ("x", 2.5, True, 1):
+        with pytest.raises(ValidationError):
+            window.parse(bad)
+
+    ratio = Param("ratio", ParamType.FLOAT, 0.5, minimum=0.0, maximum=1.0)
+    assert ratio.parse("0.25") == 0.25
+    with pytest.raises(ValidationError):
+        ratio.parse("1.5")
+
+    flag = Param("flag", ParamType.BOOL, False)
+    assert flag.parse("yes") is True and flag.parse("0") is False and flag.parse(True) is True
+    with pytest.raises(ValidationError):
+        flag.parse("maybe")
+
+    assert Param("label", ParamType.STRING).parse("abc") == "abc"
+    with pytest.raises(ValidationError):
+        Param("label", ParamType.STRING).parse(5)
+
+
+def test_builtin_strategies_are_imported_on_first_use() -> None:
+    reg = default_registry()
+    spec = reg.get("ma")
+    assert spec._factory is None
+    strat = reg.create("ma", fast="3", slow=20)
+    assert isinstance(strat, MovingAverageCross)
+    assert (strat.fast, strat.slow) == (3, 20)
+    assert spec._factory is MovingAverageCross
+    assert [p.name for p in spec.params] == ["fast", "slow"]
+
+
+class _RawStrategy:
+    name = "raw"
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.kwargs = kwargs
+
+    def warmup(self) -> int:
+        return 0
+
+    def on_bar(self, ctx: StrategyContext) -> Action:
+        return HOLD
+
+
+def test_bind_rejects_unknown_and_invalid_params() -> None:
+    reg = default_registry()
+    with pytest.raises(ValidationError, match="no parameter"):
+        reg.create("ma", window=5)
+    with pytest.raises(ValidationError):
+        reg.create("donchian", window=1)
+    with pytest.raises(ValidationError, match="takes no parameters"):
+        reg.create("bh", fast=5)
+    with pytest.raises(ValidationError, match="Unknown strategy"):
+        reg.get("nope")
+
+    # Стратегия без объявления params получает значения как есть.
+    reg.register("raw", _RawStrategy)
+    raw = reg.create("raw", a="1")
+    assert isinstance(raw, _RawStrategy) and raw.kwargs == {"a": "1"}
+
+
+def test_entry_points_are_discovered_only_for_unknown_keys(monkeypatch) -> None:
+    calls = []
+
+    def fake_entry_points(group: str):
+        calls.append(group)
+        return [
+            importlib.metadata.EntryPoint("plug", "backtester.strategies.donchian_breakout:DonchianBreakout", group),
+            importlib.metadata.EntryPoint("ma", "backtester.strategies.donchian_breakout:DonchianBreakout", group),
+        ]
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", fake_entry_points)
+    reg = default_registry()
+    assert isinstance(reg.create("ma"), MovingAverageCross)
+    assert calls == []
+
+    assert isinstance(reg.create("plug", window=15), DonchianBreakout)
+    assert calls == [ENTRY_POINT_GROUP]
+    # Встроенный ключ плагином не перекрывается, обход entry points — один раз.
+    assert isinstance(reg.create("ma"), MovingAverageCross)
+    assert reg.names() == ["bh", "donchian", "ma", "plug"]
+    assert calls == [ENTRY_POINT_GROUP]
+    assert StrategyRegistry(group=None).names() == []
+
+
+def _cli_args(argv: list[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser()
+    add_strategy_arguments(p)
+    return p.parse_args(argv)
+
+
+def test_make_strategy_merges_param_and_legacy_flags() -> None:
+    strat = make_strategy(_cli_args(["--strategy", "ma", "--fast", "4", "--param", "slow=30"]))
+    assert isinstance(strat, MovingAverageCross)
+    assert (strat.fast, strat.slow) == (4, 30)
+    # --param важнее старого флага; флаги чужих стратегий игнорируются.
+    donchian = make_strategy(
+        _cli_args(["--strategy", "donchian", "--param", "window=7", "--donchian-window", "9", "--fast", "3"])
+    )
+    assert isinstance(donchian, DonchianBreakout)
+    assert donchian.window == 7
+    assert make_strategy(_cli_args(["--strategy", "bh", "--fast", "3"])).name == "Buy & Hold"
+    with pytest.raises(ValidationError):
+        parse_assignments(["fast"])
+
+
+def test_sweep_param_values_use_declared_type() -> None:
+    p = argparse.ArgumentParser()
+    add_sweep_arguments(p)
+    args = p.parse_args(["--csv", "x.csv", "--strategy", "donchian", "--param", "window=10:30:10"])
+    _, grid, constraint, _ = sweep_from_args(args)
+    assert grid == {"window": [10, 20, 30]}
+    assert constraint is None
+
+    args = p.parse_args(["--csv", "x.csv", "--strategy", "ma", "--param", "nope=1"])
+    with pytest.raises(ValidationError):
+        sweep_from_args(args)
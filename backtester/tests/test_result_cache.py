@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from backtester.core.analyzers import DrawdownAnalyzer, SharpeAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ExecutionMode, RecordLevel
+from backtester.core.result_cache import ResultCache
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import Bar
+from backtester.core.vector_engine import VectorEngine
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+
+AAPL = str(Path(__file__).resolve().parents[1] / "data" / "AAPL_5Y.csv")
+
+
+def _engine(feed, strategy, settings, cache, engine_cls=Engine):
+    eng = engine_cls()
+    eng.set_data(feed)
+    eng.set_strategy(strategy)
+    eng.configure(settings)
+    eng.set_cache(cache)
+    return eng
+
+
+@pytest.mark.parametrize("engine_cls", [Engine, VectorEngine])
+@pytest.mark.parametrize("record", list(RecordLevel))
+def test_hit_returns_the_same_result(tmp_path, engine_cls, record) -> None:
+    feed = DataFeed.load_csv(AAPL, cache=False)
+    cache = ResultCache(str(tmp_path))
+    settings = BacktestSettings(commission_pct=0.001, record=record)
+
+    first = _engine(feed, MovingAverageCross(5, 20), settings, cache, engine_cls).run()
+    second = _engine(feed, MovingAverageCross(5, 20), settings, cache, engine_cls).run()
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.metrics == first.metrics
+    assert second.trades == first.trades
+    assert second.equity_curve == first.equity_curve
+    assert second.settings is settings
+    assert second.series.keys() == first.series.keys()
+    if record is RecordLevel.FULL:
+        assert list(second.series["equity"].v) == list(first.series["equity"].v)
+
+
+def test_aware_timestamps_survive_the_round_trip(tmp_path) -> None:
+    tz = timezone(timedelta(hours=3))
+    base = datetime(2024, 1, 1, tzinfo=tz)
+    closes = [10.0, 12.0, 11.0, 13.0, 9.0, 14.0, 15.0, 8.0]
+    feed = DataFeed([Bar(dt=base + timedelta(hours=i), open=c, high=c, low=c, close=c) for i, c in enumerate(closes)])
+    cache = ResultCache(str(tmp_path))
+    settings = BacktestSettings(execution_mode=ExecutionMode.ON_NEXT_OPEN)
+    first = _engine(feed, MovingAverageCross(1, 2), settings, cache).run()
+    second = _engine(feed, MovingAverageCross(1, 2), settings, cache).run()
+    assert cache.hits == 1
+    assert second.trades and second.trades == first.trades
+    assert second.trades[0].dt.tzinfo == tz
+    assert list(second.equity_curve) == list(first.equity_curve)
+
+
+def test_key_covers_feed_strategy_settings_and_analyzers(tmp_path) -> None:
+    feed = DataFeed.load_csv(AAPL, cache=False)
+    cache = ResultCache(str(tmp_path))
+    settings = BacktestSettings()
+
+    def key(feed=feed, strategy=None, settings=settings, analyzers=(DrawdownAnalyzer(),), engine=Engine):
+        return cache.key(engine, feed, strategy or MovingAverageCross(5, 20), settings, analyzers)
+
+    base = key()
+    assert key() == base
+    variants = [
+        key(feed=feed.slice(start=feed.dt(10))),
+        key(strategy=MovingAverageCross(5, 21)),
+        key(strategy=DonchianBreakout(20)),
+        key(settings=BacktestSettings(commission_pct=0.001)),
+        key(settings=BacktestSettings(record=RecordLevel.METRICS)),
+        key(analyzers=()),
+        key(analyzers=(DrawdownAnalyzer(), SharpeAnalyzer())),
+        key(analyzers=(DrawdownAnalyzer(), SharpeAnalyzer(periods_per_year=12))),
+        key(engine=VectorEngine),
+    ]
+    assert len({base, *variants}) == len(variants) + 1
+
+
+def test_undescribable_state_bypasses_the_cache(tmp_path) -> None:
+    feed = DataFeed.load_csv(AAPL, cache=False)
+    cache = ResultCache(str(tmp_path))
+
+    class HookedCross(MovingAverageCross):
+        hook: Callable[[Any], None]
+
+    strat = HookedCross(5, 20)
+    strat.hook = lambda bar: None
+    eng = _engine(feed, strat, BacktestSettings(), cache)
+    eng.run()
+    eng.run()
+    assert cache.stats()["bypassed"] == 2
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert cache.entries() == []
+
+    # Замер времени тоже идёт мимо кэша: его результат зависит от прогона.
+    eng = _engine(feed, MovingAverageCross(5, 20), BacktestSettings(), cache)
+    eng.set_timing()
+    assert eng.run().timings is not None
+    assert cache.entries() == []
+
+
+def test_sets_of_objects_are_uncacheable(tmp_path) -> None:
+    feed = DataFeed.load_csv(AAPL, cache=False)
+    cache = ResultCache(str(tmp_path))
+
+    class TaggedCross(MovingAverageCross):
+        tags: frozenset[Any]
+
+    def key(tags: frozenset[Any]) -> str | None:
+        strat = TaggedCross(5, 20)
+        strat.tags = tags
+        return cache.key(Engine, feed, strat, BacktestSettings(), ())
+
+    # Множество примитивов упорядочивается однозначно, множество объектов — нет:
+    # их repr содержит адреса, которые меняются от процесса к процессу.
+    primitives = key(frozenset({"b", 1, "a", None}))
+    assert primitives is not None and primitives == key(frozenset({None, "a", 1, "b"}))
+    assert key(frozenset({DrawdownAnalyzer()})) is None
+
+
+def test_lru_eviction_and_stats(tmp_path) -> None:
+    feed = DataFeed.load_csv(AAPL, cache=False)
+    settings = BacktestSettings(record=RecordLevel.FULL)
+    probe = ResultCache(str(tmp_path / "probe"))
+    _engine(feed, MovingAverageCross(5, 20), settings, probe).run()
+    [(_, entry_size, _)] = probe.entries()
+
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=int(entry_size * 2.5))
+    keys = []
+    for slow in (20, 21):
+        _engine(feed, MovingAverageCross(5, slow), settings, cache).run()
+        keys.append(cache.key(Engine, feed, MovingAverageCross(5, slow), settings, [DrawdownAnalyzer()]))
+    past = time.time() - 100
+    for i, path in enumerate(sorted(cache.entries(), key=lambda e: keys.index(Path(e[0]).stem))):
+        os.utime(path[0], (past + i, past + i))
+    # Обращение к первой записи делает её самой свежей: вытесняется вторая.
+    _engine(feed, MovingAverageCross(5, 20), settings, cache).run()
+    _engine(feed, MovingAverageCross(5, 22), settings, cache).run()
+
+    stems = {Path(p).stem for p, _, _ in cache.entries()}
+    assert keys[0] in stems and keys[1] not in stems
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1.0, 3.0, 2.0)
+    assert stats["hit_rate"] == 0.25
+    assert stats["size_bytes"] <= cache.max_bytes
+
+
+def test_corrupt_entry_is_a_miss(tmp_path) -> None:
+    feed = DataFeed.load_csv(AAPL, cache=False)
+    cache = ResultCache(str(tmp_path))
+    expected = _engine(feed, MovingAverageCross(5, 20), BacktestSettings(), cache).run()
+    [(path, _, _)] = cache.entries()
+    with open(path, "r+b") as f:
+        f.truncate(100)
+    again = _engine(feed, MovingAverageCross(5, 20), BacktestSettings(), cache).run()
+    assert again.metrics == expected.metrics
+    assert (cache.hits, cache.misses) == (0, 2)
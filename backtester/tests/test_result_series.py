@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import pickle
 from datetime import datetime, timedelta
 
 import pytest
@@ -73,3 +74,42 @@ def test_series_empty_for_empty_feed() -> None:
 
     assert result.equity_curve == []
     assert result.series == {}
+
+
+def test_equity_series_shares_compact_storage() -> None:
+    """
+    equity_curve и series["equity"] ссылаются на одни и те же данные,
+    индекс времени — срез колонки фида без копирования.
+    """
+    feed = _feed_from_closes([100.0, 110.0, 120.0, 90.0])
+
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(BuyAndHold())
+    eng.configure(BacktestSettings(initial_cash=1000.0))
+    result = eng.run()
+
+    ts = result.series["equity"]
+    assert ts.t is result.equity_curve.times
+    assert ts.v is result.equity_curve.values
+    stamps = result.equity_curve.times.timestamps()
+    assert isinstance(stamps, memoryview) and stamps.obj is feed.timestamps()
+
+    # срезы тоже без копирования и сравниваются со списками
+    assert result.equity_curve[1:3] == list(result.equity_curve)[1:3]
+    assert result.equity_curve[-1] == (feed.dt(3), result.metrics["end_equity"])
+
+
+def test_result_pickles_without_feed() -> None:
+    feed = _feed_from_closes([100.0, 110.0, 120.0, 90.0])
+
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(BuyAndHold())
+    eng.configure(BacktestSettings(initial_cash=1000.0))
+    result = eng.run()
+
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored.equity_curve == result.equity_curve
+    assert restored.series["equity"].t == result.series["equity"].t
+    assert restored.series["equity"].v == list(result.series["equity"].v)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pytest
+
+from backtester.core.analyzers import DrawdownAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ActionSide, ExecutionMode
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.core.strategy_base import Strategy
+from backtester.core.types import Action
+from backtester.strategies.buy_and_hold import BuyAndHold
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+class _LateBuyer:
+    """Стратегия с warmup: покупает на первом доступном баре."""
+
+    name = "late"
+
+    def __init__(self, warmup: int) -> None:
+        self._warmup = warmup
+
+    def warmup(self) -> int:
+        return self._warmup
+
+    def on_bar(self, ctx) -> Action:
+        if ctx.position_size() == 0:
+            return Action(ActionSide.BUY, 0.0)
+        return Action(ActionSide.HOLD, 0.0)
+
+
+CASES: List[Tuple[Callable[[], Strategy], BacktestSettings]] = [
+    (BuyAndHold, BacktestSettings(initial_cash=10_000.0)),
+    (lambda: MovingAverageCross(fast=5, slow=20), BacktestSettings(initial_cash=10_000.0, commission_pct=0.001)),
+    (
+        lambda: MovingAverageCross(fast=2, slow=3),
+        BacktestSettings(initial_cash=1_000.0, execution_mode=ExecutionMode.ON_NEXT_OPEN, lot_size=0.1),
+    ),
+    (lambda: DonchianBreakout(window=20), BacktestSettings(initial_cash=5_000.0, commission_pct=0.002)),
+    (
+        lambda: DonchianBreakout(window=3),
+        BacktestSettings(initial_cash=10_000.0, execution_mode=ExecutionMode.ON_NEXT_OPEN),
+    ),
+    (lambda: _LateBuyer(50), BacktestSettings(initial_cash=10_000.0)),
+    (lambda: _LateBuyer(10**6), BacktestSettings(initial_cash=10_000.0)),
+]
+
+
+@pytest.mark.parametrize("csv", ["AAPL_5Y.csv", "sample_data.csv"])
+def test_run_many_matches_separate_runs(csv) -> None:
+    feed = DataFeed.load_csv(str(DATA / csv))
+
+    expected = []
+    for make, settings in CASES:
+        eng = Engine()
+        eng.set_data(feed)
+        eng.set_strategy(make())
+        eng.configure(settings)
+        expected.append(eng.run())
+
+    eng = Engine()
+    eng.set_data(feed)
+    got = eng.run_many([(make(), settings, [DrawdownAnalyzer()]) for make, settings in CASES])
+
+    assert len(got) == len(expected)
+    for g, e in zip(got, expected):
+        assert g.metrics == e.metrics
+        assert g.trades == e.trades
+        assert g.equity_curve == e.equity_curve
+        assert g.settings is e.settings
+
+
+def test_run_many_edge_cases() -> None:
+    feed = DataFeed.load_csv(str(DATA / "sample_data.csv"))
+    eng = Engine()
+    eng.set_data(feed)
+    assert eng.run_many([]) == []
+
+    shared = DrawdownAnalyzer()
+    with pytest.raises(ValidationError):
+        eng.run_many([(BuyAndHold(), BacktestSettings(), [shared]), (BuyAndHold(), BacktestSettings(), [shared])])
+
+    # без анализаторов в метриках только базовые поля
+    [res] = eng.run_many([(BuyAndHold(), BacktestSettings(), [])])
+    assert "max_drawdown" not in res.metrics
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ActionSide, ExecutionMode
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.core.stream import StreamFeed, stream_csv
+from backtester.core.types import Action, Bar
+from backtester.strategies.buy_and_hold import BuyAndHold
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+
+
+def _bars(closes: list[float]) -> list[Bar]:
+    base = datetime(2020, 1, 1)
+    return [
+        Bar(dt=base + timedelta(days=i), open=c - 0.5, high=c + 1.0, low=c - 1.0, close=c, volume=0.0)
+        for i, c in enumerate(closes)
+    ]
+
+
+CLOSES = [100.0 + ((i * 7) % 23) - ((i * 3) % 11) + i * 0.3 for i in range(120)]
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.ON_CLOSE, ExecutionMode.ON_NEXT_OPEN])
+@pytest.mark.parametrize(
+    "make_strategy",
+    [BuyAndHold, lambda: MovingAverageCross(fast=3, slow=9), lambda: DonchianBreakout(window=6)],
+)
+def test_stream_matches_in_memory_run(mode, make_strategy) -> None:
+    settings = BacktestSettings(initial_cash=1000.0, commission_pct=0.001, execution_mode=mode)
+    bars = _bars(CLOSES)
+
+    eng = Engine()
+    eng.set_data(DataFeed(bars))
+    eng.set_strategy(make_strategy())
+    eng.configure(settings)
+    expected = eng.run()
+
+    eng = Engine()
+    eng.set_strategy(make_strategy())
+    eng.configure(settings)
+    got = eng.run_stream(iter(bars))
+
+    assert got.metrics == expected.metrics
+    assert got.trades == expected.trades
+    assert got.equity_curve == expected.equity_curve
+
+
+def test_stream_skips_duplicates_and_rejects_disorder() -> None:
+    bars = _bars([1.0, 2.0, 3.0])
+    eng = Engine()
+    eng.set_strategy(BuyAndHold())
+    eng.configure(BacktestSettings(initial_cash=1000.0))
+
+    result = eng.run_stream([bars[0], bars[1], bars[1], bars[2]])
+    assert len(result.equity_curve) == 3
+
+    with pytest.raises(ValidationError):
+        eng.run_stream([bars[0], bars[2], bars[1]])
+
+
+def test_stream_feed_keeps_only_window() -> None:
+    feed = StreamFeed(capacity=3)
+    for bar in _bars([1.0, 2.0, 3.0, 4.0, 5.0]):
+        feed.push(bar)
+
+    assert feed.size() == 5
+    assert feed.column("close")[4] == 5.0
+    assert feed.column("close")[2] == 3.0
+    with pytest.raises(IndexError):
+        feed.column("close")[1]
+
+
+def test_stream_csv_reads_rows_in_order(tmp_path) -> None:
+    path = tmp_path / "bars.csv"
+    path.write_text(
+        "datetime,open,high,low,close,volume\n"
+        "2025-01-01,1,2,0.5,1.5,10\n"
+        "2025-01-02,1.5,2.5,1.0,2.0,20\n",
+        encoding="utf-8",
+    )
+
+    bars = list(stream_csv(str(path)))
+
+    assert [b.close for b in bars] == [1.5, 2.0]
+    assert bars[1].dt == datetime(2025, 1, 2)
+
+
+class _HistoryProbe:
+    """Записывает ctx.history на каждом баре и торгует по пробою максимума окна."""
+
+    name = "history-probe"
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.seen: list[list[float]] = []
+
+    def warmup(self) -> int:
+        return 0
+
+    def lookback(self) -> int:
+        return self.n
+
+    def on_bar(self, ctx) -> Action:
+        window = ctx.history("high", self.n)
+        self.seen.append(list(window))
+        if len(window) == self.n and ctx.price("close") >= max(window[:-1]) and ctx.position_size() == 0:
+            return Action(ActionSide.BUY, 0.0)
+        if ctx.position_size() > 0 and ctx.price("close") < min(ctx.history("low", self.n)[:-1]):
+            return Action(ActionSide.SELL, 0.0)
+        return Action(ActionSide.HOLD, 0.0)
+
+
+@pytest.mark.parametrize("n", [2, 3, 7])
+def test_history_in_stream_matches_in_memory(n) -> None:
+    bars = _bars(CLOSES)
+    highs = [b.high for b in bars]
+
+    eng = Engine()
+    eng.set_data(DataFeed(bars))
+    probe = _HistoryProbe(n)
+    eng.set_strategy(probe)
+    eng.configure(BacktestSettings(initial_cash=1000.0))
+    expected = eng.run()
+    assert probe.seen == [highs[max(0, i - n + 1) : i + 1] for i in range(len(bars))]
+
+    eng = Engine()
+    stream_probe = _HistoryProbe(n)
+    eng.set_strategy(stream_probe)
+    eng.configure(BacktestSettings(initial_cash=1000.0))
+    got = eng.run_stream(iter(bars))
+    assert stream_probe.seen == probe.seen
+    assert got.trades == expected.trades
+
+
+def test_stream_window_is_zero_copy_and_bounded() -> None:
+    feed = StreamFeed(capacity=4)
+    for bar in _bars([float(c) for c in range(10)]):
+        feed.push(bar)
+        k = min(feed.size(), 4)
+        view = feed.window("close", feed.size() - k, feed.size())
+        assert isinstance(view, memoryview)
+        assert list(view) == [float(c) for c in range(feed.size() - k, feed.size())]
+    with pytest.raises(ValidationError):
+        feed.window("close", 5, 10)
+    with pytest.raises(ValidationError):
+        feed.window("nope", 8, 10)
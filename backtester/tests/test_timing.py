@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import random
+import time
+from array import array
+from pathlib import Path
+
+import pytest
+
+from backtester.core.analyzers import SharpeAnalyzer
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ActionSide, ExecutionMode
+from backtester.core.settings import BacktestSettings
+from backtester.core.timing import PHASES, LatencyHistogram
+from backtester.core.types import HOLD, Action
+from backtester.core.vector_engine import VectorEngine
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+@pytest.fixture(scope="module")
+def feed() -> DataFeed:
+    return DataFeed.load_csv(str(DATA / "AAPL_5Y.csv"))
+
+
+def _run(feed: DataFeed, strategy, timing: bool, engine: Engine | None = None, **kw):
+    eng = engine or Engine()
+    eng.set_data(feed)
+    eng.set_strategy(strategy)
+    eng.configure(BacktestSettings(initial_cash=10_000.0, **kw))
+    eng.add_analyzer(SharpeAnalyzer())
+    eng.set_timing(timing)
+    return eng.run()
+
+
+def test_timing_is_off_by_default(feed: DataFeed) -> None:
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(MovingAverageCross(fast=5, slow=20))
+    eng.configure(BacktestSettings())
+    assert eng.run().timings is None
+
+
+@pytest.mark.parametrize("mode", list(ExecutionMode))
+def test_timed_run_matches_untimed_and_accounts_for_phases(feed: DataFeed, mode: ExecutionMode) -> None:
+    plain = _run(feed, MovingAverageCross(fast=5, slow=20), timing=False, execution_mode=mode)
+    timed = _run(feed, MovingAverageCross(fast=5, slow=20), timing=True, execution_mode=mode)
+
+    assert timed.metrics == plain.metrics
+    assert timed.trades == plain.trades
+    t = timed.timings
+    assert t is not None
+    assert set(t.phases) == set(PHASES)
+    assert all(v >= 0.0 for v in t.phases.values())
+    assert sum(t.phases.values()) == pytest.approx(t.total, rel=1e-6)
+    assert t.phases["strategy"] > 0 and t.phases["broker"] > 0 and t.phases["analyzers"] > 0
+    # on_bar вызывается на каждом баре после warmup.
+    assert t.on_bar.count == feed.size() - MovingAverageCross(fast=5, slow=20).warmup()
+    d = t.as_dict()
+    assert 0 < d["on_bar_p50_us"] <= d["on_bar_p99_us"] <= d["on_bar_max_us"]
+
+
+class _SlowEvery:
+    """Стратегия, у которой каждый ``k``-й бар медленный; читает историю через контекст."""
+
+    name = "slow"
+
+    def __init__(self, k: int, delay: float) -> None:
+        self.k = k
+        self.delay = delay
+
+    def warmup(self) -> int:
+        return 0
+
+    def on_bar(self, ctx) -> Action:
+        ctx.history("close", 20)
+        if ctx.index() % self.k == 0:
+            time.sleep(self.delay)
+        return HOLD
+
+
+class _LastEquity:
+    """Побаровый анализатор: последнее значение equity."""
+
+    name = "last_equity"
+
+    def __init__(self) -> None:
+        self.last = 0.0
+
+    def on_bar(self, dt, equity: float) -> None:
+        self.last = equity
+
+    def finalize(self) -> dict[str, float]:
+        return {"last_equity": self.last}
+
+
+def test_timing_keeps_analyzer_order(feed: DataFeed) -> None:
+    def run(timing: bool):
+        eng = Engine()
+        eng.set_data(feed)
+        eng.set_strategy(MovingAverageCross(fast=5, slow=20))
+        eng.configure(BacktestSettings())
+        eng.add_analyzer(SharpeAnalyzer())
+        eng.add_analyzer(_LastEquity())
+        eng.set_timing(timing)
+        return eng.run()
+
+    plain, timed = run(False), run(True)
+    assert list(timed.metrics) == list(plain.metrics)
+    assert list(plain.metrics).index("sharpe") < list(plain.metrics).index("last_equity")
+
+
+class _EquityReader:
+    """Стратегия, которая на каждом баре только оценивает портфель."""
+
+    name = "equity"
+
+    def warmup(self) -> int:
+        return 0
+
+    def on_bar(self, ctx) -> Action:
+        for _ in range(50):
+            ctx.equity()
+        return HOLD
+
+
+def test_equity_reads_count_as_feed(feed: DataFeed) -> None:
+    t = _run(feed, _EquityReader(), timing=True).timings
+    assert t is not None
+    assert t.phases["feed"] > 0
+
+
+def test_p99_catches_slow_bars(feed: DataFeed) -> None:
+    small = feed.slice(feed.dt(0), feed.dt(400))
+    res = _run(small, _SlowEvery(k=50, delay=0.002), timing=True)
+    t = res.timings
+    assert t is not None
+    # 8 медленных баров из 400 — 2 %: медиана быстрая, p99 — медленная.
+    assert t.on_bar.percentile(50) < 1e6
+    assert t.on_bar.percentile(99) >= 1.5e6
+    assert t.phases["feed"] > 0
+    assert t.phases["strategy"] >= 8 * 0.002 * 0.9
+
+
+def test_timing_keeps_bar_skipping() -> None:
+    calls = []
+
+    class _Idle:
+        name = "idle"
+
+        def warmup(self) -> int:
+            return 0
+
+        def on_bar(self, ctx) -> Action:
+            calls.append(ctx.index())
+            if ctx.index() == 0:
+                return Action.limit(ActionSide.BUY, 1.0)  # никогда не сработает
+            return HOLD
+
+        def idle(self) -> bool:
+            return True
+
+    closes = [100.0 + (k % 7) for k in range(1000)]
+    feed = DataFeed.from_columns(
+        array("q", range(0, 1000 * 60_000_000, 60_000_000)),
+        array("d", closes),
+        array("d", [c + 1 for c in closes]),
+        array("d", [c - 1 for c in closes]),
+        array("d", closes),
+        array("d", [0.0] * 1000),
+    )
+    res = _run(feed, _Idle(), timing=True)
+    assert calls == [0, 999]
+    assert res.timings is not None and res.timings.on_bar.count == 2
+
+
+def test_vector_engine_times_signals(feed: DataFeed) -> None:
+    res = _run(feed, MovingAverageCross(fast=5, slow=20), timing=True, engine=VectorEngine())
+    t = res.timings
+    assert t is not None
+    assert t.phases["strategy"] > 0
+    assert t.on_bar.count == 0
+
+
+def test_latency_histogram_percentiles_are_close() -> None:
+    rnd = random.Random(1)
+    values = [int(rnd.lognormvariate(9.0, 1.0)) for _ in range(20_000)] + [0, 1, 31, 32, 33]
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+    values.sort()
+    assert hist.count == len(values)
+    assert hist.max_ns == values[-1]
+    for q in (1, 50, 90, 99, 99.9):
+        exact = values[max(0, int(-(-len(values) * q // 100)) - 1)]
+        assert hist.percentile(q) == pytest.approx(exact, rel=0.04, abs=1)
+    assert LatencyHistogram().percentile(99) == 0.0
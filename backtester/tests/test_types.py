@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ActionSide, TradeSide
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import BUY_ALL, HOLD, SELL_ALL, Action, Bar, Trade
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+def test_unchecked_constructors_match_checked() -> None:
+    dt = datetime(2024, 1, 2)
+    assert Bar.unchecked(dt, 1.0, 2.0, 0.5, 1.5, 10.0) == Bar(dt, 1.0, 2.0, 0.5, 1.5, 10.0)
+    assert Bar.unchecked(dt, 1.0, 2.0, 0.5, 1.5) == Bar(dt, 1.0, 2.0, 0.5, 1.5)
+    assert Trade.unchecked(dt, TradeSide.BUY, 10.0, 2.0, 0.1, "X") == Trade(dt, TradeSide.BUY, 10.0, 2.0, 0.1, "X")
+    assert Trade.unchecked(dt, TradeSide.SELL, 10.0, 2.0) == Trade(dt, TradeSide.SELL, 10.0, 2.0)
+    assert Action.unchecked(ActionSide.BUY, 3.0, "x") == Action(ActionSide.BUY, 3.0, "x")
+
+
+def test_user_input_is_still_validated() -> None:
+    with pytest.raises(ValidationError):
+        Action(ActionSide.BUY, -1.0)
+    with pytest.raises(ValidationError):
+        Trade(datetime(2024, 1, 2), TradeSide.BUY, 0.0, 1.0)
+    with pytest.raises(ValidationError):
+        Bar("2024-01-02", 1.0, 1.0, 1.0, 1.0)  # type: ignore[arg-type]
+
+
+def test_prebuilt_actions_are_immutable() -> None:
+    assert HOLD == Action(ActionSide.HOLD, 0.0)
+    assert BUY_ALL == Action(ActionSide.BUY, 0.0)
+    assert SELL_ALL == Action(ActionSide.SELL, 0.0)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        HOLD.side = ActionSide.BUY  # type: ignore[misc]
+
+
+def test_strategy_reuses_hold_action() -> None:
+    feed = DataFeed.load_csv(str(DATA / "sample_data.csv"))
+    returned = []
+
+    class _Spy(MovingAverageCross):
+        def on_bar(self, ctx):
+            act = super().on_bar(ctx)
+            returned.append(act)
+            return act
+
+    eng = Engine()
+    eng.set_data(feed)
+    eng.set_strategy(_Spy(fast=2, slow=3))
+    eng.configure(BacktestSettings())
+    eng.run()
+    holds = [a for a in returned if a.side is ActionSide.HOLD]
+    assert holds and all(a is HOLD for a in holds)
+    assert len({id(a) for a in returned}) <= 3
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine
+from backtester.core.enums import ExecutionMode
+from backtester.core.settings import BacktestSettings
+from backtester.core.vector_engine import VectorEngine
+from backtester.strategies.buy_and_hold import BuyAndHold
+from backtester.strategies.donchian_breakout import DonchianBreakout
+from backtester.strategies.ma_cross import MovingAverageCross
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+STRATEGIES = {
+    "bh": BuyAndHold,
+    "ma": lambda: MovingAverageCross(fast=5, slow=20),
+    "ma_fast": lambda: MovingAverageCross(fast=2, slow=3),
+    "donchian": lambda: DonchianBreakout(window=20),
+    "donchian_short": lambda: DonchianBreakout(window=3),
+}
+
+SETTINGS = [
+    BacktestSettings(initial_cash=10_000.0),
+    BacktestSettings(initial_cash=10_000.0, commission_pct=0.001, lot_size=1.0),
+    BacktestSettings(initial_cash=1_000.0, commission_pct=0.0025, lot_size=0.1),
+    # кэша меньше цены одного лота: покупки не исполняются
+    BacktestSettings(initial_cash=50.0, lot_size=1.0),
+]
+
+
+def _run(engine: Engine, feed: DataFeed, strategy, settings: BacktestSettings):
+    engine.set_data(feed)
+    engine.set_strategy(strategy)
+    engine.configure(settings)
+    return engine.run()
+
+
+@pytest.fixture(scope="module", params=["AAPL_5Y.csv", "NVDA_5Y.csv", "sample_data.csv"])
+def feed(request) -> DataFeed:
+    return DataFeed.load_csv(str(DATA / request.param))
+
+
+@pytest.mark.parametrize("mode", list(ExecutionMode))
+@pytest.mark.parametrize("settings", SETTINGS)
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_vector_engine_matches_engine(feed, name, settings, mode) -> None:
+    settings = BacktestSettings(
+        initial_cash=settings.initial_cash,
+        commission_pct=settings.commission_pct,
+        execution_mode=mode,
+        lot_size=settings.lot_size,
+    )
+    make = STRATEGIES[name]
+
+    expected = _run(Engine(), feed, make(), settings)
+    got = _run(VectorEngine(), feed, make(), settings)
+
+    assert got.trades == expected.trades
+    assert got.equity_curve == expected.equity_curve
+    assert got.metrics == expected.metrics
+
+
+def test_vector_engine_empty_feed() -> None:
+    result = _run(VectorEngine(), DataFeed([]), BuyAndHold(), BacktestSettings(initial_cash=1000.0))
+
+    assert result.equity_curve == []
+    assert result.metrics["end_equity"] == 1000.0
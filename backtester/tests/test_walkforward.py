@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from backtester.cli import main as cli_main
+from backtester.core.datafeed import DataFeed
+from backtester.core.enums import RecordLevel
+from backtester.core.errors import ValidationError
+from backtester.core.settings import BacktestSettings
+from backtester.grid import FeedSource, run_backtest
+from backtester.walkforward import make_folds, walk_forward
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+CSV = str(DATA / "AAPL_5Y.csv")
+GRID = {"fast": [3, 5, 10], "slow": [20, 40]}
+
+
+def test_make_folds_rolling_and_anchored():
+    feed = DataFeed.load_csv(CSV)
+    n = feed.size()
+
+    rolling = make_folds(feed, train=300, test=200)
+    assert rolling[0].train_start == feed.dt(0)
+    assert rolling[0].train_end == rolling[0].test_start == feed.dt(300)
+    assert rolling[1].train_start == feed.dt(200)
+    # тестовые отрезки идут встык и покрывают хвост фида
+    for a, b in zip(rolling, rolling[1:]):
+        assert a.test_end == b.test_start
+    assert rolling[-1].test_end is None
+    assert len(rolling) == -(-(n - 300) // 200)
+
+    anchored = make_folds(feed, train=300, test=200, anchored=True)
+    assert all(f.train_start == feed.dt(0) for f in anchored)
+    assert [f.test_start for f in anchored] == [f.test_start for f in rolling]
+
+    with pytest.raises(ValidationError):
+        make_folds(feed, train=0, test=10)
+    assert make_folds(feed, train=300, test=200, step=200) == rolling
+    # Перекрытие или дыры между тестовыми отрезками испортили бы склейку.
+    for step in (100, 300):
+        with pytest.raises(ValidationError):
+            make_folds(feed, train=300, test=200, step=step)
+        with pytest.raises(ValidationError):
+            walk_forward(FeedSource(csv=CSV), "ma", GRID, BacktestSettings(), train=300, test=200, step=step, workers=1)
+
+
+@pytest.mark.parametrize("record", [RecordLevel.METRICS, RecordLevel.TRADES])
+def test_walk_forward_stitches_regardless_of_record_level(record):
+    source = FeedSource(csv=CSV)
+    full = walk_forward(source, "ma", GRID, BacktestSettings(), train=300, test=200, workers=1)
+    lean = walk_forward(source, "ma", GRID, BacktestSettings(record=record), train=300, test=200, workers=1)
+
+    assert lean.result.metrics == full.result.metrics
+    assert lean.result.metrics["end_equity"] != lean.result.metrics["start_equity"]
+    assert len(lean.result.equity_curve) == 0
+    assert lean.result.trades == (full.result.trades if record is RecordLevel.TRADES else [])
+
+
+def test_walk_forward_parallel_matches_serial_and_stitches():
+    settings = BacktestSettings(initial_cash=10_000.0, commission_pct=0.001)
+    source = FeedSource(csv=CSV, cache=False)
+    serial = walk_forward(source, "ma", GRID, settings, train=300, test=200, workers=1)
+    pooled = walk_forward(source, "ma", GRID, settings, train=300, test=200, workers=2)
+
+    assert [f.params for f in pooled.folds] == [f.params for f in serial.folds]
+    assert pooled.result.metrics == serial.result.metrics
+    assert pooled.result.equity_curve == serial.result.equity_curve
+
+    feed = DataFeed.load_csv(CSV)
+    res = serial.result
+    # одна точка на каждый out-of-sample бар, без пропусков и повторов
+    assert [dt for dt, _ in res.equity_curve] == [feed.dt(i) for i in range(300, feed.size())]
+    assert res.metrics["start_equity"] == 10_000.0
+    assert res.metrics["end_equity"] == serial.folds[-1].test_metrics["end_equity"]
+    assert res.metrics["trades"] == sum(f.test_metrics["trades"] for f in serial.folds)
+
+    # победитель окна — лучший in-sample прогон
+    first = serial.folds[0]
+    train = feed.slice(first.fold.train_start, first.fold.train_end)
+    best = max(
+        (run_backtest(train, "ma", {"fast": f, "slow": s}, settings)["return_pct"] for f in GRID["fast"] for s in GRID["slow"])
+    )
+    assert first.train_metrics["return_pct"] == best
+
+
+def test_cli_walkforward(capsys):
+    cli_main(
+        ["walkforward", "--csv", CSV, "--no-cache", "--fast", "3,5", "--slow", "20", "--train", "400", "--test", "300", "--workers", "1"]
+    )
+    out = capsys.readouterr().out
+    assert "=== FOLDS" in out and "=== OUT-OF-SAMPLE METRICS ===" in out
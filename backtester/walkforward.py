@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+import backtester.grid as grid_mod
+from backtester.core.analyzers import Analyzer, BatchAnalyzer, DrawdownAnalyzer, EquityChunk, split_analyzers
+from backtester.core.datafeed import DataFeed
+from backtester.core.engine import Engine, _build_result
+from backtester.core.enums import RecordLevel
+from backtester.core.errors import ValidationError
+from backtester.core.result import BacktestResult
+from backtester.core.series import TimeIndex
+from backtester.core.settings import BacktestSettings
+from backtester.core.types import Trade
+from backtester.core.vector_engine import VectorEngine
+from backtester.grid import ENGINES, FeedSource, expand_grid
+from backtester.strategies.registry import get_strategy
+
+
+@dataclass(slots=True)
+class Fold:
+    """
+    Одно окно walk-forward: обучение ``[train_start, train_end)`` и
+    проверка ``[test_start, test_end)``; ``test_end=None`` — до конца фида.
+    """
+
+    train_start: datetime
+    train_end: datetime
+    test_start: datetime
+    test_end: datetime | None
+
+
+@dataclass(slots=True)
+class FoldResult:
+    """Победитель in-sample перебора и его метрики на обоих отрезках."""
+
+    fold: Fold
+    params: Dict[str, Any]
+    train_metrics: Dict[str, float]
+    test_metrics: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class WalkForwardResult:
+    """
+    Результат walk-forward.
+
+    folds
+        Окна по порядку с выбранными параметрами.
+
+    result
+        Склеенный out-of-sample прогон: кривая equity, сделки и метрики
+        по всем тестовым отрезкам подряд.
+    """
+
+    folds: List[FoldResult]
+    result: BacktestResult
+
+
+def make_folds(
+    feed: DataFeed,
+    train: int,
+    test: int,
+    anchored: bool = False,
+    step: int | None = None,
+) -> List[Fold]:
+    """
+    Нарезать фид на окна walk-forward по числу баров.
+
+    Скользящие окна (``anchored=False``): обучение — ``train`` баров,
+    проверка — следующие ``test`` баров, окна сдвигаются на ``test``,
+    так что тестовые отрезки идут встык. Якорные окна (``anchored=True``):
+    обучение всегда начинается с первого бара и растёт на ``test`` с каждым
+    окном. Последний тестовый отрезок может быть короче ``test``.
+
+    ``step`` оставлен для явной записи сдвига и должен совпадать с ``test``:
+    при ``step < test`` тестовые отрезки перекрываются, при ``step > test``
+    между ними остаются дыры, и склеенная out-of-sample кривая теряет
+    смысл (повторы меток времени или пропуски).
+    """
+    if train <= 0 or test <= 0:
+        raise ValidationError("Walk-forward train and test sizes must be > 0")
+    step = test if step is None else step
+    if step != test:
+        raise ValidationError(
+            f"Walk-forward step must equal test ({test}): out-of-sample windows must neither overlap nor leave gaps"
+        )
+    n = feed.size()
+    folds: List[Fold] = []
+    k = 0
+    while True:
+        lo = 0 if anchored else k * step
+        mid = train + k * step
+        if mid >= n:
+            break
+        hi = mid + test
+        folds.append(
+            Fold(
+                train_start=feed.dt(lo),
+                train_end=feed.dt(mid),
+                test_start=feed.dt(mid),
+                test_end=feed.dt(hi) if hi < n else None,
+            )
+        )
+        if hi >= n:
+            break
+        k += 1
+    return folds
+
+
+def _engine(engine: str) -> Engine:
+    if engine not in ENGINES:
+        raise ValidationError(f"Unknown engine: {engine}")
+    return VectorEngine() if engine == "vector" else Engine()
+
+
+def _optimize(
+    feed: DataFeed,
+    strategy: str,
+    combos: List[Dict[str, Any]],
+    settings: BacktestSettings,
+    engine: str,
+    metric: str,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    results = grid_mod._run_combos(feed, strategy, combos, settings, engine)
+    # max() отдаёт первый из равных — победитель не зависит от числа воркеров.
+    best = max(results, key=lambda r: r.metrics.get(metric, float("-inf")))
+    return best.params, best.metrics
+
+
+def _optimize_fold(
+    fold: Fold,
+    strategy: str,
+    combos: List[Dict[str, Any]],
+    settings: BacktestSettings,
+    engine: str,
+    metric: str,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    feed = grid_mod._worker_feed
+    assert feed is not None, "worker is not initialized"
+    return _optimize(feed.slice(fold.train_start, fold.train_end), strategy, combos, settings, engine, metric)
+
+
+def walk_forward(
+    source: FeedSource,
+    strategy: str,
+    grid: Mapping[str, Sequence[Any]] | Sequence[Dict[str, Any]],
+    settings: BacktestSettings,
+    train: int,
+    test: int,
+    anchored: bool = False,
+    step: int | None = None,
+    metric: str = "return_pct",
+    workers: int | None = None,
+    engine: str = "event",
+    constraint: Callable[[Dict[str, Any]], bool] | None = None,
+    analyzers: Sequence[Analyzer | BatchAnalyzer] | None = None,
+) -> WalkForwardResult:
+    """
+    Walk-forward оптимизация стратегии ``strategy`` по сетке ``grid``.
+
+    Фид режется на окна (:func:`make_folds`), обучающие и тестовые
+    отрезки берутся срезами :meth:`DataFeed.slice` без копирования.
+    Перебор in-sample для всех окон идёт параллельно в пуле процессов:
+    одно окно — одна задача, фид загружается воркером один раз
+    (как в :func:`backtester.grid.run_grid`). Победитель окна — комбинация
+    с наибольшей метрикой ``metric``.
+
+    Тестовые прогоны дешёвые (по одному на окно) и идут в текущем
+    процессе по порядку: каждый начинается с equity, которым закончился
+    предыдущий (позиция закрывается в конце отрезка), поэтому склеенная
+    кривая непрерывна. Тестовые прогоны всегда идут с
+    ``RecordLevel.FULL`` — склейке нужна кривая каждого отрезка;
+    ``settings.record`` определяет только то, что попадёт в склеенный
+    результат. Метрики склеенного результата считаются по всей
+    out-of-sample кривой анализаторами ``analyzers`` (по умолчанию —
+    :class:`DrawdownAnalyzer`). Стратегия на каждом тестовом отрезке
+    стартует «с нуля»: индикаторы прогреваются внутри отрезка.
+    """
+    spec = get_strategy(strategy)
+    combos = expand_grid(grid) if isinstance(grid, Mapping) else [dict(c) for c in grid]
+    if constraint is not None:
+        combos = [c for c in combos if constraint(c)]
+    if not combos:
+        raise ValidationError("Walk-forward grid has no parameter combinations")
+
+    feed = source.load()
+    folds = make_folds(feed, train, test, anchored=anchored, step=step)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(folds)))
+
+    winners: List[Tuple[Dict[str, Any], Dict[str, float]]]
+    if workers == 1:
+        winners = [
+            _optimize(feed.slice(f.train_start, f.train_end), strategy, combos, settings, engine, metric)
+            for f in folds
+        ]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=grid_mod._init_worker, initargs=(source,)
+        ) as pool:
+            futures = [
+                pool.submit(_optimize_fold, f, strategy, combos, settings, engine, metric) for f in folds
+            ]
+            winners = [fut.result() for fut in futures]
+
+    fold_results: List[FoldResult] = []
+    stamps = array("q")
+    equity = array("d")
+    trades: List[Trade] = []
+    cash = settings.initial_cash
+    for fold, (params, train_metrics) in zip(folds, winners):
+        eng = _engine(engine)
+        eng.set_data(feed.slice(fold.test_start, fold.test_end))
+        eng.set_strategy(spec.create(**params))
+        eng.configure(replace(settings, initial_cash=cash, record=RecordLevel.FULL))
+        res = eng.run()
+        fold_results.append(FoldResult(fold=fold, params=params, train_metrics=train_metrics, test_metrics=res.metrics))
+        stamps.extend(res.equity_curve.times.timestamps())
+        equity.extend(res.equity_curve.values.buffer())
+        trades.extend(res.trades)
+        cash = res.metrics["end_equity"]
+
+    stitched = list(analyzers) if analyzers is not None else [DrawdownAnalyzer()]
+    per_bar, batch = split_analyzers(stitched)
+    index = TimeIndex(stamps, feed.tz)
+    for dt, eq in zip(index, equity):
+        for analyzer in per_bar:
+            analyzer.on_bar(dt, eq)
+    if batch:
+        # Склеенная кривая целиком в памяти — один кусок; стоимость позиций
+        # по отрезкам не сохраняется, поэтому invested неизвестен.
+        chunk = EquityChunk(stamps, equity)
+        for batch_analyzer in batch:
+            batch_analyzer.on_chunk(chunk)
+    trade_count = len(trades)
+    if settings.record is RecordLevel.METRICS:
+        trades = []
+    return WalkForwardResult(
+        folds=fold_results,
+        result=_build_result(index, equity, trades, settings, stitched, trade_count),
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    CLI walk-forward (``backtester-cli walkforward ...``).
+
+    Пример запуска:
+
+        backtester-cli walkforward --csv backtester/data/AAPL_5Y.csv \\
+          --strategy ma --fast 3:15:2 --slow 20:100:10 --train 250 --test 60
+    """
+    p = argparse.ArgumentParser(prog="backtester-cli walkforward", description="Walk-forward optimization")
+    grid_mod.add_sweep_arguments(p)
+    p.add_argument("--train", type=int, required=True, help="In-sample window, bars")
+    p.add_argument("--test", type=int, required=True, help="Out-of-sample window, bars")
+    p.add_argument("--step", type=int, default=None, help="Window shift, bars (must equal --test)")
+    p.add_argument("--anchored", action="store_true", help="Anchored (expanding) in-sample windows")
+    args = p.parse_args(argv)
+    try:
+        source, grid, constraint, settings = grid_mod.sweep_from_args(args)
+    except ValidationError as exc:
+        p.error(str(exc))
+
+    try:
+        wf = walk_forward(
+            source,
+            args.strategy,
+            grid if grid else [{}],
+            settings,
+            train=args.train,
+            test=args.test,
+            anchored=args.anchored,
+            step=args.step,
+            metric=args.metric,
+            workers=args.workers,
+            engine=args.engine,
+            constraint=constraint,
+        )
+    except ValidationError as exc:
+        p.error(str(exc))
+
+    print("=== FOLDS (test_start, test_end, params, train metric, test return_pct) ===")
+    for fr in wf.folds:
+        end = fr.fold.test_end.isoformat() if fr.fold.test_end is not None else "end"
+        print(
+            f"{fr.fold.test_start.isoformat()}, {end}, {fr.params}, "
+            f"{fr.train_metrics.get(args.metric, float('nan')):.4f}, "
+            f"{fr.test_metrics.get('return_pct', 0.0):.4f}"
+        )
+    print("\n=== OUT-OF-SAMPLE METRICS ===")
+    for k, v in wf.result.metrics.items():
+        print(f"{k}: {v:.4f}")
+
+
+__all__ = ["Fold", "FoldResult", "WalkForwardResult", "make_folds", "walk_forward"]